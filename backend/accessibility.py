@@ -0,0 +1,131 @@
+# accessibility.py
+"""
+접근성 래스터: 격자 셀마다 min over 역 (출발역→역 승차시간 + 역→셀 도보시간).
+프론트엔드의 "가장 가까운 역 시간" 대신, 조금 멀어도 더 빨리 도착하는 역을 고른다.
+
+- numpy 벡터화, 격자 행 단위로 청크 처리 (메모리 ≈ chunk_elems × 8바이트 몇 개)
+- 역을 위도순으로 정렬해 두고, 청크마다 도보 한계 안쪽(위도 띠 + 경도 범위)의 역만 후보로 쓴다
+- 결과: (H, W) uint16 초, 0행 = 북쪽, 도달 불가 65535
+"""
+import io
+import numpy as np
+from station_index import EARTH_RADIUS_KM
+from travel_store import UNREACHABLE
+
+DEFAULT_BBOX = {"north": 37.70, "south": 37.20, "east": 127.27, "west": 126.70}  # App.tsx 기본 영역
+DEFAULT_CELL_DEG = 0.003
+WALK_SPEED_KMH = 4.5
+MAX_WALK_KM = 2.0
+
+# App.tsx getTimeColor 팔레트와 동일 (분 상한 -> RGB), 초과는 회색
+TIME_COLORS = [
+    (10, (0x00, 0xFF, 0x00)),
+    (20, (0x32, 0xCD, 0x32)),
+    (30, (0xFF, 0xFF, 0x00)),
+    (40, (0xFF, 0xA5, 0x00)),
+    (50, (0xFF, 0x45, 0x00)),
+]
+OVER_TIME_COLOR = (0x80, 0x80, 0x80)
+
+
+def parse_bbox(bbox):
+    """{"north","south","east","west"} -> (north, south, east, west) float, 잘못되면 ValueError"""
+    bbox = bbox or DEFAULT_BBOX
+    north, south, east, west = (float(bbox[k]) for k in ("north", "south", "east", "west"))
+    if not (north > south and east > west):
+        raise ValueError("bbox must satisfy north > south and east > west")
+    return north, south, east, west
+
+
+def grid_axes(bbox, cell_deg):
+    """셀 중심 위도(북->남), 경도(서->동) 배열"""
+    north, south, east, west = bbox
+    if cell_deg <= 0:
+        raise ValueError("cell_deg must be positive")
+    height = int(np.ceil((north - south) / cell_deg - 1e-9))
+    width = int(np.ceil((east - west) / cell_deg - 1e-9))
+    lats = north - (np.arange(height) + 0.5) * cell_deg
+    lngs = west + (np.arange(width) + 0.5) * cell_deg
+    return lats, lngs
+
+
+def _min_total_seconds(c_lat, c_lng, s_lat, s_lng, ride, sec_per_km, max_walk_sec):
+    """(h,) 위도 x (W,) 경도 셀 x (s,) 역 -> (h, W) min(승차 + 도보) 초 (라디안 입력, 없으면 inf)"""
+    cl = c_lat[:, None, None]
+    # haversine: a = sin²(Δφ/2) + cosφ1·cosφ2·sin²(Δλ/2)
+    a = (np.sin((cl - s_lat) / 2) ** 2
+         + np.cos(cl) * np.cos(s_lat) * np.sin((c_lng[None, :, None] - s_lng) / 2) ** 2)  # (h, W, s)
+    walk = (2 * EARTH_RADIUS_KM * sec_per_km) * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    return np.where(walk <= max_walk_sec, ride + walk, np.inf).min(axis=2)
+
+
+def accessibility_grid(ride_seconds, st_lat, st_lng, lats, lngs,
+                       walk_speed_kmh=WALK_SPEED_KMH, max_walk_km=MAX_WALK_KM,
+                       chunk_elems=2_000_000):
+    """
+    ride_seconds: (S,) 출발역 -> 각 역 승차시간(초, 도달 불가 65535)
+    st_lat, st_lng: (S,) 역 좌표 (NaN이면 제외)
+    lats, lngs: 셀 중심 축 -> (len(lats), len(lngs)) uint16 초
+    """
+    ride = np.asarray(ride_seconds)
+    keep = (ride < UNREACHABLE) & ~np.isnan(st_lat) & ~np.isnan(st_lng)
+    # 위도순 정렬 -> 행 청크마다 도보 한계 위도 띠 안의 역만 잘라 쓴다
+    s_lat = np.radians(np.asarray(st_lat, dtype=float)[keep])
+    by_lat = np.argsort(s_lat, kind="stable")
+    s_lat = s_lat[by_lat]
+    s_lng = np.radians(np.asarray(st_lng, dtype=float)[keep])[by_lat]
+    ride = ride[keep][by_lat].astype(np.float64)
+
+    out = np.full((len(lats), len(lngs)), UNREACHABLE, dtype=np.uint16)
+    if not len(ride) or not out.size:
+        return out
+
+    c_lat = np.radians(lats)
+    c_lng = np.radians(lngs)
+    sec_per_km = 3600.0 / walk_speed_kmh
+    max_walk_sec = max_walk_km * sec_per_km
+    max_walk_rad = max_walk_km / EARTH_RADIUS_KM  # 위도 차만으로도 넘으면 후보 제외
+
+    # 청크 높이: 위도 폭이 도보 한계 정도가 되게 (띠 안의 역만 후보)
+    span = abs(c_lat[1] - c_lat[0]) if len(c_lat) > 1 else max_walk_rad
+    lng_lo, lng_hi = c_lng.min(), c_lng.max()
+    rows = max(1, int(max_walk_rad / span)) if span > 0 else len(lats)
+    for r0 in range(0, len(lats), rows):
+        r1 = min(r0 + rows, len(lats))
+        lo, hi = np.sort(c_lat[[r0, r1 - 1]])
+        s0, s1 = np.searchsorted(s_lat, [lo - max_walk_rad, hi + max_walk_rad], side="left")
+        # 경도 방향도 도보 한계 밖의 역은 제외 (타일처럼 좁은 영역에서 후보가 크게 준다)
+        max_walk_lng = max_walk_rad / max(np.cos(max(abs(lo), abs(hi)) + max_walk_rad), 1e-6)
+        band = np.arange(s0, s1)
+        band = band[(s_lng[band] >= lng_lo - max_walk_lng) & (s_lng[band] <= lng_hi + max_walk_lng)]
+        if not len(band):
+            continue
+        # (h, W, s) 원소 수가 chunk_elems 를 넘지 않게 행을 다시 나눈다
+        step = max(1, chunk_elems // (len(lngs) * len(band)))
+        for q0 in range(r0, r1, step):
+            q1 = min(q0 + step, r1)
+            total = _min_total_seconds(c_lat[q0:q1], c_lng, s_lat[band], s_lng[band], ride[band],
+                                       sec_per_km, max_walk_sec)
+            reachable = total < UNREACHABLE
+            out[q0:q1][reachable] = np.rint(total[reachable]).astype(np.uint16)
+    return out
+
+
+def grid_to_png(grid):
+    """uint16 초 격자 -> RGBA PNG 바이트 (프론트 범례 색상, 도달 불가 투명)"""
+    from PIL import Image
+
+    minutes = grid // 60
+    rgba = np.zeros(grid.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = OVER_TIME_COLOR
+    for limit, color in reversed(TIME_COLORS):
+        rgba[minutes <= limit, :3] = color
+    rgba[..., 3] = np.where(grid == UNREACHABLE, 0, 255)
+    buf = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buf, format="PNG", optimize=False)
+    return buf.getvalue()
+
+
+def grid_to_bytes(grid):
+    """uint16 초 격자 -> little-endian 행 우선 원시 바이트"""
+    return np.ascontiguousarray(grid, dtype="<u2").tobytes()
@@ -1,18 +1,43 @@
 # app.py
 import os
 import json
-import requests
-import pandas as pd
+import base64
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
-from haversine import haversine
 from flask_cors import CORS
-import re # Added for normalize_station_name
+from station_index import StationRegistry, NearestStationIndex, normalize_station_name
+import numpy as np
+from travel_store import TravelTimeStore, band_edges, UNREACHABLE
+from route_store import RouteStore
+from hub_labels import HubLabels
+from response_cache import ResponseCache
+from kakao_client import KakaoClient, KakaoError, GeocodeCache, CircuitBreaker, DEFAULT_BASE_URL
+import accessibility
+import isochrones
+import meeting_point
+from tile_cache import DiskTileCache, tile_pixel_axes, valid_tile
 
 # Load API keys
 load_dotenv()
 KAKAO_API_KEY = os.getenv("KAKAO_API_KEY")
 
+# 카카오 로컬 API: 커넥션 풀 + SQLite 캐시 (KAKAO_API_BASE로 스텁 서버 지정 가능)
+KAKAO = KakaoClient(
+    KAKAO_API_KEY,
+    base_url=os.getenv("KAKAO_API_BASE", DEFAULT_BASE_URL),
+    cache=GeocodeCache(
+        os.getenv("GEOCODE_CACHE_PATH", "data/geocode_cache.sqlite3"),
+        ttl_sec=int(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600))),
+        negative_ttl_sec=int(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600))),
+    ),
+    timeout=float(os.getenv("KAKAO_TIMEOUT", "8")),
+    max_concurrency=int(os.getenv("KAKAO_MAX_CONCURRENCY", "8")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.getenv("KAKAO_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("KAKAO_BREAKER_RESET", "30")),
+    ),
+)
+
 app = Flask(__name__)
 # CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
 CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -21,28 +46,57 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})
 with open("station_coords.json", encoding='utf-8') as f:
     STATIONS = json.load(f)
 
-# Load travel time data
-TRAVEL_TIMES_DF = None
+# Load travel time data (mmap된 N×N 초 행렬, 없으면 CSV에서 생성)
+TRAVEL_STORE = None
 try:
-    TRAVEL_TIMES_DF = pd.read_csv("data/station_pairs_all_with_transfer.csv")
-    print(f"Travel time data loaded: {len(TRAVEL_TIMES_DF)} routes")
+    TRAVEL_STORE = TravelTimeStore.load("data/station_pairs_all_with_transfer.csv")
+    print(f"Travel time data loaded: {len(TRAVEL_STORE)} stations")
 except Exception as e:
     print(f"Warning: Could not load travel times data: {e}")
 
+# 최단경로 트리 (export 시 함께 저장된 int16 직전 상태 배열, 없으면 /api/route 비활성)
+ROUTE_STORE = None
+try:
+    ROUTE_STORE = RouteStore.load("data/station_pairs_all_with_transfer.csv")
+    if ROUTE_STORE is not None and TRAVEL_STORE is not None and len(ROUTE_STORE) != len(TRAVEL_STORE):
+        raise ValueError(f"route arrays cover {len(ROUTE_STORE)} stations, matrix has {len(TRAVEL_STORE)}")
+    if ROUTE_STORE is not None:
+        print(f"Route data loaded: {ROUTE_STORE.num_nodes} nodes")
+except Exception as e:
+    ROUTE_STORE = None
+    print(f"Warning: Could not load route data: {e}")
+
+# 허브 라벨 인덱스 (stations/hub_labels.py, 없으면 /api/travel-time 은 행렬로 답함)
+HUB_LABELS = None
+try:
+    HUB_LABELS = HubLabels.load("data/station_pairs_all_with_transfer.csv")
+    if HUB_LABELS is not None and TRAVEL_STORE is not None and HUB_LABELS.stations != list(TRAVEL_STORE.stations):
+        raise ValueError("hub label stations differ from the matrix stations")
+    if HUB_LABELS is not None:
+        print(f"Hub labels loaded: {HUB_LABELS.num_entries} entries for {len(HUB_LABELS)} stations")
+except Exception as e:
+    HUB_LABELS = None
+    print(f"Warning: Could not load hub labels: {e}")
+
+# 역명 레지스트리 (CSV 역명 / 좌표 역명 / 정규화 이름 -> station id == 행렬 인덱스)
+REGISTRY = StationRegistry(TRAVEL_STORE.stations if TRAVEL_STORE else (HUB_LABELS.stations if HUB_LABELS else []),
+                           STATIONS)
+
+# 좌표 -> 최근접 역 공간 인덱스 (좌표는 시작 시 한 번만 float 변환)
+NEAREST_INDEX = NearestStationIndex(STATIONS)
+MAX_BATCH_POINTS = 10000
+MAX_BATCH_K = 10
+
+# 임의 지점 출발용 접근역 인덱스 (여행시간 표에 있고 좌표가 있는 역만, 인덱스 -> station id)
+ACCESS_IDS = np.flatnonzero(REGISTRY.has_coords[:REGISTRY.num_table_stations])
+ACCESS_INDEX = NearestStationIndex([
+    {"name": REGISTRY.names[sid], "lat": REGISTRY.lat[sid], "lng": REGISTRY.lng[sid]} for sid in ACCESS_IDS
+])
+
 # 사용자 클릭 위치에서 가장 가까운 역 찾기
 def find_nearest_station(user_lat, user_lng):
-    user_loc = (user_lat, user_lng)
-    nearest = min(
-        STATIONS,
-        key=lambda station: haversine(user_loc, (float(station["lat"]), float(station["lng"])))
-    )
-    distance = haversine(user_loc, (float(nearest["lat"]), float(nearest["lng"])))
-    return {
-        "name": nearest["name"],
-        "lat": float(nearest["lat"]),
-        "lng": float(nearest["lng"]),
-        "distance": round(distance, 2)  # km 단위로 반올림
-    }
+    idx, dist = NEAREST_INDEX.query(user_lat, user_lng, k=1)
+    return NEAREST_INDEX.entry(idx[0, 0], dist[0, 0])
 
 # 📍 새로 추가: 가장 가까운 지하철역 찾기 API
 @app.route("/api/nearest-station", methods=["POST"])
@@ -60,6 +114,37 @@ def nearest_station():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# 📍 여러 좌표에 대한 k-최근접 역 일괄 조회 API
+@app.route("/api/nearest-station/batch", methods=["POST"])
+def nearest_station_batch():
+    data = request.get_json() or {}
+    points = data.get("points")
+    if not isinstance(points, list) or not points:
+        return jsonify({"error": "Missing points"}), 400
+    if len(points) > MAX_BATCH_POINTS:
+        return jsonify({"error": f"Too many points (max {MAX_BATCH_POINTS})"}), 400
+
+    try:
+        k = int(data.get("k", 1))
+        # [{"lat":..,"lng":..}] 또는 [[lat, lng]] 모두 허용
+        coords = [(p["lat"], p["lng"]) if isinstance(p, dict) else (p[0], p[1]) for p in points]
+        lats = [float(lat) for lat, _ in coords]
+        lngs = [float(lng) for _, lng in coords]
+    except (KeyError, IndexError, TypeError, ValueError):
+        return jsonify({"error": "Invalid points"}), 400
+    if not 1 <= k <= MAX_BATCH_K:
+        return jsonify({"error": f"k must be between 1 and {MAX_BATCH_K}"}), 400
+
+    try:
+        idx, dist = NEAREST_INDEX.query(lats, lngs, k=k)
+        results = [
+            [NEAREST_INDEX.entry(i, d) for i, d in zip(row_idx, row_dist)]
+            for row_idx, row_dist in zip(idx, dist)
+        ]
+        return jsonify({"k": k, "results": results})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # 📍 주소를 좌표로 변환하는 API (카카오 API 사용)
 # 📍 주소를 좌표로 변환하는 API (카카오 주소검색 우선, 키워드 검색 폴백)
 @app.route("/api/geocode", methods=["POST"])
@@ -74,46 +159,17 @@ def geocode():
 
     # 1) 카카오 '주소검색' (정확한 도로명/지번 주소용)
     try:
-        url = "https://dapi.kakao.com/v2/local/search/address.json"
-        headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
-        params = {"query": keyword}
-        r = requests.get(url, headers=headers, params=params, timeout=8)
-        j = r.json() if r.content else {}
-
-        docs = j.get("documents", []) if isinstance(j, dict) else []
-        if docs:
-            first = docs[0]
-            # 카카오는 x=lng, y=lat
-            lng = first.get("x")
-            lat = first.get("y")
-            if lng and lat:
-                return jsonify({
-                    "lat": str(lat),
-                    "lng": str(lng),
-                    "address_name": first.get("address_name") or keyword
-                })
+        found = KAKAO.search_address(keyword)
+        if found:
+            return jsonify(found)
     except Exception as e:
         print("[geocode] kakao address error:", e)
 
     # 2) 주소검색 결과가 없으면 '키워드검색' 폴백 (장소명/건물명 등)
     try:
-        url = "https://dapi.kakao.com/v2/local/search/keyword.json"
-        headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
-        params = {"query": keyword}
-        r = requests.get(url, headers=headers, params=params, timeout=8)
-        j = r.json() if r.content else {}
-
-        docs = j.get("documents", []) if isinstance(j, dict) else []
-        if docs:
-            first = docs[0]
-            lng = first.get("x")
-            lat = first.get("y")
-            if lng and lat:
-                return jsonify({
-                    "lat": str(lat),
-                    "lng": str(lng),
-                    "address_name": first.get("place_name") or keyword
-                })
+        found = KAKAO.search_keyword(keyword)
+        if found:
+            return jsonify(found)
     except Exception as e:
         print("[geocode] kakao keyword error:", e)
 
@@ -121,151 +177,635 @@ def geocode():
     return jsonify({"error": "Address not found"}), 404
 
 # 등고선 데이터 생성 함수
-def generate_contour_data(start_station_name, time_intervals=[10, 20, 30, 40, 50, 60, 70, 80, 90, 100]):
+def generate_contour_data(start_station_name, time_intervals=[10, 20, 30, 40, 50, 60, 70, 80, 90, 100], reverse=False):
     """
     시작 역으로부터 각 시간 단위별로 도달 가능한 역들을 그룹화하여 등고선 데이터 생성
     50분 초과 데이터도 포함하여 처리
+    reverse=True: 시작 역을 도착역으로 보고 각 역 -> 시작 역 시간으로 묶음 (통근권)
     """
-    if TRAVEL_TIMES_DF is None:
+    if TRAVEL_STORE is None:
         return {"error": "Travel time data not available"}
     
-    # 역명 매칭을 위한 정규화 함수
-    def normalize_station_name(name):
-        # "역" 접미사 제거
-        name = name.replace('역', '')
-        # 노선 정보 제거 (예: " 1호선", " 경의선" 등)
-        name = re.sub(r'\s*[0-9]호선', '', name)
-        name = re.sub(r'\s*경의선', '', name)
-        name = re.sub(r'\s*우이신설선', '', name)
-        name = re.sub(r'\s*의정부경전철', '', name)
-        name = re.sub(r'\s*에버라인', '', name)
-        return name.strip()
-    
-    # CSV에서 역명 찾기 (정규화된 이름으로 매칭)
-    normalized_start = normalize_station_name(start_station_name)
-    
-    # CSV의 src_station 컬럼에서 매칭되는 역 찾기
-    matching_stations = []
-    for _, row in TRAVEL_TIMES_DF.iterrows():
-        csv_station = row['src_station']
-        if normalize_station_name(csv_station) == normalized_start:
-            matching_stations.append(csv_station)
-    
-    if not matching_stations:
-        return {"error": f"No routes found from station: {start_station_name} (normalized: {normalized_start})"}
-    
-    # 첫 번째 매칭되는 역 사용
-    csv_station_name = matching_stations[0]
-    print(f"Station matched: '{start_station_name}' -> '{csv_station_name}'")
+    # 레지스트리에서 역 id 조회 (원본/좌표/정규화 이름 모두 O(1))
+    start_id = REGISTRY.lookup(start_station_name)
+    if start_id is None or start_id >= REGISTRY.num_table_stations:
+        return {"error": f"No routes found from station: {start_station_name} (normalized: {normalize_station_name(start_station_name)})"}
     
-    start_routes = TRAVEL_TIMES_DF[TRAVEL_TIMES_DF['src_station'] == csv_station_name].copy()
-    if start_routes.empty:
-        return {"error": f"No routes found from CSV station: {csv_station_name}"}
+    # 소요시간 순 정렬 인덱스 + searchsorted로 구간 경계 계산
+    order, arrival_seconds = TRAVEL_STORE.sorted_times(start_id, reverse)
+    edges = TRAVEL_STORE.arrival_bands(start_id, time_intervals, reverse)
     
     # 시작 역의 좌표 찾기
-    start_station_coord = None
-    for s in STATIONS:
-        if normalize_station_name(s['name']) == normalized_start:
-            start_station_coord = s
-            break
-    
-    if not start_station_coord:
+    if not REGISTRY.has_coords[start_id]:
         return {"error": f"Start station coordinates not found: {start_station_name}"}
+    center_lat, center_lng = REGISTRY.coords(start_id)
     
+    # 시작 역 좌표 (중앙점) - 캐시 공유를 위해 레지스트리의 대표 역명 사용
+    return build_contour_bands(order, arrival_seconds, edges, time_intervals,
+                               REGISTRY.names[start_id], center_lat, center_lng)
+
+def build_contour_bands(order, arrival_seconds, edges, time_intervals, center_name, center_lat, center_lng):
+    """
+    소요시간 순 정렬된 역 id/초 + 구간 경계 -> 등고선 응답 ({"10분": {...}, ...})
+    출발역 / 출발 지점 API가 같은 형식을 쓴다
+    """
     contour_data = {}
     for i, time_limit in enumerate(time_intervals):
-        # 해당 시간 내에 도달 가능한 역들
-        reachable_stations = start_routes[start_routes['minutes'] <= time_limit].copy()
-        
-        # 이전 시간대의 역들을 제외 (중복 제거)
-        if i > 0:
-            prev_time = time_intervals[i-1]
-            prev_stations = start_routes[start_routes['minutes'] <= prev_time]
-            reachable_stations = reachable_stations[~reachable_stations.index.isin(prev_stations.index)]
+        # 해당 시간 내에 도달 가능한 역들 (이전 시간대의 역들은 제외)
+        lo = edges[i-1] if i > 0 else 0
+        band = slice(lo, edges[i])
         
         stations_with_coords = []
+        for dst_id, m in zip(order[band], arrival_seconds[band] // 60):
+            if not REGISTRY.has_coords[dst_id]:
+                continue
+            lat, lng = REGISTRY.coords(dst_id)
+            stations_with_coords.append({
+                'name': REGISTRY.names[dst_id],
+                'lat': lat,
+                'lng': lng,
+                'time': int(m)
+            })
         
-        for _, route in reachable_stations.iterrows():
-            dst_station = route['dst_station']
-            
-            # 역 좌표 찾기 - 역명 매칭 개선
-            station_coord = None
-            
-            # 1) 정확한 매칭 시도
-            station_coord = next((s for s in STATIONS if s['name'] == dst_station), None)
-            
-            # 2) "역" 접미사 제거 후 매칭 시도
-            if not station_coord:
-                station_name_without_suffix = dst_station.replace('역', '')
-                station_coord = next((s for s in STATIONS if station_name_without_suffix in s['name']), None)
-            
-            # 3) 정규화된 이름으로 매칭 시도
-            if not station_coord:
-                normalized_dst = normalize_station_name(dst_station)
-                for s in STATIONS:
-                    if normalize_station_name(s['name']) == normalized_dst:
-                        station_coord = s
-                        break
-            
-            if station_coord:
-                stations_with_coords.append({
-                    'name': dst_station,
-                    'lat': float(station_coord['lat']),
-                    'lng': float(station_coord['lng']),
-                    'time': int(route['minutes'])
-                })
-        
-        # 시작 역 좌표 추가 (중앙점)
+        # 시작 좌표 추가 (중앙점)
         stations_with_coords.append({
-            'name': start_station_name,
-            'lat': float(start_station_coord['lat']),
-            'lng': float(start_station_coord['lng']),
+            'name': center_name,
+            'lat': center_lat,
+            'lng': center_lng,
             'time': 0
         })
         
         # 경계선을 위한 역들을 정렬 (중앙에서부터 거리순)
         if len(stations_with_coords) > 1:
-            center_lat = float(start_station_coord['lat'])
-            center_lng = float(start_station_coord['lng'])
-            
-            # 거리 계산 함수
-            def calculate_distance(lat1, lng1, lat2, lng2):
-                return ((lat1 - lat2) ** 2 + (lng1 - lng2) ** 2) ** 0.5
-            
-            # 중앙에서부터 거리순으로 정렬
-            stations_with_coords.sort(key=lambda x: calculate_distance(
-                center_lat, center_lng, x['lat'], x['lng']
-            ))
+            stations_with_coords.sort(key=lambda x: ((center_lat - x['lat']) ** 2 + (center_lng - x['lng']) ** 2) ** 0.5)
         
         contour_data[f"{time_limit}분"] = {
             'time_limit': time_limit,
             'stations': stations_with_coords,
             'count': len(stations_with_coords),
-            'center_lat': float(start_station_coord['lat']),
-            'center_lng': float(start_station_coord['lng'])
+            'center_lat': center_lat,
+            'center_lng': center_lng
         }
     
     return contour_data
 
+# 등고선 응답 캐시 (직렬화된 바이트 + ETag)
+CONTOUR_CACHE = ResponseCache(
+    max_entries=int(os.getenv("CONTOUR_CACHE_SIZE", "256")),
+    ttl_sec=int(os.getenv("CONTOUR_CACHE_TTL", "600")),
+)
+
+DEFAULT_TIME_INTERVALS = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+MAX_TIME_BANDS = 300
+
+def parse_time_intervals(data):
+    """
+    요청의 시간 구간 해석
+    - "time_intervals": [5, 10, 15, ...] (분, 오름차순)
+    - 또는 "interval_step" + "max_minutes" (예: 1분 간격 슬라이더)
+    - 둘 다 없으면 기본 10분 간격
+    """
+    if data.get("time_intervals") is not None:
+        if not isinstance(data["time_intervals"], list):
+            raise ValueError("time_intervals must be a list of minutes")
+        intervals = [int(t) for t in data["time_intervals"]]
+    elif data.get("interval_step") is not None:
+        step = int(data["interval_step"])
+        max_minutes = int(data.get("max_minutes", DEFAULT_TIME_INTERVALS[-1]))
+        if step <= 0:
+            raise ValueError("interval_step must be positive")
+        intervals = list(range(step, max_minutes + 1, step))
+    else:
+        return DEFAULT_TIME_INTERVALS
+    if not intervals or len(intervals) > MAX_TIME_BANDS:
+        raise ValueError(f"Between 1 and {MAX_TIME_BANDS} time intervals are allowed")
+    if intervals[0] <= 0 or any(b <= a for a, b in zip(intervals, intervals[1:])):
+        raise ValueError("time_intervals must be positive and strictly increasing")
+    return intervals
+
+DIRECTIONS = ("from", "to")
+
+def parse_direction(data):
+    """"direction": "from"(기본, 역에서 출발) | "to"(역으로 도착) -> reverse 여부"""
+    direction = data.get("direction", "from")
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {list(DIRECTIONS)}")
+    return direction == "to"
+
 # 등고선 데이터 API
 @app.route("/api/contour-data", methods=["POST"])
 def contour_data():
-    data = request.get_json()
+    data = request.get_json() or {}
     start_station_name = data.get("station_name")
     
     if not start_station_name:
         return jsonify({"error": "Missing station name"}), 400
     
     try:
-        contour_data = generate_contour_data(start_station_name)
-        return jsonify(contour_data)
+        time_intervals = parse_time_intervals(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid time intervals: {e}"}), 400
+    try:
+        reverse = parse_direction(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        # 캐시 키: 대표 station id + 시간 구간 + 방향 ("강남역 2호선" / "강남" 등 별칭이 같은 항목 공유)
+        start_id = REGISTRY.lookup(start_station_name)
+        cache_key = (start_id, tuple(time_intervals), reverse)
+        cached = CONTOUR_CACHE.get(cache_key) if start_id is not None else None
+        if cached is None:
+            contour_data = generate_contour_data(start_station_name, time_intervals, reverse)
+            if "error" in contour_data:
+                return jsonify(contour_data)
+            cached = CONTOUR_CACHE.put(cache_key, jsonify(contour_data).get_data())
+        return cached_json_response(*cached)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def cached_json_response(body, etag, mimetype="application/json", headers=None):
+    """직렬화된 응답 + ETag, If-None-Match 일치 시 304"""
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    for k, v in (headers or {}).items():
+        response.headers[k] = v
+    return response
+
+# 접근성 래스터 캐시 (PNG/바이너리 격자)
+GRID_CACHE = ResponseCache(
+    max_entries=int(os.getenv("GRID_CACHE_SIZE", "64")),
+    ttl_sec=int(os.getenv("GRID_CACHE_TTL", "600")),
+)
+MAX_GRID_CELLS = 1_000_000
+GRID_FORMATS = {"png": "image/png", "bin": "application/octet-stream"}
+
+def parse_grid_params(data):
+    """격자 요청 공통 파라미터 -> (params, 셀 중심 위도축, 경도축). 잘못되면 ValueError"""
+    params = {
+        "bbox": accessibility.parse_bbox(data.get("bbox")),
+        "cell_deg": float(data.get("cell_deg", accessibility.DEFAULT_CELL_DEG)),
+        "walk_speed_kmh": float(data.get("walk_speed_kmh", accessibility.WALK_SPEED_KMH)),
+        "max_walk_km": float(data.get("max_walk_km", accessibility.MAX_WALK_KM)),
+    }
+    if params["walk_speed_kmh"] <= 0 or params["max_walk_km"] < 0:
+        raise ValueError("walk_speed_kmh must be positive and max_walk_km non-negative")
+    lats, lngs = accessibility.grid_axes(params["bbox"], params["cell_deg"])
+    return params, lats, lngs
+
+def compute_accessibility_grid(start_id, params, lats, lngs, reverse=False):
+    """reverse=True: 셀 -> 도보 -> 역 -> start_id 도착 (전치 행렬 행 사용)"""
+    return accessibility_grid_for_row(TRAVEL_STORE.row(start_id, reverse), params, lats, lngs)
+
+def accessibility_grid_for_row(ride_seconds, params, lats, lngs):
+    """(N,) 출발지 -> 역 초 (행렬 행 또는 지점 출발 결과) -> 접근성 격자"""
+    n = REGISTRY.num_table_stations
+    return accessibility.accessibility_grid(
+        ride_seconds, REGISTRY.lat[:n], REGISTRY.lng[:n], lats, lngs,
+        walk_speed_kmh=params["walk_speed_kmh"], max_walk_km=params["max_walk_km"],
+    )
+
+# 접근성 래스터 API: 셀마다 min(승차시간 + 도보시간)
+@app.route("/api/accessibility-grid", methods=["POST"])
+def accessibility_grid():
+    """
+    요청: {"station_name", "bbox": {north,south,east,west}, "cell_deg", "format": "png"|"bin",
+           "walk_speed_kmh", "max_walk_km", "direction": "from"|"to"}
+    bin = uint16 little-endian 초, 행 우선(0행 = 북쪽), 도달 불가 65535
+    격자 크기/범위는 X-Grid-* 응답 헤더로 전달
+    """
+    data = request.get_json() or {}
+    start_station_name = data.get("station_name")
+    if not start_station_name:
+        return jsonify({"error": "Missing station name"}), 400
+    if TRAVEL_STORE is None:
+        return jsonify({"error": "Travel time data not available"}), 500
+
+    try:
+        fmt = data.get("format", "png")
+        if fmt not in GRID_FORMATS:
+            raise ValueError(f"format must be one of {sorted(GRID_FORMATS)}")
+        params, lats, lngs = parse_grid_params(data)
+        reverse = parse_direction(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid grid parameters: {e}"}), 400
+    if len(lats) * len(lngs) > MAX_GRID_CELLS:
+        return jsonify({"error": f"Too many grid cells (max {MAX_GRID_CELLS})"}), 400
+
+    start_id = REGISTRY.lookup(start_station_name)
+    if start_id is None or start_id >= REGISTRY.num_table_stations:
+        return jsonify({"error": f"No routes found from station: {start_station_name}"})
+
+    headers = {
+        "X-Grid-Width": str(len(lngs)),
+        "X-Grid-Height": str(len(lats)),
+        "X-Grid-Bbox": ",".join(str(v) for v in params["bbox"]),  # north,south,east,west
+        "X-Grid-Cell-Deg": str(params["cell_deg"]),
+    }
+    try:
+        cache_key = (start_id, tuple(params.values()), fmt, reverse)
+        cached = GRID_CACHE.get(cache_key)
+        if cached is None:
+            grid = compute_accessibility_grid(start_id, params, lats, lngs, reverse)
+            body = accessibility.grid_to_png(grid) if fmt == "png" else accessibility.grid_to_bytes(grid)
+            cached = GRID_CACHE.put(cache_key, body)
+        return cached_json_response(*cached, mimetype=GRID_FORMATS[fmt], headers=headers)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 등시선(isochrone) 폴리곤 캐시
+ISOCHRONE_CACHE = ResponseCache(
+    max_entries=int(os.getenv("ISOCHRONE_CACHE_SIZE", "256")),
+    ttl_sec=int(os.getenv("ISOCHRONE_CACHE_TTL", "600")),
+)
+
+# 등시선 GeoJSON API: 접근성 격자 -> 시간 구간별 MultiPolygon
+@app.route("/api/isochrones", methods=["POST"])
+def isochrones_geojson():
+    """
+    요청: {"station_name", "time_intervals" | "interval_step"+"max_minutes", "tolerance",
+           "bbox", "cell_deg", "walk_speed_kmh", "max_walk_km", "direction": "from"|"to"}
+    응답: FeatureCollection, 구간마다 Feature 1개 (properties.time_limit = 분 상한)
+    """
+    data = request.get_json() or {}
+    start_station_name = data.get("station_name")
+    if not start_station_name:
+        return jsonify({"error": "Missing station name"}), 400
+    if TRAVEL_STORE is None:
+        return jsonify({"error": "Travel time data not available"}), 500
+
+    try:
+        time_intervals = parse_time_intervals(data)
+        params, lats, lngs = parse_grid_params(data)
+        reverse = parse_direction(data)
+        # 단순화 허용 오차(도), 기본값 = 셀 크기의 절반
+        tolerance = float(data.get("tolerance", params["cell_deg"] / 2))
+        if tolerance < 0:
+            raise ValueError("tolerance must be non-negative")
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid isochrone parameters: {e}"}), 400
+    if len(lats) * len(lngs) > MAX_GRID_CELLS:
+        return jsonify({"error": f"Too many grid cells (max {MAX_GRID_CELLS})"}), 400
+
+    start_id = REGISTRY.lookup(start_station_name)
+    if start_id is None or start_id >= REGISTRY.num_table_stations:
+        return jsonify({"error": f"No routes found from station: {start_station_name}"})
+
+    try:
+        cache_key = (start_id, tuple(time_intervals), tuple(params.values()), tolerance, reverse)
+        cached = ISOCHRONE_CACHE.get(cache_key)
+        if cached is None:
+            grid = compute_accessibility_grid(start_id, params, lats, lngs, reverse)
+            center = None
+            if REGISTRY.has_coords[start_id]:
+                lat, lng = REGISTRY.coords(start_id)
+                center = {"name": REGISTRY.names[start_id], "lat": lat, "lng": lng}
+            collection = isochrones.isochrone_geojson(grid, lats, lngs, time_intervals, tolerance, center)
+            cached = ISOCHRONE_CACHE.put(cache_key, jsonify(collection).get_data())
+        return cached_json_response(*cached)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 접근성 XYZ 타일 디스크 캐시 (데이터 버전/출발역/타일별 PNG)
+TILE_CACHE = DiskTileCache(
+    os.getenv("TILE_CACHE_DIR", "data/tile_cache"),
+    max_bytes=int(os.getenv("TILE_CACHE_MAX_MB", "256")) * 1024 * 1024,
+)
+TILE_MAX_AGE = 3600
+
+# 접근성 타일 API: 보이는 타일만 요청 시 생성 (픽셀 = 격자 셀 -> 줌에 맞는 해상도)
+# ?direction=to 이면 origin 을 도착역으로 보는 통근권 타일
+@app.route("/api/tiles/<origin>/<int:z>/<int:x>/<int:y>.png", methods=["GET"])
+def accessibility_tile(origin, z, x, y):
+    if TRAVEL_STORE is None:
+        return jsonify({"error": "Travel time data not available"}), 500
+    if not valid_tile(z, x, y):
+        return jsonify({"error": "Invalid tile"}), 400
+    try:
+        reverse = parse_direction(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    start_id = REGISTRY.lookup(origin)
+    if start_id is None or start_id >= REGISTRY.num_table_stations:
+        return jsonify({"error": f"No routes found from station: {origin}"}), 404
+
+    version = TRAVEL_STORE.version
+    cache_origin = f"to-{start_id}" if reverse else start_id
+    etag = f"{version}-{cache_origin}-{z}-{x}-{y}"
+    try:
+        body = TILE_CACHE.get(version, cache_origin, z, x, y)
+        if body is None:
+            lats, lngs = tile_pixel_axes(z, x, y)
+            grid = compute_accessibility_grid(start_id, {
+                "walk_speed_kmh": accessibility.WALK_SPEED_KMH,
+                "max_walk_km": accessibility.MAX_WALK_KM,
+            }, lats, lngs, reverse)
+            body = accessibility.grid_to_png(grid)
+            TILE_CACHE.put(version, cache_origin, z, x, y, body)
+        response = cached_json_response(body, etag, mimetype="image/png")
+        # 데이터 버전이 ETag에 들어 있으므로 브라우저 캐시 허용
+        response.headers["Cache-Control"] = f"public, max-age={TILE_MAX_AGE}"
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 임의 지점 출발 기본값 (compute_subway_times.compute_times_from_coord 와 동일)
+DEFAULT_ACCESS_K = 3
+DEFAULT_ACCESS_RADIUS_KM = 1.0
+DEFAULT_WALK_SPEED_MPS = 1.2
+
+def parse_access_params(data):
+    """지점 출발 접근 파라미터 -> (k, max_radius_km, walk_speed_mps). 잘못되면 ValueError"""
+    k = int(data.get("k", DEFAULT_ACCESS_K))
+    max_radius_km = float(data.get("max_radius_km", DEFAULT_ACCESS_RADIUS_KM))
+    walk_speed_mps = float(data.get("walk_speed_mps", DEFAULT_WALK_SPEED_MPS))
+    if not 1 <= k <= MAX_BATCH_K:
+        raise ValueError(f"k must be between 1 and {MAX_BATCH_K}")
+    if walk_speed_mps <= 0 or max_radius_km < 0:
+        raise ValueError("walk_speed_mps must be positive and max_radius_km non-negative")
+    return k, max_radius_km, walk_speed_mps
+
+def point_travel_times(lat, lng, k, max_radius_km, walk_speed_mps):
+    """
+    좌표 출발 -> ((N,) 초, 접근역 목록). 반경 안에 역이 없으면 (None, [])
+    min over 접근역 k개 (도보 + 역→역 행렬 행)
+    """
+    idx, dist = ACCESS_INDEX.query(lat, lng, k=k)
+    near = dist[0] <= max_radius_km
+    if not near.any():
+        return None, []
+    idx, dist = idx[0][near], dist[0][near]
+    walk_seconds = (dist * 1000 / walk_speed_mps).astype(np.int64)
+    total = TRAVEL_STORE.times_via_access(ACCESS_IDS[idx], walk_seconds)
+    access = [dict(ACCESS_INDEX.entry(i, d), walk_seconds=int(w)) for i, d, w in zip(idx, dist, walk_seconds)]
+    return total, access
+
+# 지점 출발 소요시간 API: min over 접근역 k개 (도보 + 역→역 행렬 행)
+@app.route("/api/travel-times/from-point", methods=["POST"])
+def travel_times_from_point():
+    """
+    요청: {"lat", "lng", "k", "max_radius_km", "walk_speed_mps", "time_intervals" | "interval_step"+"max_minutes"}
+    응답: {"origin", "access_stations", "contour_data"} (contour_data 는 /api/contour-data 와 같은 형식)
+    """
+    data = request.get_json() or {}
+    if data.get("lat") is None or data.get("lng") is None:
+        return jsonify({"error": "Missing coordinates"}), 400
+    if TRAVEL_STORE is None:
+        return jsonify({"error": "Travel time data not available"}), 500
+
+    try:
+        lat = float(data["lat"])
+        lng = float(data["lng"])
+        k, max_radius_km, walk_speed_mps = parse_access_params(data)
+        time_intervals = parse_time_intervals(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid parameters: {e}"}), 400
+
+    try:
+        total, access_stations = point_travel_times(lat, lng, k, max_radius_km, walk_speed_mps)
+        if total is None:
+            return jsonify({"error": f"No station within {max_radius_km}km"}), 404
+        order = np.argsort(total, kind="stable")
+        arrival_seconds = total[order]
+        edges = band_edges(arrival_seconds, time_intervals)
+
+        return jsonify({
+            "origin": {"lat": lat, "lng": lng},
+            "access_stations": access_stations,
+            "contour_data": build_contour_bands(order, arrival_seconds, edges, time_intervals,
+                                                "출발 지점", lat, lng),
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 만남 장소 응답 캐시
+MEETING_CACHE = ResponseCache(
+    max_entries=int(os.getenv("MEETING_CACHE_SIZE", "128")),
+    ttl_sec=int(os.getenv("MEETING_CACHE_TTL", "600")),
+)
+MIN_MEETING_ORIGINS = 2
+MAX_MEETING_ORIGINS = 20
+DEFAULT_MEETING_LIMIT = 20
+
+def parse_meeting_origins(origins):
+    """
+    ["강남", {"station_name": "사당"}, {"lat": .., "lng": ..}] -> [("station", id) | ("point", lat, lng)]
+    역을 못 찾으면 LookupError, 형식이 틀리면 ValueError
+    """
+    if not isinstance(origins, list) or not MIN_MEETING_ORIGINS <= len(origins) <= MAX_MEETING_ORIGINS:
+        raise ValueError(f"origins must be a list of {MIN_MEETING_ORIGINS}-{MAX_MEETING_ORIGINS} stations or coordinates")
+    parsed = []
+    for o in origins:
+        name = o if isinstance(o, str) else (o.get("station_name") if isinstance(o, dict) else None)
+        if name:
+            sid = REGISTRY.lookup(name)
+            if sid is None or sid >= REGISTRY.num_table_stations:
+                raise LookupError(f"No routes found from station: {name}")
+            parsed.append(("station", int(sid)))
+        elif isinstance(o, dict) and o.get("lat") is not None and o.get("lng") is not None:
+            parsed.append(("point", float(o["lat"]), float(o["lng"])))
+        else:
+            raise ValueError("each origin must be a station name or {lat, lng}")
+    return parsed
+
+def meeting_entry(sid, max_sec, sum_sec, rows):
+    lat, lng = REGISTRY.coords(sid)
+    return {
+        "name": REGISTRY.names[sid],
+        "lat": lat,
+        "lng": lng,
+        "max_seconds": int(max_sec[sid]),
+        "sum_seconds": int(sum_sec[sid]),
+        "max_minutes": int(max_sec[sid]) // 60,
+        "sum_minutes": int(sum_sec[sid]) // 60,
+        "seconds": rows[:, sid].tolist(),  # 출발지 순서
+    }
+
+# 만남 장소 API: 출발지 행 (P, N) 한 번의 열 방향 max/sum 으로 모든 역 순위
+@app.route("/api/meeting-point", methods=["POST"])
+def meeting_point_api():
+    """
+    요청: {"origins": [역명 | {"station_name"} | {"lat","lng"}] (2~20개), "limit",
+           "k", "max_radius_km", "walk_speed_mps" (좌표 출발지),
+           "grid": true|false, "grid_metric": "max"|"mean", "format": "png"|"bin",
+           "bbox", "cell_deg", "walk_speed_kmh", "max_walk_km"}
+    응답: {"origins", "ranked", "by_max", "by_sum", "grid"}
+      by_max = 가장 늦게 도착하는 사람 기준, by_sum = 총 이동시간 기준 (상위 limit개)
+      grid.data = base64 (png 또는 uint16 little-endian, 0행 = 북쪽)
+    """
+    data = request.get_json() or {}
+    if TRAVEL_STORE is None:
+        return jsonify({"error": "Travel time data not available"}), 500
+
+    try:
+        origins = parse_meeting_origins(data.get("origins"))
+        limit = int(data.get("limit", DEFAULT_MEETING_LIMIT))
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        access_params = parse_access_params(data)
+        with_grid = bool(data.get("grid", True))
+        grid_metric = data.get("grid_metric", "max")
+        fmt = data.get("format", "png")
+        if grid_metric not in meeting_point.GRID_METRICS:
+            raise ValueError(f"grid_metric must be one of {list(meeting_point.GRID_METRICS)}")
+        if fmt not in GRID_FORMATS:
+            raise ValueError(f"format must be one of {sorted(GRID_FORMATS)}")
+        params, lats, lngs = parse_grid_params(data)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid meeting parameters: {e}"}), 400
+    if with_grid and len(lats) * len(lngs) > MAX_GRID_CELLS:
+        return jsonify({"error": f"Too many grid cells (max {MAX_GRID_CELLS})"}), 400
+
+    try:
+        cache_key = (tuple(origins), limit, access_params, with_grid, grid_metric, fmt, tuple(params.values()))
+        cached = MEETING_CACHE.get(cache_key)
+        if cached is None:
+            rows, origin_info = [], []
+            for o in origins:
+                if o[0] == "station":
+                    sid = o[1]
+                    rows.append(TRAVEL_STORE.row(sid))
+                    lat, lng = REGISTRY.coords(sid) if REGISTRY.has_coords[sid] else (None, None)
+                    origin_info.append({"name": REGISTRY.names[sid], "lat": lat, "lng": lng})
+                else:
+                    total, access = point_travel_times(o[1], o[2], *access_params)
+                    if total is None:
+                        return jsonify({"error": f"No station within {access_params[1]}km of ({o[1]}, {o[2]})"}), 404
+                    rows.append(total)
+                    origin_info.append({"name": "출발 지점", "lat": o[1], "lng": o[2], "access_stations": access})
+            rows = np.asarray(rows, dtype=np.int64)
+
+            max_sec, sum_sec, reachable = meeting_point.reduce_rows(rows)
+            n = REGISTRY.num_table_stations
+            candidates = np.flatnonzero(reachable & REGISTRY.has_coords[:n])
+            by_max, by_sum = meeting_point.rank_stations(max_sec, sum_sec, candidates)
+            body = {
+                "origins": origin_info,
+                "ranked": int(len(candidates)),
+                "by_max": [meeting_entry(sid, max_sec, sum_sec, rows) for sid in by_max[:limit]],
+                "by_sum": [meeting_entry(sid, max_sec, sum_sec, rows) for sid in by_sum[:limit]],
+            }
+            if with_grid:
+                grid = meeting_point.combine_grids(
+                    [accessibility_grid_for_row(row, params, lats, lngs) for row in rows], grid_metric)
+                raw = accessibility.grid_to_png(grid) if fmt == "png" else accessibility.grid_to_bytes(grid)
+                body["grid"] = {
+                    "metric": grid_metric,
+                    "format": fmt,
+                    "width": len(lngs),
+                    "height": len(lats),
+                    "bbox": dict(zip(("north", "south", "east", "west"), params["bbox"])),
+                    "cell_deg": params["cell_deg"],
+                    "data": base64.b64encode(raw).decode("ascii"),
+                }
+            cached = MEETING_CACHE.put(cache_key, jsonify(body).get_data())
+        return cached_json_response(*cached)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def station_point(sid):
+    lat, lng = REGISTRY.coords(sid) if REGISTRY.has_coords[sid] else (None, None)
+    return {"name": REGISTRY.names[sid], "lat": lat, "lng": lng}
+
+# 경로 API: 저장된 최단경로 트리를 따라 역/호선 순서 복원 (탐색 없음, O(경로 길이))
+@app.route("/api/route", methods=["POST"])
+def route():
+    """
+    요청: {"from": 출발역, "to": 도착역}
+    응답: {"from", "to", "seconds", "minutes", "transfers", "legs": [{"line", "stations": [{name,lat,lng}]}]}
+    """
+    data = request.get_json() or {}
+    src_name, dst_name = data.get("from"), data.get("to")
+    if not src_name or not dst_name:
+        return jsonify({"error": "Missing from/to station"}), 400
+    if TRAVEL_STORE is None or ROUTE_STORE is None:
+        return jsonify({"error": "Route data not available"}), 500
+
+    ids = []
+    for name in (src_name, dst_name):
+        sid = REGISTRY.lookup(name)
+        if sid is None or sid >= REGISTRY.num_table_stations:
+            return jsonify({"error": f"Unknown station: {name}"}), 404
+        ids.append(sid)
+    src_id, dst_id = ids
+
+    try:
+        legs = ROUTE_STORE.legs(src_id, dst_id)
+        if legs is None:
+            return jsonify({"error": f"No route from {src_name} to {dst_name}"}), 404
+        seconds = int(TRAVEL_STORE.row(src_id)[dst_id])
+        return jsonify({
+            "from": station_point(src_id),
+            "to": station_point(dst_id),
+            "seconds": seconds,
+            "minutes": seconds // 60,
+            "transfers": len(legs) - 1,
+            "legs": [
+                {"line": leg["line"], "stations": [station_point(sid) for sid in leg["station_ids"]]}
+                for leg in legs
+            ],
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 역→역 최단시간 API: 허브 라벨 교집합 (없으면 행렬 조회)
+@app.route("/api/travel-time", methods=["POST"])
+def travel_time():
+    """
+    요청: {"from": 출발역, "to": 도착역}
+    응답: {"from", "to", "seconds", "minutes", "source": "hub-labels" | "matrix"}
+    """
+    data = request.get_json() or {}
+    src_name, dst_name = data.get("from"), data.get("to")
+    if not src_name or not dst_name:
+        return jsonify({"error": "Missing from/to station"}), 400
+    if TRAVEL_STORE is None and HUB_LABELS is None:
+        return jsonify({"error": "Travel time data not available"}), 500
+
+    ids = []
+    for name in (src_name, dst_name):
+        sid = REGISTRY.lookup(name)
+        if sid is None or sid >= REGISTRY.num_table_stations:
+            return jsonify({"error": f"Unknown station: {name}"}), 404
+        ids.append(sid)
+    src_id, dst_id = ids
+
+    try:
+        if HUB_LABELS is not None:
+            seconds, source = HUB_LABELS.seconds(src_id, dst_id), "hub-labels"
+        else:
+            seconds, source = int(TRAVEL_STORE.row(src_id)[dst_id]), "matrix"
+            seconds = None if seconds == UNREACHABLE else seconds
+        if seconds is None:
+            return jsonify({"error": f"No route from {src_name} to {dst_name}"}), 404
+        return jsonify({
+            "from": station_point(src_id),
+            "to": station_point(dst_id),
+            "seconds": seconds,
+            "minutes": seconds // 60,
+            "source": source,
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 응답 캐시 통계 API
+@app.route("/api/cache-stats", methods=["GET"])
+def cache_stats():
+    return jsonify({"contour": CONTOUR_CACHE.stats(), "grid": GRID_CACHE.stats(),
+                    "isochrone": ISOCHRONE_CACHE.stats(), "meeting": MEETING_CACHE.stats(),
+                    "tiles": TILE_CACHE.stats(),
+                    "kakao": KAKAO.stats()})
+
 # 역지오코딩 API 엔드포인트 추가
 @app.route("/api/reverse-geocode", methods=["POST"])
 def reverse_geocode():
-    data = request.get_json()
+    data = request.get_json() or {}
     lat = data.get("lat")
     lng = data.get("lng")
     
@@ -273,40 +813,16 @@ def reverse_geocode():
         return jsonify({"error": "Missing coordinates"}), 400
     
     try:
-        # 카카오 지도 API를 사용한 역지오코딩
-        url = f"https://dapi.kakao.com/v2/local/geo/coord2address.json"
-        headers = {
-            "Authorization": f"KakaoAK {KAKAO_API_KEY}"
-        }
-        params = {
-            "x": lng,  # 경도
-            "y": lat   # 위도
-        }
-        
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code != 200:
+        # 카카오 지도 API를 사용한 역지오코딩 (양자화 좌표 캐시)
+        address = KAKAO.reverse_geocode(lat, lng)
+        if address:
+            return jsonify({"address": address})
+        return jsonify({"error": "Address not found"}), 404
+    except KakaoError as e:
+        print(f"Reverse geocoding error: {e}")
+        if e.status_code is not None:
             return jsonify({"error": "Failed to get address"}), 400
-            
-        result = response.json()
-        
-        if result.get("documents") and len(result["documents"]) > 0:
-            address_info = result["documents"][0]
-            
-            # 도로명 주소가 있으면 우선 사용, 없으면 지번 주소 사용
-            address = ""
-            if address_info.get("road_address"):
-                address = address_info["road_address"]["address_name"]
-            elif address_info.get("address"):
-                address = address_info["address"]["address_name"]
-            
-            if address:
-                return jsonify({"address": address})
-            else:
-                return jsonify({"error": "Address not found"}), 404
-        else:
-            return jsonify({"error": "Address not found"}), 404
-            
+        return jsonify({"error": "Failed to process reverse geocoding"}), 500
     except Exception as e:
         print(f"Reverse geocoding error: {e}")
         return jsonify({"error": "Failed to process reverse geocoding"}), 500
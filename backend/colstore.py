@@ -0,0 +1,20 @@
+# colstore.py
+"""
+열 단위 바이너리 표(<name>.col) — 포맷 구현은 stations/colstore.py 한 곳 (쓰기/읽기가 어긋나지 않게).
+여기서는 그 모듈을 파일 경로로 불러와 다시 내보낸다.
+stations/ 를 sys.path 에 넣지 않는다 -> 같은 이름 모듈(hub_labels.py 등)과 섞이지 않음.
+
+  Table.open(path)   매직/스키마 확인 후 np.memmap, 컬럼은 view (복사 없음)
+"""
+import importlib.util
+from pathlib import Path
+
+_SOURCE = Path(__file__).resolve().parent.parent / "stations" / "colstore.py"
+_spec = importlib.util.spec_from_file_location("_stations_colstore", _SOURCE)
+_impl = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_impl)
+
+MAGIC = _impl.MAGIC
+SCHEMA_VERSION = _impl.SCHEMA_VERSION
+Table = _impl.Table
+read_table = _impl.read_table
@@ -1,7 +1,9 @@
 
-import pandas as pd, numpy as np, heapq, json, math, re
+import pandas as pd, numpy as np, json, math, re
 from pathlib import Path
-from collections import defaultdict
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as _csgraph_dijkstra
+from colstore import Table
 
 # ----------------------- Utilities -----------------------
 def mmss_to_sec(x):
@@ -41,69 +43,92 @@ def haversine_km(lat1, lon1, lat2, lon2):
 # ----------------------- Graph ---------------------------
 Node = tuple[str, str]  # (station, line)
 class Graph:
+    """
+    (역, 호선) 노드 -> 정수 id, 간선은 정수 배열로 모아 두고 탐색 때 CSR 행렬로 한 번 만든다
+    (stations/csr_graph.py 와 같은 방식, 탐색은 scipy.sparse.csgraph). 간선이 추가되면 다시 만든다.
+    """
     def __init__(self):
-        self.adj: dict[Node, list[tuple[Node,int,str]]] = defaultdict(list)
-        self.nodes_present = set()
+        self.node_id: dict[Node, int] = {}
+        self.nodes: list[Node] = []
+        self._us, self._vs, self._ws, self._kinds = [], [], [], []
+        self._matrix = None
+
+    @property
+    def nodes_present(self):
+        return self.node_id.keys()
+
+    def _id(self, node: Node) -> int:
+        i = self.node_id.get(node)
+        if i is None:
+            i = self.node_id[node] = len(self.nodes)
+            self.nodes.append(node)
+        return i
+
     def add_edge(self, u: Node, v: Node, sec: int, kind="ride", undirected=True):
-        self.adj[u].append((v, sec, kind))
-        self.nodes_present.add(u); self.nodes_present.add(v)
+        a, b = self._id(u), self._id(v)
+        self._us.append(a); self._vs.append(b); self._ws.append(int(sec)); self._kinds.append(kind)
         if undirected:
-            self.adj[v].append((u, sec, kind))
-
-def dijkstra(adj: dict, src: Node):
-    INF = 10**15
-    dist = {src: 0}
-    pq = [(0, src)]
-    while pq:
-        d,u = heapq.heappop(pq)
-        if d != dist[u]: 
-            continue
-        for v, w, _ in adj[u]:
-            nd = d + w
-            if nd < dist.get(v, INF):
-                dist[v] = nd
-                heapq.heappush(pq, (nd, v))
-    return dist
+            self._us.append(b); self._vs.append(a); self._ws.append(int(sec)); self._kinds.append(kind)
+        self._matrix = None
+
+    def csr(self):
+        """n×n csr_matrix. (u, v) 중복 간선은 최소 가중치만 (csr_matrix 는 중복을 합산하므로)"""
+        if self._matrix is None:
+            n = len(self.nodes)
+            us, vs, ws = (np.asarray(x, dtype=np.int64) for x in (self._us, self._vs, self._ws))
+            order = np.lexsort((ws, vs, us))
+            us, vs, ws = us[order], vs[order], ws[order]
+            keep = np.ones(len(us), dtype=bool)
+            keep[1:] = (us[1:] != us[:-1]) | (vs[1:] != vs[:-1])
+            self._matrix = csr_matrix((ws[keep].astype(np.float64), (us[keep], vs[keep])), shape=(n, n))
+        return self._matrix
+
+def dijkstra(g: Graph, src: Node):
+    """src 에서 도달 가능한 노드 -> 초"""
+    dist = _csgraph_dijkstra(g.csr(), indices=g.node_id[src])
+    reach = np.flatnonzero(np.isfinite(dist))
+    return {g.nodes[i]: int(dist[i]) for i in reach}
 
 # ---------------------- Builders -------------------------
 def build_ride_edges_from_official(official_csv_path: Path) -> pd.DataFrame:
+    """
+    호선별 연속역 -> 양방향 ride 간선 (stations/ingest.official_ride_edges 와 같은 규칙, groupby/shift)
+    소요시간 0/파싱 불가 = 구간 시작, 호선별누계(km) 감소 = 재시작
+    """
     # Read with cp949; fall back to euc-kr
     try:
         df = pd.read_csv(official_csv_path, encoding="cp949")
     except Exception:
         df = pd.read_csv(official_csv_path, encoding="euc-kr")
-    df["seconds"] = df["소요시간"].map(mmss_to_sec)
-    edges = []
-    for line, g in df.groupby("호선", sort=False):
-        g = g.reset_index(drop=True)
-        for i in range(1, len(g)):
-            prev_name = str(g.loc[i-1, "역명"]).strip()
-            curr_name = str(g.loc[i,   "역명"]).strip()
-            sec = g.loc[i, "seconds"]
-            if pd.isna(sec) or sec == 0:
-                continue
-            # optional: cut when cumulative decreases (segment restart)
-            if "호선별누계(km)" in g.columns:
-                prev_cum = g.loc[i-1, "호선별누계(km)"]
-                curr_cum = g.loc[i,   "호선별누계(km)"]
-                if pd.notna(prev_cum) and pd.notna(curr_cum) and curr_cum < prev_cum:
-                    continue
-            rec = {"line": str(line).strip(), "from_station": prev_name, "to_station": curr_name, "seconds": int(sec), "kind":"ride"}
-            edges.append(rec)
-            edges.append({"line": str(line).strip(), "from_station": curr_name, "to_station": prev_name, "seconds": int(sec), "kind":"ride"})
-    return pd.DataFrame(edges).drop_duplicates()
+    df = df[df["호선"].notna()].reset_index(drop=True)
+    line = df["호선"].astype(str).str.strip()
+    name = df["역명"].astype(str).str.strip()
+    sec = df["소요시간"].map(mmss_to_sec).astype(float)
+    cum = (pd.to_numeric(df["호선별누계(km)"], errors="coerce").astype(float)
+           if "호선별누계(km)" in df.columns else pd.Series(np.nan, index=df.index))
+    prev_name = name.groupby(line, sort=False).shift()
+    prev_cum = cum.groupby(line, sort=False).shift()
+    restart = cum.notna() & prev_cum.notna() & (cum < prev_cum)
+    ok = (line.groupby(line, sort=False).cumcount() > 0) & sec.notna() & (sec != 0) & ~restart
+    order = pd.Series(pd.factorize(line)[0], index=df.index)[ok]
+    fwd = pd.DataFrame({"line": line[ok], "from_station": prev_name[ok], "to_station": name[ok],
+                        "seconds": sec[ok].astype(np.int64), "kind": "ride"})
+    rev = fwd.rename(columns={"from_station": "to_station", "to_station": "from_station"})[fwd.columns]
+    # 호선 첫 등장 순 -> 행 순, 정방향/역방향 교대
+    both = pd.concat([fwd.assign(_o=order, _d=0), rev.assign(_o=order, _d=1)])
+    both = both.rename_axis("_i").sort_values(["_o", "_i", "_d"], kind="stable")
+    return both.drop(columns=["_o", "_d"]).reset_index(drop=True).drop_duplicates()
 
 def add_transfer_edges_from_neighbors(g: Graph, neighbors_csv_path: Path, default_transfer_sec=240):
     nb = pd.read_csv(neighbors_csv_path, encoding="utf-8-sig")
     nb = nb.dropna(subset=["exchangeStationNames","exchangeLineNames"])
-    for _, r in nb.iterrows():
-        st = str(r["stationName"]).strip()
-        line_here = canon_line(r["lineName"])
-        u = (st, line_here)
+    for st, ln, ex_st_names, ex_ln_names in zip(nb["stationName"], nb["lineName"],
+                                                nb["exchangeStationNames"], nb["exchangeLineNames"]):
+        u = (str(st).strip(), canon_line(ln))
         if u not in g.nodes_present:
             continue
-        ex_stations = [s.strip() for s in str(r["exchangeStationNames"]).split(",")]
-        ex_lines    = [canon_line(s) for s in str(r["exchangeLineNames"]).split(",")]
+        ex_stations = [s.strip() for s in str(ex_st_names).split(",")]
+        ex_lines    = [canon_line(s) for s in str(ex_ln_names).split(",")]
         for ex_st, ex_ln in zip(ex_stations, ex_lines):
             v = (ex_st, ex_ln)
             if v in g.nodes_present:
@@ -118,6 +143,9 @@ def attach_walk_edges(g: Graph, click_lat, click_lng, station_coords_path: Path,
     coords = None
     if station_coords_path.suffix.lower() == ".json":
         coords = pd.DataFrame(json.load(open(station_coords_path, "r", encoding="utf-8")))
+    elif station_coords_path.suffix.lower() == ".col":
+        table = Table.open(station_coords_path)
+        coords = pd.DataFrame({c: table.strings(c) if table.dict_name(c) else table.column(c) for c in table.columns})
     else:
         coords = pd.read_csv(station_coords_path, encoding="utf-8-sig")
     # Normalize column names guesses
@@ -145,13 +173,23 @@ def attach_walk_edges(g: Graph, click_lat, click_lng, station_coords_path: Path,
                 g.add_edge(origin, (node_st, node_ln), secs, kind="walk", undirected=False)
     return origin
 
+def load_ride_edges_table(edges_col_path: Path) -> pd.DataFrame:
+    """time.py 가 쓴 subway_edges_from_official.col -> build_ride_edges_from_official 과 같은 컬럼"""
+    table = Table.open(edges_col_path)
+    return pd.DataFrame({"line": table.strings("line"), "from_station": table.strings("from_station"),
+                         "to_station": table.strings("to_station"),
+                         "seconds": table.column("seconds").astype(np.int64), "kind": table.strings("kind")})
+
 def build_graph(official_csv_path: Path, neighbors_csv_path: Path) -> Graph:
+    """official_csv_path: 원본 시간표 CSV 또는 미리 만든 간선 표(.col)"""
     g = Graph()
-    edges = build_ride_edges_from_official(official_csv_path)
-    for _, r in edges.iterrows():
-        g.add_edge((str(r["from_station"]).strip(), str(r["line"]).strip()),
-                   (str(r["to_station"]).strip(),   str(r["line"]).strip()),
-                   int(r["seconds"]), kind="ride", undirected=True)
+    if Path(official_csv_path).suffix.lower() == ".col":
+        edges = load_ride_edges_table(official_csv_path)
+    else:
+        edges = build_ride_edges_from_official(official_csv_path)
+    for ln, a, b, sec in zip(edges["line"], edges["from_station"], edges["to_station"], edges["seconds"]):
+        g.add_edge((str(a).strip(), str(ln).strip()), (str(b).strip(), str(ln).strip()),
+                   int(sec), kind="ride", undirected=True)
     add_transfer_edges_from_neighbors(g, neighbors_csv_path, default_transfer_sec=240)
     return g
 
@@ -159,7 +197,7 @@ def compute_times_from_station(g: Graph, station: str, line: str, out_csv_path:
     src = (station.strip(), line.strip())
     if src not in g.nodes_present:
         raise ValueError(f"Start node {src} not in graph (check station name and line id).")
-    dist = dijkstra(g.adj, src)
+    dist = dijkstra(g, src)
     best = {}
     for (st, ln), sec in dist.items():
         best[st] = min(best.get(st, 10**15), sec)
@@ -171,7 +209,7 @@ def compute_times_from_station(g: Graph, station: str, line: str, out_csv_path:
 def compute_times_from_coord(g: Graph, lat: float, lng: float, station_coords_path: Path, out_csv_path: Path,
                              k=3, max_radius_km=1.0, walk_speed_mps=1.2):
     origin = attach_walk_edges(g, lat, lng, station_coords_path, k=k, max_radius_km=max_radius_km, walk_speed_mps=walk_speed_mps)
-    dist = dijkstra(g.adj, origin)
+    dist = dijkstra(g, origin)
     best = {}
     for (st, ln), sec in dist.items():
         if st.startswith("__"):  # skip virtual
@@ -0,0 +1,64 @@
+# hub_labels.py
+"""
+역→역 최단시간 허브 라벨 인덱스 (stations/hub_labels.py 가 쓰는 <name>.hub.npz).
+역 s 의 출발 라벨과 역 t 의 도착 라벨에 공통으로 있는 허브 중 최소 합이 최단시간 —
+N×N 행렬 없이 메모리는 역 수 × 평균 라벨 크기.
+
+도착 라벨은 시작 시 역마다 {허브: 초} dict 로 바꿔 두고, 조회는 출발 라벨을 한 번 훑는다
+(라벨 수십 개 -> 수 마이크로초).
+"""
+from pathlib import Path
+import numpy as np
+
+
+class HubLabels:
+    def __init__(self, stations, out_labels, in_labels, sink_offset, divisor):
+        self.stations = list(stations)
+        self.out_labels = out_labels    # 역별 [(허브, 초)]
+        self.in_labels = in_labels      # 역별 {허브: 초}
+        self.sink_offset = list(sink_offset)
+        self.divisor = divisor
+
+    @classmethod
+    def load(cls, csv_path):
+        """라벨 파일이 없거나 행렬(.npy)보다 오래됐으면 None"""
+        csv_path = Path(csv_path)
+        path = csv_path.with_suffix(".hub.npz")
+        npy_path = csv_path.with_suffix(".npy")
+        if not path.exists():
+            return None
+        if npy_path.exists() and path.stat().st_mtime_ns < npy_path.stat().st_mtime_ns:
+            return None
+        with np.load(path) as z:
+            stations = z["stations"].tolist()
+            out_labels = cls._split(z["out_offsets"], z["out_hubs"], z["out_dist"])
+            in_labels = [dict(l) for l in cls._split(z["in_offsets"], z["in_hubs"], z["in_dist"])]
+            if len(out_labels) != len(stations) or len(in_labels) != len(stations):
+                raise ValueError(f"{path.name}: labels for {len(out_labels)}/{len(in_labels)} of {len(stations)} stations")
+            return cls(stations, out_labels, in_labels, z["sink_offset"].tolist(), int(z["divisor"]))
+
+    @staticmethod
+    def _split(offsets, hubs, dist):
+        offsets, hubs, dist = offsets.tolist(), hubs.tolist(), dist.tolist()
+        return [list(zip(hubs[a:b], dist[a:b])) for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def __len__(self):
+        return len(self.stations)
+
+    @property
+    def num_entries(self):
+        return sum(len(l) for l in self.out_labels) + sum(len(l) for l in self.in_labels)
+
+    def seconds(self, src_id, dst_id):
+        """출발역 -> 도착역 최단 초 (행렬과 같은 값), 도달 불가면 None"""
+        if src_id == dst_id:
+            return 0
+        target = self.in_labels[dst_id]
+        best = None
+        for hub, d in self.out_labels[src_id]:
+            dt = target.get(hub)
+            if dt is not None and (best is None or d + dt < best):
+                best = d + dt
+        if best is None:
+            return None
+        return (best - self.sink_offset[dst_id]) // self.divisor
@@ -0,0 +1,165 @@
+# isochrones.py
+"""
+접근성 격자(accessibility.py) -> 시간 구간별 GeoJSON MultiPolygon.
+contourpy 로 구간 경계를 채움 등고선(filled contour)으로 뽑고,
+Douglas-Peucker 로 링을 단순화해 셀 수천 개 대신 링 몇 개만 보낸다.
+이웃 구간이 공유하는 경계는 한 번만 단순화해 두 구간에 같이 쓴다 (틈/겹침 없음).
+"""
+import numpy as np
+from contourpy import contour_generator, FillType
+from travel_store import UNREACHABLE
+
+COORD_DECIMALS = 5  # ≈ 1m
+
+
+def _dp_keep(points, tolerance):
+    """열린 선 Douglas-Peucker -> 남길 점 mask (양 끝점 유지)"""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        seg = points[j] - points[i]
+        rel = points[i + 1:j] - points[i]
+        length = np.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(*rel.T)
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tolerance:
+            k += i + 1
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+    return keep
+
+
+def simplify_ring(points, tolerance):
+    """
+    닫힌 링 Douglas-Peucker 단순화 (첫 점 == 끝 점 유지).
+    tolerance: 좌표 단위(도). 0 이하면 그대로 반환.
+    """
+    n = len(points)
+    if tolerance <= 0 or n <= 4:
+        return points
+    # 닫힌 링은 시작점과 가장 먼 점으로 두 개의 열린 선으로 나눈다
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    keep = np.concatenate([_dp_keep(points[:far + 1], tolerance)[:-1], _dp_keep(points[far:], tolerance)])
+    return points[keep]
+
+
+class _ArcSimplifier:
+    """
+    이웃 구간은 같은 등고선 레벨을 경계로 공유한다 (contourpy 가 두 구간에 같은 좌표를 낸다).
+    모든 구간의 링을 한 망(topology)으로 보고, 변이 셋 이상 만나거나 '어느 구간의 변인가'가 바뀌는
+    점(접점)에서 호(arc)로 나눈다. 호마다 방향을 정규화해 한 번만 단순화
+    -> 한 구간의 외곽과 다음 구간의 구멍이 같은 점을 쓴다.
+    """
+
+    def __init__(self, bands, tolerance):
+        """bands: 구간별 [(points, offsets)] (contourpy OuterOffset 결과)"""
+        self.tolerance = tolerance
+        owners = {}  # 무방향 변 -> 이 변을 가진 구간 집합
+        for b, (points_list, offsets_list) in enumerate(bands):
+            for points, offsets in zip(points_list, offsets_list):
+                for a, z in zip(offsets[:-1], offsets[1:]):
+                    for key in self._edges(points[a:z]):
+                        owners.setdefault(key, set()).add(b)
+        incident = {}  # 점 -> 닿는 변들의 구간 집합 목록
+        for (p, q), bs in owners.items():
+            if p != q:
+                incident.setdefault(p, []).append(frozenset(bs))
+                incident.setdefault(q, []).append(frozenset(bs))
+        self.nodes = {p for p, sets in incident.items() if len(sets) != 2 or sets[0] != sets[1]}
+        self.shared = {key for key, bs in owners.items() if len(bs) > 1}
+        self._cache = {}
+
+    @staticmethod
+    def _edges(ring):
+        pts = [tuple(p) for p in ring.tolist()]
+        return [(p, q) if p <= q else (q, p) for p, q in zip(pts[:-1], pts[1:])]
+
+    def _arc(self, arc):
+        """열린 호 단순화 (정규 방향으로 한 번 계산해 재사용)"""
+        fwd = tuple(map(tuple, arc.tolist()))
+        rev = fwd[::-1]
+        key, flipped = (fwd, False) if fwd <= rev else (rev, True)
+        out = self._cache.get(key)
+        if out is None:
+            pts = np.asarray(key)
+            out = self._cache[key] = pts[_dp_keep(pts, self.tolerance)]
+        return out[::-1] if flipped else out
+
+    def ring(self, ring):
+        n = len(ring)
+        if self.tolerance <= 0 or n <= 4:
+            return ring
+        body = ring[:-1]
+        m = len(body)
+        cuts = [i for i, p in enumerate(map(tuple, body.tolist())) if p in self.nodes]
+        if not cuts:
+            if self._edges(ring[:2])[0] not in self.shared:
+                return simplify_ring(ring, self.tolerance)
+            # 링 전체가 공유 경계: 두 구간이 같은 점에서 자르도록 좌표 최소점 + 그 점에서 가장 먼 점
+            lo = int(np.lexsort((body[:, 1], body[:, 0]))[0])
+            far = int(np.argmax(np.hypot(*(body - body[lo]).T)))
+            cuts = sorted({lo, far})
+        # 링을 첫 접점에서 시작하도록 돌린 뒤 접점 사이 호마다 단순화
+        body = np.roll(body, -cuts[0], axis=0)
+        body = np.vstack([body, body[:1]])
+        bounds = [c - cuts[0] for c in cuts] + [m]
+        out = np.vstack([self._arc(body[a:z + 1])[:-1] for a, z in zip(bounds[:-1], bounds[1:])])
+        return np.vstack([out, out[:1]])
+
+
+def _ring_coords(ring):
+    return np.round(ring, COORD_DECIMALS).tolist()
+
+
+def isochrone_geojson(grid, lats, lngs, time_intervals, tolerance_deg=None, center=None):
+    """
+    grid: (H, W) uint16 초, 0행 = 북쪽 (accessibility.accessibility_grid 결과)
+    lats, lngs: 셀 중심 축 (lats 는 북->남)
+    time_intervals: 분 단위 오름차순 상한 -> 구간 i = (이전 상한, 상한] 분
+    tolerance_deg: 단순화 허용 오차(도), None 이면 셀 크기의 절반
+    """
+    if tolerance_deg is None:
+        tolerance_deg = abs(lngs[1] - lngs[0]) / 2 if len(lngs) > 1 else 0.0
+    minutes = np.where(grid == UNREACHABLE, np.nan, grid / 60.0)
+    # contourpy 는 오름차순 y 축을 기대 -> 남->북으로 뒤집는다
+    gen = contour_generator(x=lngs, y=lats[::-1], z=minutes[::-1], fill_type=FillType.OuterOffset)
+
+    # 분 = 초 // 60 기준 구간 (PNG/타일/band_edges 와 같은 경계): floor(m) <= limit  <=>  m < limit + 1
+    lowers = [-np.inf] + [float(limit + 1) for limit in time_intervals[:-1]]
+    bands = [gen.filled(lo, float(limit + 1)) for lo, limit in zip(lowers, time_intervals)]
+    simplifier = _ArcSimplifier(bands, tolerance_deg)
+
+    features = []
+    prev = None
+    for limit, (points_list, offsets_list) in zip(time_intervals, bands):
+        polygons = []
+        for points, offsets in zip(points_list, offsets_list):
+            # 첫 링 = 외곽, 나머지 = 구멍. 단순화 후 3점 미만이 되면 버린다
+            rings = [simplifier.ring(points[a:b]) for a, b in zip(offsets[:-1], offsets[1:])]
+            if len(rings[0]) < 4:
+                continue
+            polygons.append([_ring_coords(r) for r in rings if len(r) >= 4])
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "time_limit": limit,
+                "min_minutes": prev,
+                "label": f"{limit}분",
+            },
+            "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+        })
+        prev = limit
+
+    collection = {"type": "FeatureCollection", "features": features}
+    if center is not None:
+        collection["center"] = center
+    return collection
@@ -0,0 +1,327 @@
+# kakao_client.py
+"""
+카카오 로컬 API 클라이언트
+- requests.Session + 커넥션 풀 재사용
+- SQLite 영구 캐시 (TTL, 결과 없음(negative)도 캐시)
+- 역지오코딩은 좌표를 양자화한 키로 캐시 -> 근처 클릭끼리 같은 항목 공유
+- 동일 요청 single-flight 병합, 동시 업스트림 호출 수 제한
+- 서킷 브레이커: 연속 실패 시 즉시 실패 + 만료된(stale) 캐시 값으로 응답
+- base_url 교체로 로컬 스텁 서버 대상 테스트 가능
+"""
+import json
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://dapi.kakao.com"
+
+
+class KakaoError(Exception):
+    """업스트림 실패 (status_code=None 이면 네트워크/타임아웃)"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GeocodeCache:
+    """
+    key -> JSON 값 영구 캐시. 값이 None이면 '결과 없음'으로 저장(negative_ttl_sec 동안).
+    gunicorn 워커들이 같은 파일을 쓰도록 WAL 모드, 스레드별 커넥션 사용.
+    """
+
+    def __init__(self, path, ttl_sec=30 * 24 * 3600, negative_ttl_sec=24 * 3600):
+        self.path = str(path)
+        self.ttl_sec = ttl_sec
+        self.negative_ttl_sec = negative_ttl_sec
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode_cache ("
+            " key TEXT PRIMARY KEY, value TEXT, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, allow_stale=False):
+        """(True, value|None) 캐시 적중, (False, None) 없음/만료. allow_stale=True면 만료 항목도 반환"""
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM geocode_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] <= time.time() and not allow_stale):
+            return False, None
+        return True, (json.loads(row[0]) if row[0] is not None else None)
+
+    def put(self, key, value):
+        now = time.time()
+        ttl = self.ttl_sec if value is not None else self.negative_ttl_sec
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO geocode_cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False) if value is not None else None, now, now + ttl),
+        )
+        conn.commit()
+
+    def purge_expired(self, keep_stale_sec=0):
+        """만료 후 keep_stale_sec 이 지난 항목 삭제 (장애 시 stale 응답용으로 잠시 보관)"""
+        conn = self._conn()
+        conn.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time() - keep_stale_sec,))
+        conn.commit()
+
+
+class SingleFlight:
+    """같은 key로 진행 중인 호출이 있으면 새로 호출하지 않고 그 결과를 기다린다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call
+        self.coalesced = 0
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.value = None
+            self.error = None
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+
+class CircuitBreaker:
+    """
+    closed -> (연속 실패 failure_threshold회) -> open -> (reset_timeout 경과) -> half-open
+    half-open 에서는 시험 호출 1건만 통과, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class KakaoClient:
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, cache=None, timeout=8,
+                 pool_size=10, coord_precision=4, max_concurrency=8, queue_timeout=1.0,
+                 breaker=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.timeout = timeout
+        self.coord_precision = coord_precision  # 소수 4자리 ≈ 11m
+        self.breaker = breaker or CircuitBreaker()
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._flight = SingleFlight()
+        self.busy_rejected = 0
+        self.stale_served = 0
+        self.cache_errors = 0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Authorization"] = f"KakaoAK {api_key}"
+
+    # ---------------- HTTP ----------------
+    def _get_json(self, path, params):
+        try:
+            r = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise KakaoError(f"request failed: {e}") from e
+        if r.status_code != 200:
+            raise KakaoError(f"HTTP {r.status_code}", status_code=r.status_code)
+        try:
+            j = r.json() if r.content else {}
+        except ValueError as e:
+            raise KakaoError(f"invalid JSON: {e}", status_code=r.status_code) from e
+        return j if isinstance(j, dict) else {}
+
+    def _call_upstream(self, fetch):
+        """서킷 브레이커 + 동시 호출 수 제한을 거친 업스트림 호출"""
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.busy_rejected += 1
+            raise KakaoError("upstream busy")
+        if not self.breaker.allow():
+            self._slots.release()
+            raise KakaoError("circuit open")
+        try:
+            value = fetch()
+        except KakaoError as e:
+            # 네트워크/타임아웃, 5xx, 429만 장애로 집계 (4xx는 요청 문제)
+            if e.status_code is None or e.status_code >= 500 or e.status_code == 429:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except Exception:
+            # 응답 형식 오류 등 예상 밖 예외도 결과로 기록 (half-open 시험 호출이 걸린 채 남지 않게)
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._slots.release()
+        self.breaker.record_success()
+        return value
+
+    def _cache_get(self, key, allow_stale=False):
+        """캐시 파일이 잠겼거나 깨졌으면(sqlite3.Error) 없음으로 보고 업스트림으로"""
+        if self.cache is None:
+            return False, None
+        try:
+            return self.cache.get(key, allow_stale=allow_stale)
+        except sqlite3.Error as e:
+            self.cache_errors += 1
+            print(f"[geocode] cache read error: {e}")
+            return False, None
+
+    def _cache_put(self, key, value):
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(key, value)
+        except sqlite3.Error as e:
+            self.cache_errors += 1
+            print(f"[geocode] cache write error: {e}")
+
+    def _cached(self, key, fetch):
+        hit, value = self._cache_get(key)
+        if hit:
+            return value
+
+        def load():
+            value = self._call_upstream(fetch)
+            self._cache_put(key, value)
+            return value
+
+        try:
+            return self._flight.do(key, load)
+        except KakaoError:
+            # 장애 중에는 만료된 캐시라도 응답
+            hit, value = self._cache_get(key, allow_stale=True)
+            if hit:
+                self.stale_served += 1
+                return value
+            raise
+
+    def stats(self):
+        return {
+            "breaker_state": self.breaker.state,
+            "breaker_rejected": self.breaker.rejected,
+            "busy_rejected": self.busy_rejected,
+            "coalesced": self._flight.coalesced,
+            "stale_served": self.stale_served,
+            "cache_errors": self.cache_errors,
+        }
+
+    # ---------------- Geocode ----------------
+    def search_address(self, query):
+        """주소검색 -> {"lat","lng","address_name"} 또는 None"""
+        def fetch():
+            docs = self._get_json("/v2/local/search/address.json", {"query": query}).get("documents") or []
+            # 카카오는 x=lng, y=lat
+            if docs and docs[0].get("x") and docs[0].get("y"):
+                first = docs[0]
+                return {"lat": str(first["y"]), "lng": str(first["x"]),
+                        "address_name": first.get("address_name") or query}
+            return None
+        return self._cached(f"address:{query}", fetch)
+
+    def search_keyword(self, query):
+        """키워드검색(장소명/건물명) -> {"lat","lng","address_name"} 또는 None"""
+        def fetch():
+            docs = self._get_json("/v2/local/search/keyword.json", {"query": query}).get("documents") or []
+            if docs and docs[0].get("x") and docs[0].get("y"):
+                first = docs[0]
+                return {"lat": str(first["y"]), "lng": str(first["x"]),
+                        "address_name": first.get("place_name") or query}
+            return None
+        return self._cached(f"keyword:{query}", fetch)
+
+    def quantize(self, lat, lng):
+        return round(float(lat), self.coord_precision), round(float(lng), self.coord_precision)
+
+    def reverse_geocode(self, lat, lng):
+        """좌표 -> 도로명 주소(없으면 지번 주소) 문자열 또는 None"""
+        qlat, qlng = self.quantize(lat, lng)
+
+        def fetch():
+            docs = self._get_json("/v2/local/geo/coord2address.json", {"x": qlng, "y": qlat}).get("documents") or []
+            if not docs:
+                return None
+            info = docs[0]
+            # 도로명 주소가 있으면 우선 사용, 없으면 지번 주소 사용
+            if info.get("road_address"):
+                return info["road_address"].get("address_name") or None
+            if info.get("address"):
+                return info["address"].get("address_name") or None
+            return None
+        return self._cached(f"coord2address:{qlat:.{self.coord_precision}f},{qlng:.{self.coord_precision}f}", fetch)
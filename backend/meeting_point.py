@@ -0,0 +1,45 @@
+# meeting_point.py
+"""
+여러 출발지 -> 만남 장소 순위.
+출발지마다 (N,) 초 행(역 출발 = 행렬 행, 지점 출발 = times_via_access)을 쌓아 (P, N)으로 만들고
+열 방향 max / sum 한 번으로 모든 역의 "가장 늦게 도착하는 사람" / "총 이동시간"을 구한다.
+"""
+import numpy as np
+from travel_store import UNREACHABLE
+
+GRID_METRICS = ("max", "mean")
+
+
+def reduce_rows(rows):
+    """
+    rows: (P, N) 출발지별 초 (도달 불가 65535)
+    -> (max 초, sum 초, 모두 도달 가능 여부) 각 (N,)
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    reachable = (rows != UNREACHABLE).all(axis=0)
+    return rows.max(axis=0), rows.sum(axis=0), reachable
+
+
+def rank_stations(max_sec, sum_sec, candidates):
+    """
+    candidates: 순위에 넣을 역 id 배열 (모두 도달 가능 + 좌표 있음)
+    -> (max 기준 순서, sum 기준 순서) 역 id 배열. 동률은 다른 기준, 그다음 id 순
+    """
+    candidates = np.asarray(candidates)
+    mx, sm = max_sec[candidates], sum_sec[candidates]
+    by_max = candidates[np.lexsort((candidates, sm, mx))]
+    by_sum = candidates[np.lexsort((candidates, mx, sm))]
+    return by_max, by_sum
+
+
+def combine_grids(grids, metric="max"):
+    """
+    출발지별 접근성 격자 (P개, (H, W) uint16 초) -> 합친 격자
+    max: 모두 도착하는 시간, mean: 평균 이동시간. 한 명이라도 도달 불가면 65535
+    """
+    if metric not in GRID_METRICS:
+        raise ValueError(f"grid metric must be one of {list(GRID_METRICS)}")
+    stack = np.stack(grids).astype(np.int64)
+    unreachable = (stack == UNREACHABLE).any(axis=0)
+    combined = stack.max(axis=0) if metric == "max" else np.rint(stack.mean(axis=0)).astype(np.int64)
+    return np.where(unreachable, UNREACHABLE, combined).astype(np.uint16)
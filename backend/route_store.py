@@ -0,0 +1,72 @@
+# route_store.py
+"""
+역→역 최단경로 복원.
+export 스크립트가 행렬과 함께 쓰는 최단경로 트리를 읽기 전용 mmap으로 연다.
+
+  <name>.pred.npy   S×X int16  출발역별 직전 상태 (-1 = 출발 노드/도달 불가)
+  <name>.end.npy    S×S int16  출발역 -> 도착역의 마지막 상태 (-1 = 도달 불가)
+  <name>.nodes.csv  node_id,station_id,line   (상태 x 의 노드 = x % 노드 수)
+
+경로 복원은 end 에서 pred 를 따라가는 O(경로 길이) — 그래프 탐색 없음.
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+
+class RouteStore:
+    def __init__(self, pred, end, node_station, node_line):
+        self.pred = pred
+        self.end = end
+        self.node_station = np.asarray(node_station)
+        self.node_line = list(node_line)
+        self.num_nodes = len(self.node_line)
+
+    @classmethod
+    def load(cls, csv_path):
+        """경로 파일이 없거나 행렬보다 오래됐으면(--no-routes 로 다시 export) None"""
+        csv_path = Path(csv_path)
+        npy_path = csv_path.with_suffix(".npy")
+        paths = [csv_path.with_suffix(s) for s in (".pred.npy", ".end.npy", ".nodes.csv")]
+        if not all(p.exists() for p in paths):
+            return None
+        if npy_path.exists() and min(p.stat().st_mtime_ns for p in paths) < npy_path.stat().st_mtime_ns:
+            return None
+        pred = np.load(paths[0], mmap_mode="r")
+        end = np.load(paths[1], mmap_mode="r")
+        nodes = pd.read_csv(paths[2], encoding="utf-8-sig")
+        if end.shape[0] != end.shape[1] or pred.shape[0] != end.shape[0] or pred.shape[1] % len(nodes):
+            raise ValueError(f"{paths[0].name}: unexpected route arrays {pred.shape} / {end.shape}")
+        return cls(pred, end, nodes["station_id"].to_numpy(), nodes["line"].astype(str).tolist())
+
+    def __len__(self):
+        return self.end.shape[0]
+
+    def node_path(self, src_id, dst_id):
+        """출발역 -> 도착역 (역, 호선) 노드 id 목록, 도달 불가면 None"""
+        x = int(self.end[src_id, dst_id])
+        if x < 0:
+            return None
+        pred = self.pred[src_id]
+        states = []
+        while x >= 0:
+            states.append(x)
+            x = int(pred[x])
+        return [s % self.num_nodes for s in reversed(states)]
+
+    def legs(self, src_id, dst_id):
+        """
+        -> [{"line", "station_ids": [...]}] 호선별 구간 (같은 역에서 호선이 바뀌면 환승), 도달 불가면 None
+        환승 횟수 = len(legs) - 1
+        """
+        nodes = self.node_path(src_id, dst_id)
+        if nodes is None:
+            return None
+        legs = []
+        for nid in nodes:
+            st, ln = int(self.node_station[nid]), self.node_line[nid]
+            if legs and legs[-1]["line"] == ln:
+                legs[-1]["station_ids"].append(st)
+            else:
+                legs.append({"line": ln, "station_ids": [st]})
+        return legs
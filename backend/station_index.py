@@ -0,0 +1,158 @@
+# station_index.py
+"""
+역명 레지스트리: CSV 역명 / station_coords.json 역명("서울역 1호선") / 정규화 이름을
+하나의 정수 station id로 매핑하고, id별 좌표(float)를 배열로 보관한다.
+서버 시작 시 한 번만 만들고, 요청 처리 중에는 dict 조회만 한다.
+"""
+import re
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088  # haversine 패키지 기본값과 동일
+
+# station_coords.json 이름 뒤에 붙는 노선 라벨 (예: "서울역 1호선", "판교역 신분당선", "서울역 GTX-A")
+_LINE_LABEL_RE = re.compile(r"^(\S*(호선|선|경전철|철도)|GTX-\S+)$")
+_PAREN_RE = re.compile(r"\([^)]*\)")
+_SEP_RE = re.compile(r"[\s.·]")
+
+
+def normalize_station_name(name):
+    """
+    역명 정규화: 괄호 부기, 노선 라벨, 공백/구분점, 끝의 '역' 제거
+    "서울역 1호선" -> "서울", "시청.용인대" -> "시청용인대", "청량리(서울시립대입구)" -> "청량리"
+    """
+    name = _PAREN_RE.sub("", str(name).strip())
+    head, _, tail = name.rpartition(" ")
+    if head and _LINE_LABEL_RE.match(tail):
+        name = head
+    name = _SEP_RE.sub("", name)
+    if len(name) > 1 and name.endswith("역"):
+        name = name[:-1]
+    return name
+
+
+class StationRegistry:
+    """
+    id 0..N-1 은 여행시간 표(travel-time table)의 역 순서 그대로,
+    그 뒤로 좌표 파일에만 있는 역이 붙는다.
+    """
+
+    def __init__(self, table_names, coord_entries):
+        self.names = []
+        self._by_key = {}
+
+        for raw in table_names:
+            self._add(raw)
+            self._by_key[raw] = len(self.names) - 1  # 원본 이름은 정규화 별칭보다 우선
+        self.num_table_stations = len(self.names)
+
+        lat = {}
+        lng = {}
+        for entry in coord_entries:
+            if entry.get("lat") is None or entry.get("lng") is None:
+                continue
+            sid = self.lookup(entry["name"])
+            if sid is None:
+                sid = self._add(normalize_station_name(entry["name"]))
+            self._by_key.setdefault(entry["name"], sid)
+            # 같은 역의 첫 번째 좌표 사용 (기존 매칭과 동일)
+            if sid not in lat:
+                lat[sid] = float(entry["lat"])
+                lng[sid] = float(entry["lng"])
+
+        # 정규화로도 못 찾은 표 역명은 부분 문자열 매칭으로 한 번만 보정
+        for sid in range(self.num_table_stations):
+            if sid in lat:
+                continue
+            stem = self.names[sid].replace("역", "")
+            entry = next((e for e in coord_entries if e.get("lat") is not None and stem in e["name"]), None)
+            if entry:
+                lat[sid] = float(entry["lat"])
+                lng[sid] = float(entry["lng"])
+
+        n = len(self.names)
+        self.lat = np.full(n, np.nan)
+        self.lng = np.full(n, np.nan)
+        for sid, v in lat.items():
+            self.lat[sid] = v
+            self.lng[sid] = lng[sid]
+        self.has_coords = ~np.isnan(self.lat)
+
+    def _add(self, raw):
+        sid = len(self.names)
+        self.names.append(raw)
+        self._by_key[raw] = sid
+        self._by_key.setdefault(normalize_station_name(raw), sid)
+        return sid
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """원본 이름 또는 정규화 이름으로 station id 조회 (없으면 None)"""
+        if name is None:
+            return None
+        sid = self._by_key.get(name)
+        if sid is None:
+            sid = self._by_key.get(normalize_station_name(name))
+        return sid
+
+    def coords(self, sid):
+        return float(self.lat[sid]), float(self.lng[sid])
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """벡터화된 haversine (km). numpy 브로드캐스팅 지원"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    d = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(d))
+
+
+_TIE_SLACK = 4
+
+
+def _unit_xyz(lat, lng):
+    lat = np.radians(lat)
+    lng = np.radians(lng)
+    return np.column_stack((np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)))
+
+
+class NearestStationIndex:
+    """
+    station_coords.json 항목 전체에 대한 KD-tree.
+    단위구 위의 3차원 좌표를 쓰므로 현(chord) 거리 순서 == haversine 거리 순서,
+    즉 기존 min(haversine) 결과와 같은 역을 돌려준다.
+    """
+
+    def __init__(self, coord_entries):
+        entries = [e for e in coord_entries if e.get("lat") is not None and e.get("lng") is not None]
+        self.names = [e["name"] for e in entries]
+        self.lat = np.array([float(e["lat"]) for e in entries])
+        self.lng = np.array([float(e["lng"]) for e in entries])
+        self._tree = cKDTree(_unit_xyz(self.lat, self.lng))
+
+    def __len__(self):
+        return len(self.names)
+
+    def query(self, lats, lngs, k=1):
+        """
+        (M,) 위경도 배열 -> (M, k) 항목 인덱스, (M, k) haversine 거리(km)
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=float))
+        lngs = np.atleast_1d(np.asarray(lngs, dtype=float))
+        k = min(int(k), len(self.names))
+        # 같은 좌표를 가진 항목(환승역 등)끼리는 목록 앞쪽을 우선 -> 여유분을 더 뽑아 (거리, 인덱스) 순 정렬
+        kk = min(k + _TIE_SLACK, len(self.names))
+        _, idx = self._tree.query(_unit_xyz(lats, lngs), k=kk)
+        idx = idx.reshape(len(lats), kk)
+        dist = haversine_km(lats[:, None], lngs[:, None], self.lat[idx], self.lng[idx])
+        order = np.lexsort((idx, dist), axis=1)[:, :k]
+        return np.take_along_axis(idx, order, axis=1), np.take_along_axis(dist, order, axis=1)
+
+    def entry(self, i, distance_km):
+        return {
+            "name": self.names[i],
+            "lat": float(self.lat[i]),
+            "lng": float(self.lng[i]),
+            "distance": round(float(distance_km), 2)  # km 단위로 반올림
+        }
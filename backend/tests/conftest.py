@@ -0,0 +1,5 @@
+# backend 모듈은 backend/ 에서 실행하는 평면 import (app.py 와 같이)
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,124 @@
+# test_kakao_client.py
+"""KakaoClient 를 127.0.0.1 의 가짜 카카오 서버에 붙여 병합/서킷 브레이커/stale 응답 확인"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from kakao_client import CircuitBreaker, GeocodeCache, KakaoClient, KakaoError
+
+
+class FakeKakao:
+    """status 로 응답 코드, delay 로 지연을 바꿀 수 있는 스텁. hits = 받은 요청 수"""
+
+    def __init__(self):
+        self.status = 200
+        self.delay = 0.0
+        self.hits = 0
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fake._lock:
+                    fake.hits += 1
+                time.sleep(fake.delay)
+                body = json.dumps({"documents": [{"x": "126.9707", "y": "37.5547", "address_name": "서울역"}]})
+                body = body.encode("utf-8") if fake.status == 200 else b"{}"
+                self.send_response(fake.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def upstream():
+    fake = FakeKakao()
+    yield fake
+    fake.close()
+
+
+def test_concurrent_identical_queries_hit_upstream_once(upstream):
+    upstream.delay = 0.3
+    client = KakaoClient("test-key", base_url=upstream.base_url)
+    n = 8
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        results[i] = client.search_address("서울역")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert upstream.hits == 1
+    assert client.stats()["coalesced"] == n - 1
+    assert all(r == {"lat": "37.5547", "lng": "126.9707", "address_name": "서울역"} for r in results)
+
+
+def test_breaker_opens_after_failures_and_recovers_half_open(upstream):
+    upstream.status = 500
+    client = KakaoClient("test-key", base_url=upstream.base_url,
+                         breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+    for _ in range(2):
+        with pytest.raises(KakaoError):
+            client.search_address("서울역")
+    assert client.breaker.state == "open"
+
+    # open: 업스트림에 가지 않고 즉시 실패
+    with pytest.raises(KakaoError, match="circuit open"):
+        client.search_address("서울역")
+    assert upstream.hits == 2
+
+    # half-open 시험 호출이 실패하면 다시 open
+    time.sleep(0.25)
+    assert client.breaker.state == "half-open"
+    with pytest.raises(KakaoError):
+        client.search_address("서울역")
+    assert client.breaker.state == "open"
+    assert upstream.hits == 3
+
+    # half-open 시험 호출이 성공하면 closed
+    time.sleep(0.25)
+    upstream.status = 200
+    assert client.search_address("서울역")["address_name"] == "서울역"
+    assert client.breaker.state == "closed"
+    assert upstream.hits == 4
+
+
+def test_stale_entry_served_while_breaker_open(upstream, tmp_path):
+    # ttl 0 -> 저장 즉시 만료 (stale)
+    cache = GeocodeCache(tmp_path / "geocode.sqlite3", ttl_sec=0, negative_ttl_sec=0)
+    client = KakaoClient("test-key", base_url=upstream.base_url, cache=cache,
+                         breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    fresh = client.search_address("서울역")
+    assert upstream.hits == 1
+
+    upstream.status = 503
+    assert client.search_address("서울역") == fresh  # 업스트림 실패 -> stale
+    assert client.breaker.state == "open"
+    assert client.search_address("서울역") == fresh  # open -> 업스트림 없이 stale
+    assert upstream.hits == 2
+    assert client.stats()["stale_served"] == 2
+
+    # 캐시에 없는 질의는 그대로 실패
+    with pytest.raises(KakaoError, match="circuit open"):
+        client.search_address("없는 주소")
@@ -0,0 +1,110 @@
+# tile_cache.py
+"""
+XYZ 타일 (Web Mercator) 좌표 계산 + 용량 제한 디스크 캐시.
+
+캐시 경로: <root>/<data version>/<origin id>/<z>/<x>/<y>.png
+- 데이터 버전이 바뀌면 경로가 달라지므로 예전 타일은 자연히 안 쓰이다가 용량 초과 시 먼저 지워진다
+- 쓰기는 tmp + os.replace (동시에 같은 타일을 만들어도 깨진 파일을 읽지 않음)
+- 적중 시 mtime 갱신 -> 용량 초과 시 mtime 오래된 순(LRU)으로 삭제
+"""
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+TILE_SIZE = 256
+MAX_ZOOM = 18
+
+
+def tile_pixel_axes(z, x, y, size=TILE_SIZE):
+    """타일 픽셀 중심 위도(북->남, 메르카토르 간격), 경도(서->동)"""
+    n = 2 ** z
+    frac = (np.arange(size) + 0.5) / size
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + frac) / n))))
+    lngs = (x + frac) / n * 360.0 - 180.0
+    return lats, lngs
+
+
+def valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+class DiskTileCache:
+    def __init__(self, root, max_bytes=256 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._total = sum(p.stat().st_size for p in self.root.rglob("*.png"))
+
+    def path(self, version, origin_id, z, x, y):
+        return self.root / str(version) / str(origin_id) / str(z) / str(x) / f"{y}.png"
+
+    def get(self, version, origin_id, z, x, y):
+        p = self.path(version, origin_id, z, x, y)
+        try:
+            body = p.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return body
+
+    def put(self, version, origin_id, z, x, y, body):
+        p = self.path(version, origin_id, z, x, y)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(body)
+        old = p.stat().st_size if p.exists() else 0
+        os.replace(tmp, p)
+        with self._lock:
+            self._total += len(body) - old
+            over = self._total > self.max_bytes
+        if over:
+            self._evict()
+
+    def _evict(self):
+        """오래 안 쓴 타일부터 max_bytes 의 90%까지 삭제"""
+        files = []
+        for p in self.root.rglob("*.png"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, p in files:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._total = total
+            self.evictions += removed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
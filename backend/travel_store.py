@@ -0,0 +1,147 @@
+# travel_store.py
+"""
+역→역 소요시간 저장소.
+export 스크립트가 만든 N×N uint16 초 행렬(<name>.npy)을 읽기 전용 mmap으로 연다.
+-> gunicorn 워커들이 같은 물리 페이지를 공유하고, 등고선 요청은 행 하나만 읽는다.
+행렬이 없으면 전체 쌍 표(<name>.pairs.col, 없으면 CSV src_station,dst_station,seconds,minutes)에서 한 번 만들어 쓴다.
+도착역 기준(역방향, "어디서 X까지") 조회는 전치 행렬(<name>.T.npy, 없으면 메모리에서 전치)의 행을 읽는다.
+dwell 때문에 A->B 와 B->A 가 조금 다르므로 정방향 행을 재사용할 수 없다.
+행별 소요시간 순 정렬도 export 가 쓴 파일(<name>.order.npy/.sorted.npy, 전치본은 .T.*)을 mmap 으로 연다.
+없으면 요청 때 그 행만 정렬 (N log N, 상주 사본 없음).
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from colstore import Table
+
+UNREACHABLE = np.iinfo(np.uint16).max  # stations/matrix_store.py 와 동일
+
+
+def file_version(path):
+    """파일 mtime(ns) + 크기 -> 짧은 버전 문자열 (export 스크립트가 다시 쓰면 바뀜)"""
+    st = Path(path).stat()
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+class TravelTimeStore:
+    def __init__(self, stations, seconds, version="0", seconds_to=None, sorted_index=None):
+        self.stations = list(stations)
+        self.seconds = seconds  # (N, N) uint16, 행=출발역, 열=도착역
+        # (N, N) uint16, 행=도착역, 열=출발역 (전치본, 행 단위 연속)
+        self.seconds_to = np.ascontiguousarray(np.asarray(seconds).T) if seconds_to is None else seconds_to
+        self.version = version  # 데이터 버전 (원본 파일 mtime/크기) -> 타일 등 파생 캐시 키
+        # ((정방향 order, sorted), (전치 order, sorted)) N×(N-1) mmap, 없으면 None -> 행 단위로 정렬
+        self.sorted_index = sorted_index
+
+    def _row_arrival_index(self, station_id, reverse):
+        """
+        한 행의 상대 역을 소요시간 순으로 (자기 자신 제외, 도달 불가는 맨 뒤, 같은 시간은 id 순)
+        stations/matrix_store.arrival_index 의 한 행과 같다
+        """
+        row = self.row(station_id, reverse)
+        key = np.asarray(row, dtype=np.int32).copy()
+        key[station_id] = -1
+        order = np.argsort(key, kind="stable")[1:]
+        return order, np.asarray(row)[order]
+
+    def __len__(self):
+        return len(self.stations)
+
+    @classmethod
+    def load(cls, csv_path):
+        csv_path = Path(csv_path)
+        npy_path = csv_path.with_suffix(".npy")
+        st_path = csv_path.with_suffix(".stations.csv")
+        if npy_path.exists() and st_path.exists():
+            stations = pd.read_csv(st_path, encoding="utf-8-sig")["station"].astype(str).tolist()
+            seconds = np.load(npy_path, mmap_mode="r")
+            if seconds.shape != (len(stations), len(stations)) or seconds.dtype != np.uint16:
+                raise ValueError(f"{npy_path.name}: unexpected matrix {seconds.dtype}{seconds.shape}")
+            # 전치본은 행렬보다 나중에 쓰인 것만 사용 (예전 export 가 남긴 파일이면 메모리에서 전치)
+            t_path = csv_path.with_suffix(".T.npy")
+            seconds_to = None
+            if t_path.exists() and t_path.stat().st_mtime_ns >= npy_path.stat().st_mtime_ns:
+                seconds_to = np.load(t_path, mmap_mode="r")
+                if seconds_to.shape != seconds.shape or seconds_to.dtype != np.uint16:
+                    seconds_to = None
+            return cls(stations, seconds, version=file_version(npy_path), seconds_to=seconds_to,
+                       sorted_index=cls._load_sorted_index(csv_path, npy_path, len(stations)))
+        pairs_path = csv_path.with_suffix(".pairs.col")
+        if pairs_path.exists():
+            return cls.from_pairs_table(pairs_path)
+        return cls.from_pairs_csv(csv_path)
+
+    @staticmethod
+    def _load_sorted_index(csv_path, npy_path, n):
+        """정렬 파일 4개가 모두 행렬보다 나중에 쓰였고 모양이 맞으면 mmap, 아니면 None"""
+        paths = [(csv_path.with_suffix(".order.npy"), csv_path.with_suffix(".sorted.npy")),
+                 (csv_path.with_suffix(".T.order.npy"), csv_path.with_suffix(".T.sorted.npy"))]
+        mtime = npy_path.stat().st_mtime_ns
+        if not all(p.exists() and p.stat().st_mtime_ns >= mtime for pair in paths for p in pair):
+            return None
+        index = tuple((np.load(o, mmap_mode="r"), np.load(s, mmap_mode="r")) for o, s in paths)
+        for order, secs in index:
+            if order.shape != (n, n - 1) or secs.shape != (n, n - 1) or order.dtype.kind != "i" \
+                    or secs.dtype != np.uint16:
+                return None
+        return index
+
+    @classmethod
+    def from_pairs_table(cls, pairs_path):
+        """열 단위 쌍 표 폴백 (코드 = 역 id, 문자열 파싱 없음). from_pairs_csv 와 같이 minutes 기준"""
+        table = Table.open(pairs_path)
+        stations = table.dictionary(table.dict_name("src_station"))
+        seconds = np.full((len(stations), len(stations)), UNREACHABLE, dtype=np.uint16)
+        np.fill_diagonal(seconds, 0)
+        seconds[table.column("src_station"), table.column("dst_station")] = \
+            np.minimum(table.column("minutes").astype(np.int64) * 60, UNREACHABLE - 1)
+        return cls(stations, seconds, version=file_version(pairs_path))
+
+    @classmethod
+    def from_pairs_csv(cls, csv_path):
+        """행렬 파일이 없을 때의 폴백. minutes 컬럼 기준(초 = 분×60)."""
+        df = pd.read_csv(csv_path)
+        stations = sorted(set(df["src_station"]) | set(df["dst_station"]))
+        index = {st: i for i, st in enumerate(stations)}
+        seconds = np.full((len(stations), len(stations)), UNREACHABLE, dtype=np.uint16)
+        np.fill_diagonal(seconds, 0)
+        seconds[df["src_station"].map(index).to_numpy(), df["dst_station"].map(index).to_numpy()] = \
+            np.minimum(df["minutes"].to_numpy() * 60, UNREACHABLE - 1)
+        return cls(stations, seconds, version=file_version(csv_path))
+
+    def row(self, src_id, reverse=False):
+        """
+        출발역 하나의 (N,) 초 배열
+        reverse=True: src_id 를 도착역으로 보고 각 역 -> src_id 초 (전치본의 행, 연속 메모리)
+        """
+        return self.seconds_to[src_id] if reverse else self.seconds[src_id]
+
+    def sorted_times(self, station_id, reverse=False):
+        """(상대 역 id, 초) 소요시간 오름차순 (자기 자신 제외). reverse=True 면 도착역 기준"""
+        if self.sorted_index is None:
+            return self._row_arrival_index(station_id, reverse)
+        order, secs = self.sorted_index[1 if reverse else 0]
+        return order[station_id], secs[station_id]
+
+    def arrival_bands(self, src_id, limits_minutes, reverse=False):
+        """
+        분 단위 상한 목록 -> 각 상한까지의 누적 도착역 수 (정렬 배열의 경계)
+        band i = arrival_order[src_id, edges[i-1]:edges[i]]  (분 = 초 // 60 기준)
+        """
+        return band_edges(self.sorted_times(src_id, reverse)[1], limits_minutes)
+
+    def times_via_access(self, access_ids, access_seconds):
+        """
+        임의 지점 출발: 접근역 k개와 각 역까지 도보 초 -> (N,) 초 = min_k(도보 + 접근역 행)
+        그래프 탐색 없이 미리 계산된 행 k개만 읽는다. 도달 불가 65535
+        """
+        rows = np.asarray(self.seconds[np.asarray(access_ids)], dtype=np.int32)
+        walk = np.asarray(access_seconds, dtype=np.int32)[:, None]
+        total = np.where(rows == UNREACHABLE, UNREACHABLE, rows + walk).min(axis=0)
+        return np.minimum(total, UNREACHABLE)
+
+
+def band_edges(sorted_seconds, limits_minutes):
+    """오름차순 초 배열 + 분 단위 상한 -> 상한별 누적 개수 (분 = 초 // 60 이 상한 이하)"""
+    limits = np.minimum((np.asarray(limits_minutes, dtype=np.int64) + 1) * 60, UNREACHABLE)
+    return np.searchsorted(sorted_seconds, limits, side="left")
@@ -1,22 +1,15 @@
 import pandas as pd
 import numpy as np
+from ingest import read_csv_kr
 
 # 파일 경로
 DIST_CSV = "국가철도공단_수도권1호선_역간거리_20241015.csv"  # 네가 가진 1호선 거리 파일명 사용
 SPEED_CSV = "지하철_속도.csv"
 OUTPUT_CSV = "수도권1호선_소요시간(초)_추가.csv"
 
-def read_csv_smart(path):
-    for enc in ("cp949", "euc-kr", "utf-8-sig", "utf-8"):
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception:
-            continue
-    return pd.read_csv(path, encoding="cp949", engine="python", on_bad_lines="skip")
-
-# 1) 로드
-dist = read_csv_smart(DIST_CSV)
-spd  = read_csv_smart(SPEED_CSV)
+# 1) 로드 (인코딩은 ingest 가 파일마다 한 번 판별)
+dist = read_csv_kr(DIST_CSV, raw=False)
+spd  = read_csv_kr(SPEED_CSV, raw=False)
 
 orig_cols = dist.columns.tolist()
 dist.columns = [c.strip() for c in dist.columns]
@@ -82,20 +75,16 @@ trunk_st = {
     "제기동","신설동","동묘앞","동대문","종로5가","종로3가","종각","시청","서울역","남영","용산","노량진","대방","신길","영등포","신도림","구로"
 }
 
-def classify_branch(row):
-    st = str(row[col_stat]) if col_stat else ""
-    op = str(row[col_oper]) if col_oper else ""
-    # 명시적 역명 우선
-    if st in gyeongin_st:  return "경인"
-    if st in gyeongbu_st:  return "경부"
-    if st in gyeongwon_st: return "경원"
-    if st in trunk_st:     return "TRUNK"  # 공용구간
-    # 운영기관 힌트: 서울교통공사면 공용구간일 확률 높음
-    if "서울교통공사" in op:
-        return "TRUNK"
-    return ""  # 미분류
-
-dist["_분류"] = dist.apply(classify_branch, axis=1)
+def classify_branch(df):
+    st = df[col_stat].astype(str) if col_stat else pd.Series("", index=df.index)
+    op = df[col_oper].astype(str) if col_oper else pd.Series("", index=df.index)
+    # 명시적 역명 우선 -> 공용구간 -> 운영기관 힌트(서울교통공사면 공용구간일 확률 높음) -> 미분류
+    return np.select(
+        [st.isin(gyeongin_st), st.isin(gyeongbu_st), st.isin(gyeongwon_st), st.isin(trunk_st),
+         op.str.contains("서울교통공사", regex=False)],
+        ["경인", "경부", "경원", "TRUNK", "TRUNK"], default="")
+
+dist["_분류"] = classify_branch(dist)
 
 # 5) 속도 할당
 dist["_역간거리_km"] = pd.to_numeric(dist[col_gap], errors="coerce")
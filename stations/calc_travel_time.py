@@ -1,19 +1,31 @@
+import argparse
+from pathlib import Path
 import pandas as pd
 
-# CSV 파일 경로
-distance_path = "국가철도공단_우이신설역간거리_20230425.csv"
+# 기본값: 우이신설선 (pipeline.py 가 경전철 노선마다 인자를 바꿔 따로 실행)
+DISTANCE_CSV = Path("국가철도공단_우이신설역간거리_20230425.csv")
+SPEED_KMH = 33.8
+OUTPUT_CSV = Path("우이신설선_소요시간.csv")
 
-# CSV 불러오기 (인코딩은 파일 저장 형식에 맞게 변경 가능)
-df = pd.read_csv(distance_path, encoding="cp949")
+def calc_travel_time(distance_path: Path, speed_kmh: float, output_path: Path):
+    # CSV 불러오기 (인코딩은 파일 저장 형식에 맞게 변경 가능)
+    df = pd.read_csv(distance_path, encoding="cp949")
 
-# 의정부경전철 평균 속도 (km/h)
-speed_kmh = 33.8
+    # 소요시간(초) 계산 = (거리 / 속도) * 3600
+    df["소요시간"] = ((df["역간거리"] / speed_kmh) * 3600).round(0).astype(int)
 
-# 소요시간(초) 계산 = (거리 / 속도) * 3600
-df["소요시간"] = ((df["역간거리"] / speed_kmh) * 3600).round(0).astype(int)
+    # 결과 저장
+    df.to_csv(output_path, index=False, encoding="utf-8-sig")
+    return df
 
-# 결과 저장
-output_path = "우이신설선_소요시간.csv"
-df.to_csv(output_path, index=False, encoding="utf-8-sig")
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--distance-csv", type=Path, default=DISTANCE_CSV)
+    ap.add_argument("--speed-kmh", type=float, default=SPEED_KMH, help="노선 평균 속도 (km/h)")
+    ap.add_argument("--out", type=Path, default=OUTPUT_CSV)
+    args = ap.parse_args()
+    calc_travel_time(args.distance_csv, args.speed_kmh, args.out)
+    print(f"계산 완료! '{args.out}' 파일이 생성되었습니다.")
 
-print(f"계산 완료! '{output_path}' 파일이 생성되었습니다.")
+if __name__ == "__main__":
+    main()
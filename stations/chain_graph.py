@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+차수 2 체인 축약 (degree-2 chain contraction)
+
+호선 중간의 (역, 호선) 노드 대부분은 ride 이웃이 정확히 둘이고 환승 간선이 없다.
+이런 "내부 노드"가 이어진 체인 a -> v1 -> ... -> vk -> b 를 코어 노드 a, b 사이의 ride 간선 하나로 바꾼다.
+  super-edge 가중치 = 체인 ride 초 합 + 내부 노드 dwell 합   (b 도착 dwell 은 상태 확장 그래프가 더함)
+체인마다 내부 노드의 누적 도착 초(arr, 도착 dwell 포함)를 남겨 두므로 내부 역도 정확히 답한다.
+  d(s -> vi) = min(d(s -> a 의 두 상태)) + arr_i,  역 시간 = d - dwell(vi)  (양방향 체인 중 최소)
+출발역이 내부 노드면 양 끝 코어 노드에서 출발 (오프셋 = 끝까지 ride 도착 초) + 같은 체인은 직접 계산.
+
+탐색(csgraph)은 코어 그래프의 상태 확장 행렬에서만 -> 힙에 들어가는 상태 수가 코어 노드 수에 비례.
+결과는 CSRGraph.station_rows_dwell 과 같다 (export_times_with_stop --engine contracted).
+"""
+from collections import defaultdict
+import numpy as np
+from scipy.sparse.csgraph import dijkstra as _csgraph_dijkstra
+from csr_graph import CSRGraph, EDGE_RIDE
+
+
+class ChainContraction:
+    def __init__(self, graph, dwell_sec):
+        """graph: CSRGraph, dwell_sec: 정수 또는 (V,) 노드별 dwell (축약 가중치에 포함되므로 고정)"""
+        V = graph.num_nodes
+        self.num_nodes = V
+        self.dwell = np.broadcast_to(np.asarray(dwell_sec, dtype=np.int64), (V,)).copy()
+        us, vs = graph.sources().tolist(), graph.targets.tolist()
+        ws, ks = graph.weights.tolist(), graph.kinds.tolist()
+
+        # (u, v) ride 최소 초, 노드별 ride 이웃, 환승/도보 간선이 닿는 노드
+        ride_w = {}
+        out_nb, in_nb = defaultdict(set), defaultdict(set)
+        other = np.zeros(V, dtype=bool)
+        for u, v, w, k in zip(us, vs, ws, ks):
+            if k != EDGE_RIDE:
+                other[u] = other[v] = True
+            elif u != v:
+                ride_w[(u, v)] = min(w, ride_w.get((u, v), w))
+                out_nb[u].add(v); in_nb[v].add(u)
+        interior = np.array([not other[v] and len(out_nb[v]) == 2 and out_nb[v] == in_nb[v] for v in range(V)],
+                            dtype=bool)
+
+        chains = self._walk_chains(interior, out_nb, ride_w)
+        while True:
+            seen = np.zeros(V, dtype=bool)
+            for a, nodes, arr, b, total in chains:
+                seen[nodes] = True
+            ring = np.flatnonzero(interior & ~seen)
+            if not len(ring):
+                break
+            interior[ring[0]] = False  # 코어 노드 없는 순환 체인: 한 노드를 코어로
+            chains = self._walk_chains(interior, out_nb, ride_w)
+
+        # 코어 그래프: 코어 노드 사이의 원래 간선 + 체인 super-edge (자기 자신으로 돌아오는 체인은 제외)
+        self.core = np.flatnonzero(~interior)
+        self.core_pos = np.full(V, -1, dtype=np.int64)
+        self.core_pos[self.core] = np.arange(len(self.core))
+        cu, cv, cw, ck = [], [], [], []
+        for u, v, w, k in zip(us, vs, ws, ks):
+            if not interior[u] and not interior[v]:
+                cu.append(u); cv.append(v); cw.append(w); ck.append(k)
+        for a, nodes, arr, b, total in chains:
+            if a != b:
+                cu.append(a); cv.append(b); cw.append(total); ck.append(EDGE_RIDE)
+        cp = self.core_pos
+        self.graph = CSRGraph.from_edges(len(self.core), cp[cu], cp[cv], cw, ck)
+        self.core_dwell = self.dwell[self.core]
+
+        # 체인 내부 항목 (방향별): 노드, 시작 코어, 누적 도착 초, 체인 번호, 체인 내 위치
+        self.ent_node = np.concatenate([c[1] for c in chains]).astype(np.int64) if chains else np.zeros(0, np.int64)
+        self.ent_start = np.concatenate([np.full(len(c[1]), cp[c[0]]) for c in chains]) if chains else self.ent_node
+        self.ent_arr = np.concatenate([c[2] for c in chains]) if chains else self.ent_node
+        self.ent_chain = np.concatenate([np.full(len(c[1]), i) for i, c in enumerate(chains)]) if chains else self.ent_node
+        self.chain_offset = np.concatenate(([0], np.cumsum([len(c[1]) for c in chains]))).astype(np.int64)
+        # 내부 노드 -> [(체인 번호, 위치, 끝 코어, 끝 코어 ride 도착 초)]
+        self.exits = defaultdict(list)
+        for i, (a, nodes, arr, b, total) in enumerate(chains):
+            for p, (v, t) in enumerate(zip(nodes.tolist(), arr.tolist())):
+                self.exits[v].append((i, p, int(cp[b]), total - t + int(self.dwell[b])))
+        self.num_chains = len(chains)
+
+    def _walk_chains(self, interior, out_nb, ride_w):
+        """코어 노드에서 내부 노드로 나가는 방향마다 체인 -> [(a, 내부 노드, arr, b, super-edge 초)]"""
+        dwell = self.dwell
+        chains = []
+        for a in np.flatnonzero(~interior).tolist():
+            for first in sorted(out_nb[a]):
+                if not interior[first]:
+                    continue
+                nodes, arr = [], []
+                prev, cur, t = a, first, 0
+                while interior[cur]:
+                    t += ride_w[(prev, cur)] + int(dwell[cur])
+                    nodes.append(cur); arr.append(t)
+                    prev, cur = cur, next(x for x in out_nb[cur] if x != prev)
+                chains.append((a, np.array(nodes, dtype=np.int64), np.array(arr, dtype=np.int64), cur,
+                               t + ride_w[(prev, cur)]))
+        return chains
+
+    @property
+    def num_states(self):
+        return 2 * len(self.core)
+
+    def station_rows_dwell(self, source_groups, node_station, num_stations):
+        """CSRGraph.station_rows_dwell(source_groups, node_station, num_stations, dwell_sec) 와 같은 결과"""
+        V, C = self.num_nodes, len(self.core)
+        G = len(source_groups)
+        # 출발 노드 -> 코어 시드 (그룹, 코어, 오프셋, ride 도착 여부)
+        seeds = []
+        for g, nodes in enumerate(source_groups):
+            for n in nodes:
+                if self.core_pos[n] >= 0:
+                    seeds.append((g, int(self.core_pos[n]), 0, False))
+                else:
+                    seeds.extend((g, b, off, True) for i, p, b, off in self.exits[n])
+        sg, sc, so, sr = (np.array(x) for x in zip(*seeds))
+        uniq, row = np.unique(sc, return_inverse=True)
+        # 코어 T 상태에서의 거리 = R 상태에서의 거리 (두 상태의 나가는 간선이 같음)
+        D = _csgraph_dijkstra(self.graph.expanded_matrix(self.core_dwell), indices=uniq)  # (U, 2C)
+        dist = np.full((G, 2 * C), np.inf)
+        np.minimum.at(dist, sg, so[:, None] + D[row])
+        np.minimum.at(dist, (sg[sr], C + sc[sr]), so[sr])  # ride 로 도착한 끝 코어 상태
+
+        node_best = np.full((G, V), np.inf)
+        T, R = dist[:, :C], dist[:, C:]
+        node_best[:, self.core] = np.minimum(T, np.maximum(R - self.core_dwell, 0))
+        if len(self.ent_node):
+            val = np.minimum(T, R)[:, self.ent_start] + self.ent_arr - self.dwell[self.ent_node]
+            np.minimum.at(node_best.T, self.ent_node, val.T)
+        # 내부 노드 출발: 자기 자신 0 + 같은 체인 뒤쪽은 체인을 따라 직접
+        for g, nodes in enumerate(source_groups):
+            for n in nodes:
+                if self.core_pos[n] >= 0:
+                    continue
+                node_best[g, n] = 0
+                for i, p, b, off in self.exits[n]:
+                    lo, hi = self.chain_offset[i] + p, self.chain_offset[i + 1]
+                    ahead = self.ent_node[lo+1:hi]
+                    direct = self.ent_arr[lo+1:hi] - self.ent_arr[lo] - self.dwell[ahead]
+                    node_best[g, ahead] = np.minimum(node_best[g, ahead], direct)
+
+        col_order = np.argsort(node_station, kind="stable")
+        col_station = np.asarray(node_station)[col_order]
+        col_starts = np.flatnonzero(np.concatenate(([True], col_station[1:] != col_station[:-1])))
+        best = np.full((G, num_stations), np.inf)
+        best[:, col_station[col_starts]] = np.minimum.reduceat(node_best[:, col_order], col_starts, axis=1)
+        return CSRGraph._to_int(best)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+열 단위(columnar) 바이너리 표 <name>.col — CSV 대신 쓰는 중간/최종 산출물 포맷
+
+  b"SCOL" + uint32 헤더 길이 + JSON 헤더, 이어서 64바이트 정렬된 블록들
+  헤더: {"schema": SCHEMA_VERSION, "rows": n, "meta": {...},
+         "columns": [{"name", "dtype", "offset", "dict"}],
+         "dicts": {이름: {"count", "offsets", "data", "nbytes"}}}
+  - 숫자 컬럼: 리틀엔디언 고정폭 배열 그대로
+  - 문자열 컬럼: 사전 코드(uint8/16/32) + 사전 (UTF-8 바이트 연결 + int64 오프셋)
+    여러 컬럼이 같은 사전을 쓸 수 있다 (src_station/dst_station -> "station")
+
+읽기는 파일 전체를 np.memmap 으로 열고 컬럼마다 그 위의 view 만 만든다 (복사 없음).
+사전 문자열만 처음 쓸 때 한 번 디코드. backend/colstore.py 는 이 모듈을 그대로 불러 쓴다 (포맷 구현은 여기 한 곳).
+
+  python colstore.py ../backend/data/station_coords.csv ../backend/data/station_coords.col --dict 역명_clean
+"""
+import argparse, json, os, struct
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+MAGIC = b"SCOL"
+SCHEMA_VERSION = 1
+ALIGN = 64
+
+# ----------------------------
+# Write
+# ----------------------------
+def code_dtype(n: int):
+    """사전 크기 n -> 코드에 쓸 가장 작은 부호 없는 정수형"""
+    for dt in (np.uint8, np.uint16, np.uint32):
+        if n <= np.iinfo(dt).max + 1:
+            return np.dtype(dt)
+    raise ValueError(f"dictionary of {n} values does not fit uint32 codes")
+
+def dict_encode(*columns):
+    """문자열 컬럼들 -> (공유 사전 (정렬된 고유값), 컬럼별 코드 배열)"""
+    values = [np.asarray(pd.Series(c).astype(str), dtype=object) for c in columns]
+    uniq = sorted(set().union(*(set(v.tolist()) for v in values)))
+    index = pd.Index(uniq)
+    return uniq, [index.get_indexer(v) for v in values]
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % ALIGN))
+
+def write_table(path: Path, columns, dicts=None, meta=None):
+    """
+    columns: {이름: 숫자 배열 | 문자열 목록 | (사전 이름, 코드 배열)}  (모두 같은 길이, 순서 유지)
+    dicts:   {사전 이름: 문자열 목록}  (코드 배열 컬럼이 참조)
+    문자열 목록 컬럼은 컬럼 이름의 사전으로 자동 인코딩. 원자적 교체(os.replace)
+    """
+    path = Path(path)
+    dicts = {k: list(v) for k, v in (dicts or {}).items()}
+    cols = []
+    for name, col in columns.items():
+        if isinstance(col, tuple):
+            dname, codes = col
+            if dname not in dicts:
+                raise KeyError(f"column {name!r} refers to unknown dictionary {dname!r}")
+        else:
+            arr = np.asarray(col)
+            if arr.dtype.kind in "biuf":
+                cols.append((name, arr, None))
+                continue
+            dname = name
+            dicts[dname], (codes,) = dict_encode(arr)
+        codes = np.asarray(codes)
+        if len(codes) and (codes.min() < 0 or codes.max() >= len(dicts[dname])):
+            raise ValueError(f"column {name!r}: codes out of range for dictionary {dname!r}")
+        cols.append((name, codes.astype(code_dtype(len(dicts[dname]))), dname))
+    rows = {len(arr) for _, arr, _ in cols}
+    if len(rows) > 1:
+        raise ValueError(f"columns differ in length: {sorted(rows)}")
+
+    # 블록 배치: 헤더 길이를 모르므로 블록 오프셋은 데이터 시작 기준 -> 헤더 뒤에 더함
+    blocks, pos = [], 0
+    def place(data):
+        nonlocal pos
+        pos += -pos % ALIGN
+        blocks.append((pos, data))
+        pos += len(data)
+        return blocks[-1][0]
+    header = {"schema": SCHEMA_VERSION, "rows": rows.pop() if rows else 0, "meta": dict(meta or {}),
+              "columns": [], "dicts": {}}
+    for dname, values in dicts.items():
+        raw = [v.encode("utf-8") for v in values]
+        offsets = np.zeros(len(raw) + 1, dtype="<i8")
+        np.cumsum([len(b) for b in raw], out=offsets[1:])
+        data = b"".join(raw)
+        header["dicts"][dname] = {"count": len(raw), "offsets": place(offsets.tobytes()),
+                                  "data": place(data), "nbytes": len(data)}
+    for name, arr, dname in cols:
+        arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder("<"))
+        header["columns"].append({"name": name, "dtype": arr.dtype.str, "offset": place(arr.tobytes()),
+                                  "dict": dname})
+
+    text = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    start = len(MAGIC) + 4 + len(text)
+    start += -start % ALIGN
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(text)) + text)
+        _pad(f)
+        for off, data in blocks:
+            f.write(b"\0" * (start + off - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+# ----------------------------
+# Read
+# ----------------------------
+class Table:
+    """Table.open() 결과. column() 은 memmap 위의 view (복사 없음)"""
+    def __init__(self, path: Path, buf, header, start):
+        self.path = Path(path)
+        self.buf = buf
+        self.rows = int(header["rows"])
+        self.meta = header.get("meta", {})
+        self._start = start
+        self._cols = {c["name"]: c for c in header["columns"]}
+        self._dicts = header.get("dicts", {})
+        self._decoded = {}
+
+    @classmethod
+    def open(cls, path: Path):
+        """매직/스키마 버전이 다르면 ValueError"""
+        path = Path(path)
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(buf[:4]) != MAGIC:
+            raise ValueError(f"{path.name}: not a columnar table")
+        (n,) = struct.unpack("<I", bytes(buf[4:8]))
+        header = json.loads(bytes(buf[8:8 + n]).decode("utf-8"))
+        if header.get("schema") != SCHEMA_VERSION:
+            raise ValueError(f"{path.name}: schema {header.get('schema')} (expected {SCHEMA_VERSION})")
+        start = 8 + n
+        return cls(path, buf, header, start + (-start % ALIGN))
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def columns(self):
+        return list(self._cols)
+
+    def _view(self, offset, dtype, count):
+        dtype = np.dtype(dtype)
+        lo = self._start + offset
+        return self.buf[lo:lo + dtype.itemsize * count].view(dtype)
+
+    def column(self, name):
+        """숫자 배열 또는 (사전 컬럼이면) 코드 배열"""
+        c = self._cols[name]
+        return self._view(c["offset"], c["dtype"], self.rows)
+
+    def dict_name(self, name):
+        return self._cols[name]["dict"]
+
+    def dictionary(self, dname):
+        """사전 문자열 목록 (처음 한 번 디코드)"""
+        if dname not in self._decoded:
+            d = self._dicts[dname]
+            offsets = self._view(d["offsets"], "<i8", d["count"] + 1).tolist()
+            data = bytes(self._view(d["data"], np.uint8, d["nbytes"]))
+            self._decoded[dname] = [data[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+        return self._decoded[dname]
+
+    def strings(self, name):
+        """사전 컬럼 -> 문자열 object 배열"""
+        return np.asarray(self.dictionary(self.dict_name(name)), dtype=object)[self.column(name)]
+
+    def to_frame(self):
+        """pandas DataFrame (사전 컬럼은 Categorical -> 행마다 문자열을 만들지 않음)"""
+        out = {}
+        for name, c in self._cols.items():
+            if c["dict"] is None:
+                out[name] = self.column(name)
+            else:
+                out[name] = pd.Categorical.from_codes(self.column(name).astype(np.int64),
+                                                      categories=self.dictionary(c["dict"]))
+        return pd.DataFrame(out)
+
+def read_table(path: Path):
+    """Table.open 의 별칭"""
+    return Table.open(path)
+
+# ----------------------------
+# CSV -> .col
+# ----------------------------
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("csv", type=Path)
+    ap.add_argument("out", type=Path)
+    ap.add_argument("--dict", default="", help="Comma-separated columns to store as dictionary-encoded text even if "
+                                               "they parse as numbers (text columns always are).")
+    args = ap.parse_args()
+    from ingest import read_csv_kr
+    df = read_csv_kr(args.csv, raw=False)
+    columns = {}
+    for c in df.columns:
+        s = df[c]
+        columns[c] = s.to_numpy() if pd.api.types.is_numeric_dtype(s) and c not in args.dict.split(",") \
+            else s.fillna("").astype(str).tolist()
+    write_table(args.out, columns, meta={"source": args.csv.name})
+    print(f"[OK] Wrote {args.out.name} ({len(df)} rows, {args.out.stat().st_size/1024:.0f} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSR(compressed sparse row) 그래프 + 정수 배열 기반 다익스트라
+
+  offsets  int32 (V+1)   노드 u의 간선 = [offsets[u], offsets[u+1])
+  targets  int32 (E)     도착 노드
+  weights  int32 (E)     초
+  kinds    uint8 (E)     EDGE_RIDE / EDGE_TRANSFER / EDGE_WALK
+
+export 스크립트의 adj(defaultdict(list))에서 한 번 만들고, 출발역마다 재사용한다.
+탐색은 scipy.sparse.csgraph(C 구현)에 맡긴다 -> 파이썬 heapq 루프보다 수 배 빠름.
+dwell(정차시간) 규칙은 상태 확장 그래프(노드 v = 환승 도착, V+v = ride 도착)로 표현하고,
+station_rows_dwell 은 여러 출발역을 한 번의 배치 호출로 푼다.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as _csgraph_dijkstra
+
+EDGE_RIDE, EDGE_TRANSFER, EDGE_WALK = 0, 1, 2
+INF = 10**15  # export 스크립트의 도달 불가 값과 동일
+
+
+def _min_weight_matrix(n, us, vs, ws):
+    """(u, v) 중복 간선은 최소 가중치만 남긴 n×n csr_matrix (csr_matrix는 중복을 합산하므로)"""
+    us, vs, ws = (np.asarray(x, dtype=np.int64) for x in (us, vs, ws))
+    order = np.lexsort((ws, vs, us))
+    us, vs, ws = us[order], vs[order], ws[order]
+    keep = np.ones(len(us), dtype=bool)
+    keep[1:] = (us[1:] != us[:-1]) | (vs[1:] != vs[:-1])
+    return csr_matrix((ws[keep].astype(np.float64), (us[keep], vs[keep])), shape=(n, n))
+
+
+class CSRGraph:
+    def __init__(self, offsets, targets, weights, kinds):
+        self.offsets = np.asarray(offsets, dtype=np.int32)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.int32)
+        self.kinds = np.asarray(kinds, dtype=np.uint8)
+        self.num_nodes = len(self.offsets) - 1
+        self._plain = None
+        self._expanded = {}  # dwell 키 -> 상태 확장 행렬 (한 번 만들고 재사용)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.targets.nbytes + self.weights.nbytes + self.kinds.nbytes
+
+    @classmethod
+    def from_edges(cls, num_nodes, us, vs, ws, kinds):
+        """간선 목록(u, v, 초, 종류) -> CSR. 같은 u 안에서는 입력 순서 유지"""
+        us = np.asarray(us, dtype=np.int64)
+        order = np.argsort(us, kind="stable")
+        counts = np.bincount(us, minlength=num_nodes)
+        offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(offsets, np.asarray(vs)[order], np.asarray(ws)[order], np.asarray(kinds)[order])
+
+    @classmethod
+    def from_adj(cls, adj, num_nodes):
+        """
+        export 스크립트 인접 리스트 -> CSR
+        adj[u] -> [(v, sec)] 또는 [(v, sec, is_transfer)]
+        """
+        us, vs, ws, kinds = [], [], [], []
+        for u in range(num_nodes):
+            for e in adj.get(u, []):
+                us.append(u); vs.append(e[0]); ws.append(int(e[1]))
+                kinds.append(EDGE_TRANSFER if len(e) > 2 and e[2] else EDGE_RIDE)
+        return cls.from_edges(num_nodes, us, vs, ws, kinds)
+
+    def with_weights(self, weights):
+        """같은 구조(offsets/targets/kinds)에 가중치만 바꾼 그래프 (시나리오별)"""
+        return CSRGraph(self.offsets, self.targets, weights, self.kinds)
+
+    def sources(self):
+        """간선별 출발 노드 (E,)"""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.offsets))
+
+    def neighbors(self, u):
+        a, b = self.offsets[u], self.offsets[u + 1]
+        return self.targets[a:b], self.weights[a:b], self.kinds[a:b]
+
+    def plain_matrix(self):
+        if self._plain is None:
+            self._plain = _min_weight_matrix(self.num_nodes, self.sources(), self.targets, self.weights)
+        return self._plain
+
+    def expanded_matrix(self, dwell_sec):
+        """
+        상태 확장 그래프 (2V 노드): v = 환승 간선으로 도착, V+v = ride 간선으로 도착(dwell 포함)
+        두 상태 모두 같은 간선으로 나갈 수 있다 -> dijkstra_multi_modes 와 같은 의미
+        dwell_sec: 정수 또는 (V,) 노드별 dwell (도착 노드 기준, 호선별 dwell 시나리오)
+        """
+        key = dwell_sec if np.isscalar(dwell_sec) else np.asarray(dwell_sec, dtype=np.int64).tobytes()
+        m = self._expanded.get(key)
+        if m is None:
+            V = self.num_nodes
+            us = self.sources()
+            transfer = self.kinds == EDGE_TRANSFER
+            dst = np.where(transfer, self.targets, V + self.targets)
+            dwell = dwell_sec if np.isscalar(dwell_sec) else np.asarray(dwell_sec, dtype=np.int64)[self.targets]
+            w = self.weights.astype(np.int64) + np.where(transfer, 0, dwell)
+            m = self._expanded[key] = _min_weight_matrix(
+                2 * V, np.concatenate([us, V + us]), np.concatenate([dst, dst]), np.concatenate([w, w]))
+        return m
+
+    @staticmethod
+    def _to_int(dist):
+        """csgraph float 거리 -> int64 (도달 불가 INF)"""
+        return np.where(np.isinf(dist), INF, dist).astype(np.int64)
+
+    def dijkstra(self, sources):
+        """다중 출발 다익스트라 -> (V,) int64 초 (도달 불가 INF)"""
+        dist = _csgraph_dijkstra(self.plain_matrix(), indices=list(sources), min_only=True)
+        return self._to_int(dist)
+
+    def dijkstra_dwell(self, sources, dwell_sec):
+        """
+        export_times_with_stop.dijkstra_multi_modes 와 같은 상태 분리 탐색
+        - distT[v]: 환승 간선으로 도착 (dwell 없음), distR[v]: ride 간선으로 도착 (dwell 포함)
+        -> ((V,), (V,)) int64
+        """
+        dist = _csgraph_dijkstra(self.expanded_matrix(dwell_sec), indices=list(sources), min_only=True)
+        out = self._to_int(dist)
+        return out[:self.num_nodes], out[self.num_nodes:]
+
+    def station_rows_dwell(self, source_groups, node_station, num_stations, dwell_sec):
+        """
+        여러 출발역을 한 번의 csgraph 호출로: source_groups[i] = i번째 출발역의 노드 목록
+        -> (len(source_groups), num_stations) int64 = best_per_station_dwell 를 역마다 돌린 것과 같음
+        (다중 출발 최단거리 = 각 출발 노드 최단거리의 최소). dwell_sec 는 정수 또는 (V,) 노드별
+        """
+        V = self.num_nodes
+        lens = [len(g) for g in source_groups]
+        nodes = np.concatenate([np.asarray(g, dtype=np.int64) for g in source_groups])
+        dist = _csgraph_dijkstra(self.expanded_matrix(dwell_sec), indices=nodes)  # (노드 수, 2V)
+        starts = np.concatenate(([0], np.cumsum(lens)[:-1]))
+        dist = np.minimum.reduceat(dist, starts, axis=0)  # 출발역별 (G, 2V)
+        # 도착역 dwell 1회 제거 후 노드 -> 역 최소
+        ride = np.maximum(dist[:, V:] - dwell_sec, 0)  # inf는 그대로 inf
+        node_best = np.minimum(dist[:, :V], ride)
+        col_order = np.argsort(node_station, kind="stable")
+        col_station = np.asarray(node_station)[col_order]
+        col_starts = np.flatnonzero(np.concatenate(([True], col_station[1:] != col_station[:-1])))
+        best = np.full((len(source_groups), num_stations), np.inf)
+        best[:, col_station[col_starts]] = np.minimum.reduceat(node_best[:, col_order], col_starts, axis=1)
+        return self._to_int(best)
+
+    def station_routes(self, source_groups, node_station, num_stations, dwell_sec=None):
+        """
+        출발역별 최단경로 트리 -> (pred (G, X) int16, end (G, S) int16)
+        X = V (dwell_sec=None, 일반 그래프) 또는 2V (상태 확장 그래프), 상태 x 의 노드 = x % V
+        pred[g, x] = 최단경로에서 x 직전 상태 (-1 = 출발 노드 또는 도달 불가)
+        end[g, d]  = 도착역 d 에 가장 빨리 닿는 상태 (-1 = 도달 불가)
+        -> 경로 복원은 end 에서 pred 를 따라가는 O(경로 길이)
+        """
+        V = self.num_nodes
+        m = self.plain_matrix() if dwell_sec is None else self.expanded_matrix(dwell_sec)
+        X = m.shape[0]
+        if X > np.iinfo(np.int16).max:
+            raise ValueError(f"{X} states do not fit int16 predecessor arrays")
+        state_station = np.asarray(node_station)[np.arange(X) % V]
+        pred = np.empty((len(source_groups), X), dtype=np.int16)
+        end = np.full((len(source_groups), num_stations), -1, dtype=np.int16)
+        for g, nodes in enumerate(source_groups):
+            dist, p, _ = _csgraph_dijkstra(m, indices=list(nodes), min_only=True, return_predecessors=True)
+            if dwell_sec is not None:  # ride 도착 상태는 도착역 dwell 1회 제거 (station_rows_dwell 과 같은 값)
+                dist[V:] = np.maximum(dist[V:] - dwell_sec, 0)
+            pred[g] = np.where(p < 0, -1, p)
+            # 역마다 최소 거리 상태 (동률이면 작은 상태 번호)
+            order = np.lexsort((np.arange(X), dist, state_station))
+            first = order[np.concatenate(([True], state_station[order][1:] != state_station[order][:-1]))]
+            first = first[np.isfinite(dist[first])]
+            end[g, state_station[first]] = first
+        return pred, end
+
+
+def best_per_station(dist, node_station, num_stations):
+    """(V,) 노드 거리 -> (S,) 역별 최소 (node_station[v] = 역 인덱스)"""
+    best = np.full(num_stations, INF, dtype=np.int64)
+    np.minimum.at(best, node_station, dist)
+    return best
+
+
+def best_per_station_dwell(dist_t, dist_r, node_station, num_stations, dwell_sec):
+    """best_seconds_for_station 의 벡터화: 역별 min(distT, distR - dwell) (도착역 dwell 1회 제거)"""
+    ride = np.where(dist_r < INF, np.maximum(dist_r - dwell_sec, 0), INF)
+    return best_per_station(np.minimum(dist_t, ride), node_station, num_stations)
+
+
+# ----------------------------
+# 스냅샷 (증분 갱신용)
+# ----------------------------
+def save_snapshot(path, graph, id_node, dwell_sec):
+    """CSR 배열 + (역, 호선) 노드 표 + dwell 을 <path>(.npz)로 저장"""
+    np.savez(path, offsets=graph.offsets, targets=graph.targets, weights=graph.weights, kinds=graph.kinds,
+             node_station=np.array([st for st, ln in id_node], dtype=str),
+             node_line=np.array([ln for st, ln in id_node], dtype=str),
+             dwell_sec=np.int64(dwell_sec))
+
+
+def load_snapshot(path):
+    """-> (CSRGraph, id_node, dwell_sec)"""
+    with np.load(path) as z:
+        graph = CSRGraph(z["offsets"], z["targets"], z["weights"], z["kinds"])
+        id_node = list(zip(z["node_station"].tolist(), z["node_line"].tolist()))
+        return graph, id_node, int(z["dwell_sec"])
+
+
+def changed_edges(old, new, dwell_sec):
+    """
+    두 그래프(같은 노드 id)의 상태 확장 간선 비교
+    -> (x, y, 이전 가중치, 새 가중치) 배열들. 없는 간선은 inf
+    """
+    a = old.expanded_matrix(dwell_sec).tocoo()
+    b = new.expanded_matrix(dwell_sec).tocoo()
+    n = a.shape[0]
+    old_w = dict(zip((a.row.astype(np.int64) * n + a.col).tolist(), a.data.tolist()))
+    new_w = dict(zip((b.row.astype(np.int64) * n + b.col).tolist(), b.data.tolist()))
+    keys = np.array(sorted(k for k in old_w.keys() | new_w.keys() if old_w.get(k) != new_w.get(k)), dtype=np.int64)
+    w_old = np.array([old_w.get(k, np.inf) for k in keys.tolist()], dtype=np.float64)
+    w_new = np.array([new_w.get(k, np.inf) for k in keys.tolist()], dtype=np.float64)
+    return keys // n, keys % n, w_old, w_new
+
+
+def affected_sources(old, source_groups, dwell_sec, xs, ys, w_old, w_new):
+    """
+    간선 변경으로 최단거리가 바뀔 수 있는 출발역 (source_groups 인덱스 bool 배열).
+    이전 그래프의 역방향 탐색(변경 간선 끝점마다 1회)으로 d(출발역 -> x), d(출발역 -> y)를 구해
+    - 감소/추가: d(s,x) + w_new < d(s,y)      (이전 거리가 새 그래프에서 더 이상 최단이 아님)
+    - 증가/삭제: d(s,x) + w_old == d(s,y) < inf (그 간선이 이전 최단경로 위에 있었음)
+    둘 다 아니면 이전 거리가 새 그래프에서도 그대로 최단이다.
+    """
+    affected = np.zeros(len(source_groups), dtype=bool)
+    if not len(xs):
+        return affected
+    ends = np.unique(np.concatenate([xs, ys]))
+    pos = {int(e): i for i, e in enumerate(ends)}
+    # to_dist[i, v] = d(v -> ends[i]) (이전 그래프, 역방향)
+    to_dist = _csgraph_dijkstra(old.expanded_matrix(dwell_sec).T.tocsr(), indices=ends)
+    lens = [len(g) for g in source_groups]
+    nodes = np.concatenate([np.asarray(g, dtype=np.int64) for g in source_groups])
+    starts = np.concatenate(([0], np.cumsum(lens)[:-1]))
+    # 출발역(환승 상태 노드 집합) -> 끝점 거리 (G, len(ends))
+    d = np.minimum.reduceat(to_dist[:, nodes].T, starts, axis=0)
+    dx = d[:, [pos[int(x)] for x in xs]]
+    dy = d[:, [pos[int(y)] for y in ys]]
+    improves = (w_new < w_old) & (dx + w_new < dy)
+    was_tight = (w_new > w_old) & np.isfinite(dy) & (dx + w_old == dy)
+    return (improves | was_tight).any(axis=1)
@@ -16,193 +16,52 @@ Dwell:
 
 Output:
 - 기본 파일명은 station_pairs_all_with_stop.csv (stop 포함)
+- 같은 이름의 .npy(N×N uint16 초 행렬) + .stations.csv(역 id 표) — backend가 mmap으로 읽음
+- .pred.npy/.end.npy/.nodes.csv(int16 최단경로 트리, --no-routes 로 생략) — backend /api/route 용
+- .pairs.col: CSV 와 같은 행의 열 단위 표 (colstore 포맷, --no-csv 면 CSV 는 생략하고 이것만)
+- .graph.npz(그래프 스냅샷) — --incremental 이면 바뀐 간선에 영향받는 출발역 행만 다시 계산하고
+  바뀐 쌍을 .diff.csv 로 남긴다 (노드 구성/dwell 이 달라졌으면 전체 재계산)
+- --engine contracted: 환승 없는 호선 중간 역 체인을 super-edge 로 축약한 코어 그래프에서 탐색 (출력 동일)
 """
-import argparse, csv, re, heapq
+import argparse, csv, io, heapq
+import multiprocessing as mp
+from itertools import compress, repeat
 from pathlib import Path
 from collections import defaultdict
+import numpy as np
+from matrix_store import (UNREACHABLE, new_time_matrix, check_seconds, write_time_matrix,
+                          read_time_matrix, graph_snapshot_path, write_route_arrays,
+                          matrix_pairs, write_pairs_table)
+from csr_graph import (CSRGraph, best_per_station_dwell, INF,
+                       save_snapshot, load_snapshot, changed_edges, affected_sources)
+from chain_graph import ChainContraction
+from ingest import (load_ride_edges, load_transfer_times, normalize_line_label,
+                    to_graph_line_label)
 
 BASE = Path(".")
 MERGED = BASE / "merged_clean.csv"
 TRANSFER_TIMES = BASE / "transfer_times.csv"
 
 # ----------------------------
-# I/O helpers
+# Loaders (파싱 규칙은 ingest.py 한 곳: 소요시간 숫자 = 초)
 # ----------------------------
-def open_csv_kr(path: Path):
-    for enc in ("utf-8-sig","utf-8","cp949","euc-kr"):
-        try:
-            f = open(path, "r", encoding=enc, newline="")
-            f.readline(); f.seek(0)
-            return f
-        except Exception:
-            pass
-    raise RuntimeError(f"Failed to open: {path} with common encodings")
-
-def safe_strip(x):
-    return str(x).strip() if x is not None else ""
-
-def norm_colnames(names): return [str(c).strip().lower() for c in names]
-
-def pick_col(names, candidates):
-    low = norm_colnames(names)
-    for cand in candidates:
-        if cand in low:
-            return names[low.index(cand)]
-    return None
-
-# ----------------------------
-# Time parsing  (STRICT SECONDS)
-# ----------------------------
-def parse_seconds_strict(x):
-    """
-    문자열/숫자를 '초'로 파싱.
-    - 'M:SS'만 분:초로 인식해 초 환산
-    - 그 외 숫자(정수/실수, 천단위 콤마 포함)는 '그 값 그대로 초'
-    - 절대 ×60 안 함
-    """
-    if x is None: return None
-    s = str(x).strip().replace(",", "")
-    if not s: return None
-    m = re.match(r"^(\d+):(\d{2})$", s)
-    if m:
-        return int(m.group(1))*60 + int(m.group(2))
-    try:
-        return int(round(float(s)))
-    except Exception:
-        return None
-
 def to_minutes(sec:int)->int:
     return int(sec)//60
 
-# ----------------------------
-# Label normalize
-# ----------------------------
-def normalize_line_label(s: str) -> str:
-    """통일된 호선 라벨: '9호선', '9호선급행' 등. 비숫자 라벨은 공백 제거만."""
-    s = safe_strip(s).replace(" ", "")
-    s = s.replace("(급행)", "급행").replace("[급행]", "급행")
-    m = re.match(r"^(\d+)(호선)?(급행)?$", s)
-    if m:
-        base = f"{m.group(1)}호선"
-        return base + ("급행" if m.group(3) else "")
-    return s
-
-def to_graph_line_label(s: str) -> str:
-    s = safe_strip(s)
-    m1 = re.match(r"^(\d+)$", s)
-    if m1: return f"{m1.group(1)}호선"
-    m2 = re.match(r"^(\d+)\s*호선$", s)
-    if m2: return f"{m2.group(1)}호선"
-    return normalize_line_label(s)
-
-# ----------------------------
-# Loaders
-# ----------------------------
 def load_ride_edges_from_merged(merged_path: Path):
     """
     merged_clean.csv에서 호선 내 이웃역 간 소요(초)를 읽어 라이드 간선 생성
     반환: ([(line, a, b, seconds), ...], station_to_lines)
     """
-    edges = []
-    station_to_lines = defaultdict(set)
-    with open_csv_kr(merged_path) as f:
-        rdr = csv.DictReader(f)
-        cols = rdr.fieldnames or []
-        col_line = pick_col(cols, ["line","호선","line_id","노선","노선명"])
-        col_from = pick_col(cols, ["from_station","출발역","from","시작역","전역_clean"])
-        col_to   = pick_col(cols, ["to_station","도착역","to","끝역","역명_clean"])
-        # 초 확정 컬럼(있으면 사용)
-        col_sec  = pick_col(cols, ["seconds","sec","time_sec","duration_s","소요초","소요시간(초)"])
-        # 표현형 컬럼(여기 포함값은 parse_seconds_strict로 처리)
-        col_expr = pick_col(cols, ["mmss","소요시간","time","duration"])
-
-        if col_line and col_from and col_to and (col_sec or col_expr):
-            for row in rdr:
-                ln = normalize_line_label(row[col_line])
-                a  = safe_strip(row[col_from]); b = safe_strip(row[col_to])
-                if not a or not b or not ln: continue
-                raw = None
-                if col_sec and row.get(col_sec) not in (None,""): raw = row[col_sec]
-                elif col_expr and row.get(col_expr) not in (None,""): raw = row[col_expr]
-                sec = parse_seconds_strict(raw)
-                if not sec or sec <= 0: continue
-                edges.append((ln, a, b, int(sec)))
-                station_to_lines[a].add(ln); station_to_lines[b].add(ln)
-        else:
-            # 연속역 표(누계/구간소요)에서 이웃 추출
-            col_line = pick_col(cols, ["line","호선","line_id","노선","노선명"])
-            col_st   = pick_col(cols, ["역명","station","station_name","name"])
-            col_sec  = pick_col(cols, ["seconds","sec","time_sec","duration_s","소요초","소요시간(초)"])
-            col_expr = pick_col(cols, ["mmss","소요시간","time","duration"])
-            col_cum  = pick_col(cols, ["호선별누계(km)","누계","누계km","cumulative_km"])
-            if not (col_line and col_st and (col_sec or col_expr)):
-                raise RuntimeError("merged_clean.csv schema not detected.")
-            prev = {}
-            for row in rdr:
-                ln = normalize_line_label(row[col_line])
-                st = safe_strip(row[col_st])
-                station_to_lines[st].add(ln)
-                raw = None
-                if col_sec and row.get(col_sec) not in (None,""): raw = row[col_sec]
-                elif col_expr and row.get(col_expr) not in (None,""): raw = row[col_expr]
-                sec = parse_seconds_strict(raw)
-                cum = None
-                if col_cum and row.get(col_cum):
-                    try: cum = float(row[col_cum])
-                    except Exception: cum = None
-                if ln in prev:
-                    pst, pc = prev[ln]
-                    if sec and sec>0 and not (pc is not None and cum is not None and cum < pc):
-                        edges.append((ln, pst, st, int(sec)))
-                prev[ln] = (st, cum)
-
-    # 중복 제거(동일 호선 내 무방향 간선)
-    seen=set(); dedup=[]
-    for ln,a,b,sec in edges:
-        key=(ln,a,b,sec); rev=(ln,b,a,sec)
-        if key in seen or rev in seen: continue
-        seen.add(key); seen.add(rev); dedup.append((ln,a,b,sec))
-    return dedup, station_to_lines
+    return load_ride_edges(merged_path, rule="seconds", line_label=normalize_line_label)
 
 def load_transfer_times_csv(path: Path):
     """
     transfer_times.csv 읽기
     - per_station: {역명: sec}
     - per_pair: {(역명, line_from, line_to): sec}   (양방향은 자동 대응)
-    * 초 단위로 엄격 파싱. 표현형은 parse_seconds_strict로 처리.
     """
-    per_station = {}
-    per_pair = {}
-    with open_csv_kr(path) as f:
-        rdr = csv.DictReader(f)
-        cols = rdr.fieldnames or []
-        c_station = pick_col(cols, ["station","역","역명","station_name","환승역명"])
-        c_lfrom   = pick_col(cols, ["line_from","from_line","linefrom","출발호선","호선from","호선"])
-        c_lto     = pick_col(cols, ["line_to","to_line","lineto","도착호선","호선to","환승노선"])
-        # seconds 후보(확실한 '초' 명시)
-        c_sec     = pick_col(cols, ["transfer_seconds","seconds","sec","소요초","환승초","환승시간(초)"])
-        # 표현형 후보
-        c_expr    = pick_col(cols, ["mmss","소요시간","환승시간","time","환승소요시간"])
-        if not c_station:
-            raise RuntimeError("transfer_times.csv must include 'station' column")
-        for row in rdr:
-            st = safe_strip(row[c_station])
-            if not st: 
-                continue
-            raw = None
-            if c_sec and row.get(c_sec) not in (None,""): raw = row[c_sec]
-            elif c_expr and row.get(c_expr) not in (None,""): raw = row[c_expr]
-            sec = parse_seconds_strict(raw)
-            if not sec or sec <= 0:
-                continue
-            if c_lfrom and c_lto and row.get(c_lfrom) not in (None,"") and row.get(c_lto) not in (None,""):
-                lf = normalize_line_label(to_graph_line_label(row[c_lfrom]))
-                lt = normalize_line_label(to_graph_line_label(row[c_lto]))
-                if lf and lt and lf != lt:
-                    per_pair[(st, lf, lt)] = int(sec)
-            else:
-                per_station[st] = int(sec)
-    return per_station, per_pair
+    return load_transfer_times(path, rule="seconds", line_label=to_graph_line_label)
 
 # ----------------------------
 # Graph build
@@ -253,6 +112,7 @@ def dijkstra_multi_modes(adj, sources, V, dwell_sec: int):
     - distT[v]: 환승 간선으로 v에 도착 (도착 시 dwell 미적용)
     - distR[v]: ride 간선으로 v에 도착 (도착 시 dwell 적용된 값)
     시작점은 '도착'이 아니므로 distT[s]=0으로 시작.
+    (참조 구현: main은 같은 의미의 CSRGraph.dijkstra_dwell 사용)
     """
     INF = 10**15
     distT = [INF]*V
@@ -294,6 +154,141 @@ def best_seconds_for_station(distT, distR, nodes, dwell_sec):
                 best = cand
     return best
 
+# ----------------------------
+# All-pairs (출발역 청크 단위, 병렬 가능)
+# ----------------------------
+_WORK = None  # main()이 채우는 공유 컨텍스트 dict - fork 시 워커와 copy-on-write 공유
+ENGINES = ("batched", "contracted", "per-source", "python")
+
+def chunk_best_rows(srcs):
+    """
+    출발역 목록 -> 역별 최단 초 행 목록 (역 인덱스 순, 도달 불가 INF)
+    - batched:    상태 확장 그래프를 청크 단위 csgraph 호출 한 번으로
+    - contracted: 차수 2 체인을 축약한 코어 그래프로 batched 와 같은 호출 (chain_graph.ChainContraction)
+    - per-source: 출발역마다 CSRGraph.dijkstra_dwell
+    - python:     dijkstra_multi_modes + best_seconds_for_station (참조 구현)
+    """
+    W = _WORK
+    station_to_nodes, node_station, num_stations, dwell_sec = \
+        W["station_to_nodes"], W["node_station"], len(W["stations"]), W["dwell_sec"]
+    if W["engine"] == "batched":
+        groups = [station_to_nodes[s] for s in srcs]
+        return W["graph"].station_rows_dwell(groups, node_station, num_stations, dwell_sec).tolist()
+    if W["engine"] == "contracted":
+        groups = [station_to_nodes[s] for s in srcs]
+        return W["contracted"].station_rows_dwell(groups, node_station, num_stations).tolist()
+    rows = []
+    for s in srcs:
+        if W["engine"] == "per-source":
+            distT, distR = W["graph"].dijkstra_dwell(station_to_nodes[s], dwell_sec)
+            rows.append(best_per_station_dwell(distT, distR, node_station, num_stations, dwell_sec).tolist())
+        else:
+            distT, distR = dijkstra_multi_modes(W["adj"], station_to_nodes[s], W["graph"].num_nodes, dwell_sec)
+            row = [INF]*num_stations
+            for t,ti in W["targets"]:
+                row[ti] = best_seconds_for_station(distT, distR, station_to_nodes[t], dwell_sec)
+            rows.append(row)
+    return rows
+
+def export_source_chunk(bounds):
+    """
+    출발역 stations[lo:hi] -> (lo, CSV 텍스트, (hi-lo, N) uint16 행렬 행)
+    직렬/병렬, 모든 엔진이 이 함수로 만들므로 출력이 같다.
+    """
+    stations, target_names, target_idx = _WORK["stations"], _WORK["target_names"], _WORK["target_idx"]
+    lo, hi = bounds
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    rows = np.full((hi-lo, len(stations)), UNREACHABLE, dtype=np.uint16)
+    for si, best_row in zip(range(lo, hi), chunk_best_rows(stations[lo:hi])):
+        s = stations[si]
+        rows[si-lo, si] = 0
+        # 출력 순서(노드 등장 순)대로, 자기 자신과 도달 불가 제외
+        vals = np.asarray(best_row, dtype=np.int64)[target_idx]
+        mask = (vals < INF) & (target_idx != si)
+        sel = vals[mask]
+        if len(sel):
+            check_seconds(sel.max())
+        rows[si-lo, target_idx[mask]] = sel
+        if _WORK.get("csv", True):
+            w.writerows(zip(repeat(s), compress(target_names, mask), sel.tolist(), (sel // 60).tolist()))
+    return lo, buf.getvalue(), rows
+
+def run_source_chunks(num_stations, workers, chunks=None):
+    """출발역을 청크로 나눠 (lo, text, rows)를 출발역 순서대로 돌려준다. chunks: 직접 지정한 (lo, hi) 목록"""
+    if chunks is None:
+        size = max(1, min(64, -(-num_stations // (max(workers, 1) * 4))))
+        chunks = [(lo, min(lo+size, num_stations)) for lo in range(0, num_stations, size)]
+    if workers <= 1:
+        yield from map(export_source_chunk, chunks)
+        return
+    if "fork" in mp.get_all_start_methods():
+        ctx, init, initargs = mp.get_context("fork"), None, ()
+    else:  # fork 불가 플랫폼: 컨텍스트를 워커마다 한 번 전달
+        ctx, init, initargs = mp.get_context("spawn"), _init_worker, (_WORK,)
+    with ctx.Pool(workers, initializer=init, initargs=initargs) as pool:
+        # imap은 입력 순서대로 결과를 돌려줌 -> 병합 결과가 결정적
+        yield from pool.imap(export_source_chunk, chunks)
+
+def _init_worker(work):
+    global _WORK
+    _WORK = work
+
+def write_pairs_from_matrix(f, mat):
+    """행렬 -> 전체 쌍 CSV 행 (export_source_chunk 와 같은 순서/값)"""
+    stations, target_names, target_idx = _WORK["stations"], _WORK["target_names"], _WORK["target_idx"]
+    w = csv.writer(f)
+    for si, s in enumerate(stations):
+        vals = mat[si, target_idx].astype(np.int64)
+        mask = (vals != UNREACHABLE) & (target_idx != si)
+        sel = vals[mask]
+        w.writerows(zip(repeat(s), compress(target_names, mask), sel.tolist(), (sel // 60).tolist()))
+
+# ----------------------------
+# Incremental update
+# ----------------------------
+def incremental_update(out_all: Path, graph, id_node, workers):
+    """
+    이전 스냅샷(.graph.npz)과 새 그래프의 바뀐 간선으로 영향받는 출발역만 다시 계산
+    -> (갱신된 행렬, [(출발역, 도착역, 이전 초, 새 초)])
+       이전 결과가 없거나 노드 구성/dwell 이 다르면 None (전체 재계산)
+    """
+    stations, station_to_nodes, dwell_sec = _WORK["stations"], _WORK["station_to_nodes"], _WORK["dwell_sec"]
+    snap = graph_snapshot_path(out_all)
+    old_stations, mat = read_time_matrix(out_all)
+    if mat is None or not snap.exists():
+        print(f"[INFO] No previous {snap.name} / matrix -> full rebuild")
+        return None
+    old_graph, old_id_node, old_dwell = load_snapshot(snap)
+    if old_id_node != id_node or old_dwell != dwell_sec or old_stations != stations:
+        print("[INFO] Node set or dwell changed since last export -> full rebuild")
+        return None
+
+    xs, ys, w_old, w_new = changed_edges(old_graph, graph, dwell_sec)
+    groups = [station_to_nodes[s] for s in stations]
+    affected = np.flatnonzero(affected_sources(old_graph, groups, dwell_sec, xs, ys, w_old, w_new))
+    print(f"[INFO] Changed edges={len(xs)} (state-expanded), affected sources={len(affected)}/{len(stations)}")
+
+    # 영향받는 출발역을 연속 구간 -> 최대 64개 청크로
+    chunks = []
+    for run in np.split(affected, np.flatnonzero(np.diff(affected) != 1) + 1) if len(affected) else []:
+        for lo in range(int(run[0]), int(run[-1]) + 1, 64):
+            chunks.append((lo, min(lo+64, int(run[-1]) + 1)))
+    changes = []
+    for lo, _, rows in run_source_chunks(len(stations), workers, chunks):
+        old = mat[lo:lo+len(rows)]
+        for r, c in zip(*np.nonzero(rows != old)):
+            changes.append((stations[lo+r], stations[c], int(old[r, c]), int(rows[r, c])))
+        mat[lo:lo+len(rows)] = rows
+    return mat, changes
+
+def write_diff_csv(path: Path, changes):
+    """바뀐 쌍: src_station,dst_station,old_seconds,new_seconds (도달 불가는 빈 칸)"""
+    def cell(sec): return "" if sec == UNREACHABLE else sec
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f); w.writerow(["src_station","dst_station","old_seconds","new_seconds"])
+        w.writerows((s, t, cell(a), cell(b)) for s, t, a, b in changes)
+
 # ----------------------------
 # Main
 # ----------------------------
@@ -306,10 +301,23 @@ def main():
                     help="Per-stop dwell seconds for intermediate stations (applied on arrival via ride).")
     ap.add_argument("--out-all", type=Path, default=BASE/"station_pairs_all_with_stop.csv")
     ap.add_argument("--source-station", type=str, default=None)
+    ap.add_argument("--engine", choices=ENGINES, default="batched",
+                    help="All-pairs solver: batched csgraph (default), batched on the chain-contracted core graph, "
+                         "per-source csgraph, or the pure-Python reference.")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Parallel worker processes for the all-pairs build (output is identical to --workers 1).")
+    ap.add_argument("--incremental", action="store_true",
+                    help="Recompute only sources affected by edge/transfer changes since the last export "
+                         "(needs the previous .npy + .graph.npz); writes changed pairs to <out>.diff.csv.")
+    ap.add_argument("--no-routes", dest="routes", action="store_false",
+                    help="Skip the predecessor arrays (.pred.npy/.end.npy/.nodes.csv) used by /api/route.")
+    ap.add_argument("--no-csv", dest="csv", action="store_false",
+                    help="Skip the all-pairs CSV (<out>.pairs.col has the same rows).")
     args = ap.parse_args()
 
     node_id, id_node, adj = build_graph(args.merged_csv, args.transfer_times_csv, args.default_transfer_sec)
     V=len(id_node)
+    graph=CSRGraph.from_adj(adj, V)  # 탐색은 정수 배열(CSR) 위에서
 
     # 역 -> 해당 역의 (역,호선) 노드 목록
     station_to_nodes=defaultdict(list)
@@ -317,28 +325,65 @@ def main():
         station_to_nodes[st].append(nid)
     stations=sorted(station_to_nodes.keys())
 
-    # 전체 쌍 출력
-    with open(args.out_all, "w", encoding="utf-8-sig", newline="") as f:
-        w=csv.writer(f); w.writerow(["src_station","dst_station","seconds","minutes"])
-        for s in stations:
-            distT, distR = dijkstra_multi_modes(adj, station_to_nodes[s], V, args.dwell_sec)
-            for t,nodes in station_to_nodes.items():
-                if t==s: continue
-                best = best_seconds_for_station(distT, distR, nodes, args.dwell_sec)
-                if best < 10**15:
-                    w.writerow([s, t, int(best), to_minutes(best)])
-    print(f"[OK] Wrote {args.out_all.name} (stations={len(stations)}, nodes={V})")
+    # 전체 쌍 출력 (CSV + 초 행렬)
+    station_idx={st:i for i,st in enumerate(stations)}
+    node_station=np.array([station_idx[st] for st,ln in id_node])
+    targets=[(t, station_idx[t]) for t in station_to_nodes]  # 출력 순서는 기존과 동일(노드 등장 순)
+    global _WORK
+    graph.expanded_matrix(args.dwell_sec)  # fork 전에 만들어 워커가 공유
+    contracted = None
+    if args.engine == "contracted":
+        contracted = ChainContraction(graph, args.dwell_sec)
+        contracted.graph.expanded_matrix(contracted.core_dwell)
+        print(f"[INFO] Chain contraction: nodes {V} -> {len(contracted.core)} core "
+              f"({contracted.num_chains} chains), search states {2*V} -> {contracted.num_states}")
+    _WORK=dict(engine=args.engine, graph=graph, adj=adj, station_to_nodes=station_to_nodes, stations=stations,
+               targets=targets, target_names=[t for t,ti in targets], target_idx=np.array([ti for t,ti in targets]),
+               node_station=node_station, dwell_sec=args.dwell_sec, contracted=contracted, csv=args.csv)
+    result = incremental_update(args.out_all, graph, id_node, args.workers) if args.incremental else None
+    if result is None:
+        mat=new_time_matrix(len(stations))
+        with open(args.out_all, "w", encoding="utf-8-sig", newline="") if args.csv else io.StringIO() as f:
+            w=csv.writer(f); w.writerow(["src_station","dst_station","seconds","minutes"])
+            for lo, text, rows in run_source_chunks(len(stations), args.workers):
+                f.write(text)
+                mat[lo:lo+len(rows)] = rows
+        if args.csv:
+            print(f"[OK] Wrote {args.out_all.name} (stations={len(stations)}, nodes={V}, engine={args.engine})")
+    else:
+        mat, changes = result
+        diff_path = args.out_all.with_suffix(".diff.csv")
+        write_diff_csv(diff_path, changes)
+        print(f"[OK] Wrote {diff_path.name} (changed pairs={len(changes)})")
+        if changes and args.csv:
+            with open(args.out_all, "w", encoding="utf-8-sig", newline="") as f:
+                csv.writer(f).writerow(["src_station","dst_station","seconds","minutes"])
+                write_pairs_from_matrix(f, mat)
+            print(f"[OK] Rewrote {args.out_all.name} from updated matrix")
+    if result is None or result[1]:
+        npy_path, st_path = write_time_matrix(args.out_all, stations, mat)
+        print(f"[OK] Wrote {npy_path.name} + {st_path.name} (uint16 seconds matrix)")
+        src, dst, secs = matrix_pairs(mat, _WORK["target_idx"])  # CSV 와 같은 행 순서
+        path = write_pairs_table(args.out_all, stations, src, dst, secs, secs // 60)
+        print(f"[OK] Wrote {path.name} ({len(secs)} pairs)")
+    if args.routes:  # 경로 트리는 싸므로 --incremental 에서도 전체를 다시 만든다
+        pred, end = graph.station_routes([station_to_nodes[s] for s in stations], node_station, len(stations),
+                                         args.dwell_sec)
+        paths = write_route_arrays(args.out_all, pred, end, id_node, station_idx)
+        print(f"[OK] Wrote {' + '.join(p.name for p in paths)} (int16 predecessor arrays)")
+    save_snapshot(graph_snapshot_path(args.out_all), graph, id_node, args.dwell_sec)
 
     # (선택) 특정 출발역 파일
     if args.source_station and args.source_station in station_to_nodes:
         out_single = BASE/f"station_pairs_from_{args.source_station}_with_stop.csv"
         with open(out_single, "w", encoding="utf-8-sig", newline="") as f:
             w=csv.writer(f); w.writerow(["src_station","dst_station","seconds","minutes"])
-            distT, distR = dijkstra_multi_modes(adj, station_to_nodes[args.source_station], V, args.dwell_sec)
-            for t,nodes in station_to_nodes.items():
+            distT, distR = graph.dijkstra_dwell(station_to_nodes[args.source_station], args.dwell_sec)
+            best_row = best_per_station_dwell(distT, distR, node_station, len(stations), args.dwell_sec).tolist()
+            for t,ti in targets:
                 if t==args.source_station: continue
-                best = best_seconds_for_station(distT, distR, nodes, args.dwell_sec)
-                if best < 10**15:
+                best = best_row[ti]
+                if best < INF:
                     w.writerow([args.source_station, t, int(best), to_minutes(best)])
         print(f"[OK] Wrote {Path(out_single).name}")
 
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+허브 라벨 인덱스 (pruned landmark labeling) - 역→역 최단시간을 행렬 없이 라벨 교집합으로
+
+그래프: (역, 호선) 노드 그래프 (--mode transfer) 또는 dwell 상태 확장 그래프 (--mode stop)
+  + 역마다 가상 출발 노드 S(역) -> 그 역의 노드 (0초)
+  + 역마다 가상 도착 노드 노드 -> D(역)   (stop: 환승 도착 c초, ride 도착 c - dwell 초, 결과에서 c를 뺌)
+라벨: 중요도 순서대로 정점마다 가지치기 다익스트라(정/역방향)를 돌려
+  L_out(u) = {(허브 h, d(u -> h))}, L_in(u) = {(허브 h, d(h -> u))}
+  d(s, t) = min_h L_out(S(s))[h] + L_in(D(t))[h]   (2-hop cover -> 정확한 최단거리)
+저장은 역의 L_out(S) / L_in(D) 뿐 (<out>.hub.npz) -> 메모리는 역 수 × 평균 라벨 크기.
+backend/hub_labels.py 가 서버 시작 시 읽는다.
+
+  python hub_labels.py --mode transfer --out-all ../backend/data/station_pairs_all_with_transfer.csv --verify
+  python hub_labels.py --mode stop --dwell-sec 40
+"""
+import argparse, heapq, time
+from collections import defaultdict
+from pathlib import Path
+import numpy as np
+from scipy.sparse.csgraph import dijkstra as _csgraph_dijkstra
+from matrix_store import read_time_matrix, write_hub_labels, matrix_paths, UNREACHABLE
+from csr_graph import CSRGraph, INF
+
+ORDER_SAMPLES = 256  # 정점 순서(최단경로 트리 부분트리 크기 합)를 잴 표본 출발 상태 수
+
+# ----------------------------
+# Graph
+# ----------------------------
+def augmented_graph(graph, source_groups, dwell_sec=None):
+    """
+    -> (정방향 인접, 역방향 인접, 탐색 행렬, 출발 가상 노드 (S,), 도착 가상 노드 (S,), 도착 보정 초 (S,))
+    인접 = 정점별 [(이웃, 초)] 리스트 (파이썬 힙 루프용)
+    """
+    V = graph.num_nodes
+    m = graph.plain_matrix() if dwell_sec is None else graph.expanded_matrix(dwell_sec)
+    X = m.shape[0]
+    S = len(source_groups)
+    src_node = X + np.arange(S)
+    sink_node = X + S + np.arange(S)
+    n = X + 2 * S
+    fwd = [[] for _ in range(n)]
+    rev = [[] for _ in range(n)]
+    coo = m.tocoo()
+    for u, v, w in zip(coo.row.tolist(), coo.col.tolist(), coo.data.astype(np.int64).tolist()):
+        fwd[u].append((v, w)); rev[v].append((u, w))
+    dwell = None if dwell_sec is None else np.broadcast_to(np.asarray(dwell_sec, dtype=np.int64), (V,))
+    sink_offset = np.zeros(S, dtype=np.int64)
+    for i, nodes in enumerate(source_groups):
+        s, d = int(src_node[i]), int(sink_node[i])
+        arcs = [(v, 0) for v in nodes]
+        if dwell is not None:
+            c = int(dwell[nodes].max())
+            sink_offset[i] = c
+            arcs = [(v, c) for v in nodes] + [(V + v, c - int(dwell[v])) for v in nodes]
+        for v in nodes:
+            fwd[s].append((v, 0)); rev[v].append((s, 0))
+        for v, w in arcs:
+            fwd[v].append((d, w)); rev[d].append((v, w))
+    return fwd, rev, m, src_node, sink_node, sink_offset
+
+
+def vertex_order(m, num_vertices, samples=ORDER_SAMPLES, seed=0):
+    """
+    허브 순서: 표본 출발 상태들의 최단경로 트리에서 부분트리 크기 합이 큰(많은 최단경로가 지나는) 정점부터.
+    가상 노드(m 밖의 번호)는 맨 뒤.
+    """
+    X = m.shape[0]
+    rng = np.random.default_rng(seed)
+    srcs = rng.choice(X, size=min(samples, X), replace=False)
+    dist, pred = _csgraph_dijkstra(m, indices=srcs, return_predecessors=True)
+    score = np.zeros(X, dtype=np.int64)
+    for d, p in zip(dist, pred):
+        size = np.ones(X, dtype=np.int64)
+        for v in np.argsort(-d, kind="stable").tolist():  # 먼 정점부터 부모에 부분트리 크기 누적
+            if p[v] >= 0:
+                size[p[v]] += size[v]
+        score += np.where(np.isfinite(d), size, 0)
+    order = np.argsort(-score, kind="stable")
+    return np.concatenate([order, np.arange(X, num_vertices)])
+
+# ----------------------------
+# Pruned landmark labeling
+# ----------------------------
+def _pruned_search(root, r, adj, own, other, rank):
+    """
+    root 에서 adj 방향 가지치기 다익스트라 -> 방문 정점의 other 라벨에 (r, d) 추가
+    own = root 의 반대쪽 라벨 (root 쪽 허브 거리), 이미 라벨로 d 이하가 나오면 그 아래는 볼 필요 없음
+    """
+    hub = {h: d for h, d in own[root]}
+    dist = {root: 0}
+    heap = [(0, root)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d != dist[u] or rank[u] < r:
+            continue
+        if any(hub.get(h, INF) + dh <= d for h, dh in other[u]):
+            continue
+        other[u].append((r, d))
+        for v, w in adj[u]:
+            nd = d + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+
+
+def build_labels(fwd, rev, order):
+    """-> (L_out, L_in) 정점별 [(허브 순위, 초)] (순위 오름차순)"""
+    n = len(fwd)
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    rank = rank.tolist()
+    l_out = [[] for _ in range(n)]
+    l_in = [[] for _ in range(n)]
+    for r, root in enumerate(order.tolist()):
+        _pruned_search(root, r, fwd, l_out, l_in, rank)   # d(root -> u) -> L_in(u)
+        _pruned_search(root, r, rev, l_in, l_out, rank)   # d(u -> root) -> L_out(u)
+    return l_out, l_in
+
+
+def pack_labels(labels):
+    """[(허브, 초)] 목록들 -> (offsets int64, hubs int32, dist int32) CSR"""
+    offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+    np.cumsum([len(l) for l in labels], out=offsets[1:])
+    hubs = np.array([h for l in labels for h, d in l], dtype=np.int32)
+    dist = np.array([d for l in labels for h, d in l], dtype=np.int64)
+    if len(dist) and dist.max() > np.iinfo(np.int32).max:
+        raise ValueError("label distance does not fit int32")
+    return offsets, hubs, dist.astype(np.int32)
+
+
+def query(out_offsets, out_hubs, out_dist, in_offsets, in_hubs, in_dist, s, t):
+    """라벨 교집합 최소 (없으면 INF)"""
+    a = slice(out_offsets[s], out_offsets[s + 1])
+    b = slice(in_offsets[t], in_offsets[t + 1])
+    common, ia, ib = np.intersect1d(out_hubs[a], in_hubs[b], assume_unique=True, return_indices=True)
+    if not len(common):
+        return INF
+    return int((out_dist[a][ia].astype(np.int64) + in_dist[b][ib]).min())
+
+# ----------------------------
+# Main
+# ----------------------------
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=("stop", "transfer"), default="stop",
+                    help="stop: export_times_with_stop graph with dwell; transfer: export_from_merged_with_transfer_times graph.")
+    ap.add_argument("--merged-csv", type=Path, default=None)
+    ap.add_argument("--transfer-times-csv", type=Path, default=None)
+    ap.add_argument("--default-transfer-sec", type=int, default=180)
+    ap.add_argument("--dwell-sec", type=int, default=40, help="Only for --mode stop.")
+    ap.add_argument("--out-all", type=Path, default=None,
+                    help="Export CSV path; the index is written next to it as <out>.hub.npz.")
+    ap.add_argument("--verify", action="store_true", help="Compare every pair against the exported .npy matrix.")
+    args = ap.parse_args()
+
+    if args.mode == "stop":
+        import export_times_with_stop as ex
+        dwell_sec, divisor = args.dwell_sec, 1
+        out_all = args.out_all or ex.BASE/"station_pairs_all_with_stop.csv"
+    else:
+        import export_from_merged_with_transfer_times as ex
+        # 이 export 의 ride 초는 ×60 스케일 -> 행렬과 같은 초 = 거리 // 60
+        dwell_sec, divisor = None, 60
+        out_all = args.out_all or ex.BASE/"station_pairs_all_with_transfer.csv"
+    node_id, id_node, adj = ex.build_graph(args.merged_csv or ex.MERGED, args.transfer_times_csv or ex.TRANSFER_TIMES,
+                                           args.default_transfer_sec)
+    V = len(id_node)
+    graph = CSRGraph.from_adj(adj, V)
+    station_to_nodes = defaultdict(list)
+    for nid, (st, ln) in enumerate(id_node):
+        station_to_nodes[st].append(nid)
+    stations = sorted(station_to_nodes.keys())
+    groups = [station_to_nodes[s] for s in stations]
+
+    t0 = time.perf_counter()
+    fwd, rev, m, src_node, sink_node, sink_offset = augmented_graph(graph, groups, dwell_sec)
+    order = vertex_order(m, len(fwd))
+    l_out, l_in = build_labels(fwd, rev, order)
+    out_offsets, out_hubs, out_dist = pack_labels([l_out[v] for v in src_node.tolist()])
+    in_offsets, in_hubs, in_dist = pack_labels([l_in[v] for v in sink_node.tolist()])
+    print(f"[OK] Labels for {len(fwd)} vertices in {time.perf_counter()-t0:.1f}s "
+          f"(avg out {len(out_hubs)/len(stations):.1f}, in {len(in_hubs)/len(stations):.1f} hubs per station)")
+
+    path = write_hub_labels(out_all, stations, out_offsets, out_hubs, out_dist, in_offsets, in_hubs, in_dist,
+                            sink_offset, divisor)
+    print(f"[OK] Wrote {path.name} ({path.stat().st_size/1024:.0f} KiB)")
+
+    if args.verify:
+        mat_stations, mat = read_time_matrix(out_all)
+        if mat is None or mat_stations != stations:
+            raise SystemExit(f"No matching matrix next to {out_all}")
+        bad = 0
+        t0 = time.perf_counter()
+        for s in range(len(stations)):
+            for t in range(len(stations)):
+                if s == t:
+                    continue
+                d = query(out_offsets, out_hubs, out_dist, in_offsets, in_hubs, in_dist, s, t)
+                sec = UNREACHABLE if d >= INF else (d - int(sink_offset[t])) // divisor
+                bad += int(sec != mat[s, t])
+        n = len(stations) * (len(stations) - 1)
+        print(f"[OK] Verified {n} pairs against {matrix_paths(out_all)[0].name}: "
+              f"mismatches={bad}, {1e6*(time.perf_counter()-t0)/n:.1f}us/query")
+
+if __name__ == "__main__":
+    main()
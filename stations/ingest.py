@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+원본 CSV 공통 읽기 (소요시간 / 환승시간 / 역간거리 / 공식 시간표)
+
+- 인코딩: 파일마다 한 번 전체 디코딩으로 판별하고 (경로, mtime, 크기) 기준으로 캐시
+- 시간 파싱 규칙 (한 곳에서만 정의):
+    'M:SS'            -> 분:초
+    초 컬럼 (seconds, 소요초, 소요시간(초) ...) 의 숫자 -> 그대로 초
+    표현형 컬럼 (소요시간, mmss ...) 의 숫자 -> rule="seconds": 그대로 초 / rule="minutes": 분 (×60)
+  export_times_with_stop 은 "seconds", export_from_merged_* 는 예전과 같은 출력을 위해 "minutes"
+- 간선 표: 한 줄씩 돌지 않고 호선별 groupby/shift 로 연속역 연결, 누계(km) 감소 = 구간 재시작
+
+  edges, station_to_lines = load_ride_edges(MERGED, rule="seconds", line_label=normalize_line_label)
+  per_station, per_pair = load_transfer_times(TRANSFER_TIMES)
+"""
+import os, re
+from functools import lru_cache
+from pathlib import Path
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+ENCODINGS = ("utf-8-sig", "utf-8", "cp949", "euc-kr")
+TIME_RULES = ("seconds", "minutes")
+
+LINE_COLS = ["line", "호선", "line_id", "노선", "노선명"]
+FROM_COLS = ["from_station", "출발역", "from", "시작역", "전역_clean"]
+TO_COLS = ["to_station", "도착역", "to", "끝역", "역명_clean"]
+STATION_COLS = ["역명", "station", "station_name", "name"]
+SEC_COLS = ["seconds", "sec", "time_sec", "duration_s", "소요초", "소요시간(초)"]
+EXPR_COLS = ["mmss", "소요시간", "time", "duration"]
+CUM_COLS = ["호선별누계(km)", "누계", "누계km", "cumulative_km"]
+TRANSFER_STATION_COLS = ["station", "역", "역명", "station_name", "환승역명"]
+TRANSFER_FROM_COLS = ["line_from", "from_line", "linefrom", "출발호선", "호선from", "호선"]
+TRANSFER_TO_COLS = ["line_to", "to_line", "lineto", "도착호선", "호선to", "환승노선"]
+TRANSFER_SEC_COLS = ["transfer_seconds", "seconds", "sec", "소요초", "환승초", "환승시간(초)"]
+TRANSFER_EXPR_COLS = ["mmss", "소요시간", "환승시간", "time", "환승소요시간"]
+
+_MMSS_RE = r"^(\d+):(\d{2})$"
+
+# ----------------------------
+# Encoding / reading
+# ----------------------------
+@lru_cache(maxsize=None)
+def _detect_encoding(path, mtime_ns, size):
+    data = Path(path).read_bytes()
+    for enc in ENCODINGS:
+        try:
+            data.decode(enc)
+            return enc
+        except UnicodeDecodeError:
+            pass
+    raise RuntimeError(f"Failed to decode: {path} with common encodings")
+
+def detect_encoding(path):
+    """파일 인코딩 (파일이 바뀌지 않았으면 캐시된 결과)"""
+    st = os.stat(path)
+    return _detect_encoding(str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+
+def open_csv_kr(path: Path):
+    return open(path, "r", encoding=detect_encoding(path), newline="")
+
+def read_csv_kr(path: Path, raw=True, **kwargs):
+    """
+    raw=True: 모든 값을 문자열로 (빈 칸 ""), 파싱은 이 모듈 함수로
+    raw=False: pandas 타입 추론 그대로
+    """
+    if raw:
+        kwargs.setdefault("dtype", str)
+        kwargs.setdefault("keep_default_na", False)
+    df = pd.read_csv(path, encoding=detect_encoding(path), **kwargs)
+    return df.fillna("") if raw else df
+
+# ----------------------------
+# Columns / labels
+# ----------------------------
+def safe_strip(x):
+    return str(x).strip() if x is not None else ""
+
+def norm_colnames(names): return [str(c).strip().lower() for c in names]
+
+def pick_col(names, candidates):
+    """candidates 중 처음으로 있는 컬럼 이름 (대소문자/앞뒤 공백 무시)"""
+    names = list(names)
+    low = norm_colnames(names)
+    for cand in candidates:
+        if cand in low:
+            return names[low.index(cand)]
+    return None
+
+def normalize_line_label(s: str) -> str:
+    """통일된 호선 라벨: '9호선', '9호선급행' 등. 비숫자 라벨은 공백 제거만."""
+    s = safe_strip(s).replace(" ", "")
+    s = s.replace("(급행)", "급행").replace("[급행]", "급행")
+    m = re.match(r"^(\d+)(호선)?(급행)?$", s)
+    if m:
+        base = f"{m.group(1)}호선"
+        return base + ("급행" if m.group(3) else "")
+    return s
+
+def numeric_line_label(s: str) -> str:
+    """'4', '4 호선' -> '4호선', 그 외는 앞뒤 공백만 제거"""
+    s = safe_strip(s)
+    m = re.match(r"^(\d+)\s*(호선)?$", s)
+    return f"{m.group(1)}호선" if m else s
+
+def to_graph_line_label(s: str) -> str:
+    """환승표 호선 -> merged_clean 라벨 ('4' -> '4호선', 나머지는 normalize_line_label)"""
+    s = safe_strip(s)
+    m = re.match(r"^(\d+)\s*(호선)?$", s)
+    return f"{m.group(1)}호선" if m else normalize_line_label(s)
+
+def _map_unique(values, func):
+    """고유값마다 한 번만 func (라벨 정규화용)"""
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    mapped = np.array([func(v) for v in uniques.tolist()] + [func(None)], dtype=object)
+    return pd.Series(mapped[codes], index=values.index)
+
+def strip_col(values):
+    """Series 전체 safe_strip (None/NaN -> ""), 역명처럼 반복이 많은 컬럼용"""
+    return _map_unique(values, safe_strip)
+
+# ----------------------------
+# Time parsing
+# ----------------------------
+def parse_seconds(values, rule="seconds"):
+    """
+    문자열/숫자 배열 -> float 초 Series (파싱 불가 NaN)
+    'M:SS' 는 분:초, 그 외 숫자는 rule 에 따라 초 그대로 / 분(×60). 천단위 콤마 허용
+    """
+    if rule not in TIME_RULES:
+        raise ValueError(f"rule must be one of {list(TIME_RULES)}")
+    s = pd.Series(values)
+    codes, uniques = pd.factorize(s)  # 같은 값은 한 번만 파싱
+    parsed = np.append(_parse_unique(pd.Series(uniques), rule), np.nan)
+    return pd.Series(parsed[codes], index=s.index)
+
+def _parse_unique(s, rule):
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        num, txt = s.astype(float), None
+    else:
+        txt = s.astype("string").str.strip().str.replace(",", "", regex=False)
+        num = pd.to_numeric(txt, errors="coerce").astype(float)
+    num = num.where(np.isfinite(num))
+    if rule == "minutes":
+        num = num * 60
+    out = np.rint(num)
+    if txt is not None:
+        colon = txt.str.contains(":", regex=False, na=False)
+        if colon.any():  # 'M:SS' 행만 정규식
+            mm = txt[colon].str.extract(_MMSS_RE).astype(float)
+            out[colon] = mm[0] * 60 + mm[1]
+    return out.to_numpy(dtype=float)
+
+def _seconds_from(df, col_sec, col_expr, rule):
+    """초 컬럼 값이 있으면 그것(항상 초), 없으면 표현형 컬럼 값(rule)"""
+    expr = parse_seconds(df[col_expr], rule) if col_expr else pd.Series(np.nan, index=df.index)
+    if not col_sec:
+        return expr
+    return parse_seconds(df[col_sec], "seconds").where(df[col_sec] != "", expr)
+
+def _station_lines(visits):
+    """방문 DataFrame[station, line] -> {역: {호선}} (역은 처음 등장 순서)"""
+    out = defaultdict(set)
+    uniq = visits.drop_duplicates()
+    for st, ln in zip(uniq["station"].tolist(), uniq["line"].tolist()):
+        out[st].add(ln)
+    return out
+
+# ----------------------------
+# Edge tables
+# ----------------------------
+def ride_edge_table(df, rule="seconds", line_label=normalize_line_label):
+    """
+    소요시간 표 -> (DataFrame[line, a, b, seconds], 방문 순서 DataFrame[station, line])
+    (A) 간선 목록: 호선, 출발역, 도착역, 초|소요시간
+    (B) 연속역 표: 호선, 역명, 초|소요시간 (+누계) -> 같은 호선 바로 이전 행과 연결
+        (초 <= 0 이거나 누계가 줄면 구간 재시작)
+    같은 호선 안의 무방향 중복 (a, b, 초)는 처음 것만
+    """
+    cols = list(df.columns)
+    col_line = pick_col(cols, LINE_COLS)
+    col_from, col_to = pick_col(cols, FROM_COLS), pick_col(cols, TO_COLS)
+    col_sec, col_expr = pick_col(cols, SEC_COLS), pick_col(cols, EXPR_COLS)
+    if not (col_line and (col_sec or col_expr)):
+        raise RuntimeError("ride time table schema not detected.")
+    line = _map_unique(df[col_line], line_label)
+    sec = _seconds_from(df, col_sec, col_expr, rule)
+
+    if col_from and col_to:
+        a, b = strip_col(df[col_from]), strip_col(df[col_to])
+        ok = (a != "") & (b != "") & (line != "") & (sec > 0)
+        edges = pd.DataFrame({"line": line[ok], "a": a[ok], "b": b[ok], "seconds": sec[ok]})
+        # 간선마다 (a, 호선), (b, 호선) 순서
+        visits = pd.DataFrame({"station": np.column_stack([edges["a"], edges["b"]]).ravel(),
+                               "line": np.repeat(edges["line"].to_numpy(), 2)})
+    else:
+        col_st = pick_col(cols, STATION_COLS)
+        if not col_st:
+            raise RuntimeError("ride time table schema not detected.")
+        st = strip_col(df[col_st])
+        col_cum = pick_col(cols, CUM_COLS)
+        cum = (pd.to_numeric(df[col_cum].astype("string").str.strip(), errors="coerce").astype(float)
+               if col_cum else pd.Series(np.nan, index=df.index))
+        by_line = line.groupby(line, sort=False)
+        prev_st = st.groupby(line, sort=False).shift()
+        prev_cum = cum.groupby(line, sort=False).shift()
+        reset = cum.notna() & prev_cum.notna() & (cum < prev_cum)
+        ok = (by_line.cumcount() > 0) & (sec > 0) & ~reset
+        edges = pd.DataFrame({"line": line[ok], "a": prev_st[ok], "b": st[ok], "seconds": sec[ok]})
+        visits = pd.DataFrame({"station": st, "line": line})
+
+    swap = edges["b"] < edges["a"]
+    lo, hi = edges["a"].where(~swap, edges["b"]), edges["b"].where(~swap, edges["a"])
+    keep = ~pd.DataFrame({"line": edges["line"], "lo": lo, "hi": hi, "s": edges["seconds"]}).duplicated()
+    edges = edges[keep].reset_index(drop=True)
+    edges["seconds"] = edges["seconds"].astype(np.int64)
+    return edges, visits
+
+def load_ride_edges(path: Path, rule="seconds", line_label=normalize_line_label):
+    """-> ([(line, a, b, seconds), ...], station_to_lines)  (export 스크립트 build_graph 입력)"""
+    edges, visits = ride_edge_table(read_csv_kr(path), rule, line_label)
+    station_to_lines = _station_lines(visits)
+    cols = [edges[c].tolist() for c in ("line", "a", "b", "seconds")]
+    return list(zip(*cols)), station_to_lines
+
+def load_transfer_times(path: Path, rule="seconds", line_label=to_graph_line_label):
+    """
+    transfer_times.csv -> (per_station {역명: 초}, per_pair {(역명, line_from, line_to): 초})
+    호선 쌍이 있는 행은 per_pair, 없는 행은 역별 기본값. 같은 키는 뒤의 행이 우선
+    """
+    df = read_csv_kr(path)
+    cols = list(df.columns)
+    c_station = pick_col(cols, TRANSFER_STATION_COLS)
+    if not c_station:
+        raise RuntimeError("transfer_times.csv must include 'station' column")
+    c_lfrom, c_lto = pick_col(cols, TRANSFER_FROM_COLS), pick_col(cols, TRANSFER_TO_COLS)
+    st = strip_col(df[c_station])
+    sec = _seconds_from(df, pick_col(cols, TRANSFER_SEC_COLS), pick_col(cols, TRANSFER_EXPR_COLS), rule)
+    ok = (st != "") & (sec > 0)
+    if c_lfrom and c_lto:
+        pair = (df[c_lfrom] != "") & (df[c_lto] != "")
+        lf, lt = _map_unique(df[c_lfrom], line_label), _map_unique(df[c_lto], line_label)
+    else:
+        pair = pd.Series(False, index=df.index)
+        lf = lt = pd.Series("", index=df.index)
+    sec = sec.fillna(0).astype(np.int64)
+    per_station = dict(zip(st[ok & ~pair].tolist(), sec[ok & ~pair].tolist()))
+    m = ok & pair & (lf != "") & (lt != "") & (lf != lt)
+    per_pair = dict(zip(zip(st[m].tolist(), lf[m].tolist(), lt[m].tolist()), sec[m].tolist()))
+    return {k: int(v) for k, v in per_station.items()}, {k: int(v) for k, v in per_pair.items()}
+
+def official_ride_edges(df, time_col="소요시간", rule="minutes"):
+    """
+    공식 시간표 (호선, 역명, 소요시간[, 호선별누계(km)]) -> 양방향 ride 간선 DataFrame
+    [line, from_station, to_station, seconds, kind]. 소요시간 0/파싱 불가 = 구간 시작, 누계 감소 = 재시작
+    """
+    df = df[df["호선"].notna()].reset_index(drop=True)
+    line = df["호선"].astype(str).str.strip()
+    name = df["역명"].astype(str).str.strip()
+    sec = parse_seconds(df[time_col], rule)
+    cum = (pd.to_numeric(df["호선별누계(km)"], errors="coerce").astype(float)
+           if "호선별누계(km)" in df.columns else pd.Series(np.nan, index=df.index))
+    prev_name = name.groupby(line, sort=False).shift()
+    prev_cum = cum.groupby(line, sort=False).shift()
+    reset = cum.notna() & prev_cum.notna() & (cum < prev_cum)
+    ok = (line.groupby(line, sort=False).cumcount() > 0) & sec.notna() & (sec != 0) & ~reset
+    # 호선 첫 등장 순 -> 행 순, 정방향/역방향 교대 (예전 출력 순서)
+    order = pd.Series(pd.factorize(line)[0], index=df.index)[ok]
+    fwd = pd.DataFrame({"line": line[ok], "from_station": prev_name[ok], "to_station": name[ok],
+                        "seconds": sec[ok].astype(np.int64), "kind": "ride"})
+    rev = fwd.rename(columns={"from_station": "to_station", "to_station": "from_station"})[fwd.columns]
+    both = pd.concat([fwd.assign(_o=order, _d=0), rev.assign(_o=order, _d=1)])
+    both = both.rename_axis("_i").sort_values(["_o", "_i", "_d"], kind="stable")
+    return both.drop(columns=["_o", "_d"]).reset_index(drop=True).drop_duplicates()
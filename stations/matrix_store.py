@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+역→역 소요시간 행렬 저장 (backend가 mmap으로 읽는 포맷)
+
+  <out>.npy           N×N uint16 초 (행=출발역, 열=도착역, 대각선 0, 도달 불가 65535)
+  <out>.stations.csv  station_id,station   (행/열 순서)
+  <out>.T.npy         같은 행렬의 전치 (행=도착역) — 도착역 기준(역방향) 조회가 연속 메모리를 읽도록
+  <out>.order.npy     N×(N-1) int16 행마다 상대 역 id 를 소요시간 순으로 (자기 자신 제외, 도달 불가는 맨 뒤)
+  <out>.sorted.npy    N×(N-1) uint16 같은 순서의 초 (backend 등고선 구간 = searchsorted 한 번)
+  <out>.T.order.npy / <out>.T.sorted.npy  전치 행렬(도착역 기준)의 같은 정렬
+  <out>.pred.npy      S×X int16 출발역별 최단경로 트리의 직전 상태 (-1 = 없음)
+  <out>.end.npy       S×S int16 출발역 -> 도착역의 마지막 상태 (-1 = 도달 불가)
+  <out>.nodes.csv     node_id,station_id,line  (상태 x 의 노드 = x % 노드 수)
+  <out>.graph.npz     행렬을 만든 그래프 스냅샷 (--incremental 갱신 시 이전 그래프)
+  <out>.hub.npz       역별 허브 라벨 (hub_labels.py, backend hub_labels 가 시작 시 읽음)
+  <out>.pairs.col     전체 쌍 표 (CSV 와 같은 행/값, colstore 포맷: 역 컬럼은 위 역 목록 순서의 사전 코드)
+
+<out>은 --out-all CSV 경로에서 확장자를 뗀 것.
+"""
+import csv, os
+from pathlib import Path
+import numpy as np
+from colstore import write_table
+
+UNREACHABLE = np.iinfo(np.uint16).max  # 65535초(약 18시간) = 도달 불가
+
+def matrix_paths(out_all: Path):
+    out_all = Path(out_all)
+    return out_all.with_suffix(".npy"), out_all.with_suffix(".stations.csv")
+
+def transposed_path(out_all: Path):
+    return Path(out_all).with_suffix(".T.npy")
+
+def sorted_paths(out_all: Path):
+    """-> ((정방향 order, sorted), (전치 order, sorted))"""
+    out_all = Path(out_all)
+    return ((out_all.with_suffix(".order.npy"), out_all.with_suffix(".sorted.npy")),
+            (out_all.with_suffix(".T.order.npy"), out_all.with_suffix(".T.sorted.npy")))
+
+def route_paths(out_all: Path):
+    out_all = Path(out_all)
+    return out_all.with_suffix(".pred.npy"), out_all.with_suffix(".end.npy"), out_all.with_suffix(".nodes.csv")
+
+def graph_snapshot_path(out_all: Path):
+    return Path(out_all).with_suffix(".graph.npz")
+
+def hub_label_path(out_all: Path):
+    return Path(out_all).with_suffix(".hub.npz")
+
+def pairs_path(out_all: Path):
+    return Path(out_all).with_suffix(".pairs.col")
+
+def read_time_matrix(out_all: Path):
+    """-> (역 목록, N×N uint16 행렬 사본)  없으면 (None, None)"""
+    npy_path, st_path = matrix_paths(out_all)
+    if not (npy_path.exists() and st_path.exists()):
+        return None, None
+    with open(st_path, "r", encoding="utf-8-sig", newline="") as f:
+        stations = [row["station"] for row in csv.DictReader(f)]
+    return stations, np.load(npy_path)
+
+def new_time_matrix(n: int):
+    mat = np.full((n, n), UNREACHABLE, dtype=np.uint16)
+    np.fill_diagonal(mat, 0)
+    return mat
+
+def check_seconds(sec: int) -> int:
+    if sec >= UNREACHABLE:
+        raise ValueError(f"travel time {sec}s does not fit uint16 matrix")
+    return int(sec)
+
+def _save_npy(path: Path, arr, dtype=np.uint16):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(arr, dtype=dtype))
+    os.replace(tmp, path)
+
+def arrival_index(mat):
+    """
+    행마다 상대 역을 소요시간 순으로 정렬 (자기 자신 제외, 도달 불가는 맨 뒤, 같은 시간은 id 순)
+    -> (N×(N-1) 역 id, N×(N-1) uint16 초)
+    """
+    mat = np.asarray(mat)
+    n = mat.shape[0]
+    key = mat.astype(np.int32)
+    np.fill_diagonal(key, -1)
+    order = np.argsort(key, axis=1, kind="stable")[:, 1:]
+    return (order.astype(np.int32 if n > np.iinfo(np.int16).max else np.int16),
+            np.take_along_axis(mat, order, axis=1))
+
+def write_time_matrix(out_all: Path, stations, mat):
+    """
+    원자적 교체(os.replace) -> 이미 mmap 중인 서버 워커는 기존 파일을 계속 본다.
+    전치본(.T.npy)과 정렬 파일은 행렬 다음에 쓴다 -> mtime 이 행렬보다 이르면 backend 는 예전 것으로 보고 무시
+    """
+    npy_path, st_path = matrix_paths(out_all)
+    _save_npy(npy_path, mat)
+    _save_npy(transposed_path(out_all), np.asarray(mat).T)
+    for (order_path, sorted_path), m in zip(sorted_paths(out_all), (mat, np.asarray(mat).T)):
+        order, secs = arrival_index(m)
+        _save_npy(order_path, order, order.dtype)
+        _save_npy(sorted_path, secs)
+    with open(st_path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f); w.writerow(["station_id", "station"])
+        for i, st in enumerate(stations):
+            w.writerow([i, st])
+    return npy_path, st_path
+
+def write_route_arrays(out_all: Path, pred, end, id_node, station_idx):
+    """경로 복원용 배열 (backend route_store 가 mmap 으로 읽음)"""
+    pred_path, end_path, nodes_path = route_paths(out_all)
+    _save_npy(pred_path, pred, np.int16)
+    _save_npy(end_path, end, np.int16)
+    with open(nodes_path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f); w.writerow(["node_id", "station_id", "line"])
+        for nid, (st, ln) in enumerate(id_node):
+            w.writerow([nid, station_idx[st], ln])
+    return pred_path, end_path, nodes_path
+
+def write_hub_labels(out_all: Path, stations, out_offsets, out_hubs, out_dist, in_offsets, in_hubs, in_dist,
+                     sink_offset, divisor):
+    """
+    허브 라벨 (CSR: 역 i 의 라벨 = hubs[offsets[i]:offsets[i+1]], 허브 순위 오름차순)
+    역 s -> t 초 = (min 공통 허브 out_dist + in_dist - sink_offset[t]) // divisor
+    """
+    path = hub_label_path(out_all)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, stations=np.array(stations, dtype=str),
+                 out_offsets=out_offsets, out_hubs=out_hubs, out_dist=out_dist,
+                 in_offsets=in_offsets, in_hubs=in_hubs, in_dist=in_dist,
+                 sink_offset=np.asarray(sink_offset, dtype=np.int64), divisor=np.int64(divisor))
+    os.replace(tmp, path)
+    return path
+
+def matrix_pairs(mat, order=None):
+    """
+    행렬 -> (출발 id, 도착 id, 초) 도달 가능한 쌍 (자기 자신 제외)
+    출발역 순, 한 출발역 안에서는 order(도착역 id 순서, 기본 0..N-1) 순 -> export CSV 행 순서와 같다
+    """
+    mat = np.asarray(mat)
+    order = np.arange(mat.shape[1]) if order is None else np.asarray(order)
+    sub = mat[:, order]
+    mask = (sub != UNREACHABLE) & (order[None, :] != np.arange(mat.shape[0])[:, None])
+    src, col = np.nonzero(mask)
+    return src, order[col], sub[mask]
+
+def write_pairs_table(out_all: Path, stations, src, dst, seconds, minutes, meta=None):
+    """
+    전체 쌍 표 -> <out>.pairs.col  (src/dst 는 stations 인덱스 = 행렬 인덱스, 사전 "station" 공유)
+    backend travel_store 가 행렬이 없을 때 CSV 대신 읽는다
+    """
+    seconds = np.asarray(seconds, dtype=np.int64)
+    if len(seconds) and seconds.max() > np.iinfo(np.uint32).max:
+        raise ValueError("pair seconds do not fit uint32")
+    return write_table(pairs_path(out_all), {
+        "src_station": ("station", src),
+        "dst_station": ("station", dst),
+        "seconds": seconds.astype(np.uint32),
+        "minutes": np.asarray(minutes, dtype=np.uint16),
+    }, dicts={"station": stations}, meta=meta)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+단일 쌍(출발역 -> 도착역) 최단시간: 양방향 A*
+- export_times_with_stop.dijkstra_multi_modes 와 같은 규칙 (ride 도착 시 dwell, 도착역 dwell 1회 제거)
+  -> CSRGraph 상태 확장 그래프(v = 환승 도착, V+v = ride 도착) 위에서 탐색
+- 하한(heuristic, 기본 alt): ALT (A*, landmarks, triangle inequality)
+  상태 그래프에서 서로 먼 landmark L 몇 개를 골라 d(L, x), d(x, L) 을 미리 구해 두고
+  d(x, t) >= d(L, t) - d(L, x),  d(x, t) >= d(x, L) - d(t, L)  중 최댓값 (consistent)
+  그래프가 강연결이 아니므로 도달 불가(inf) 항은 하한 없음(0) 또는 도달 불가(BIG)로 정리
+- geo: 역 좌표 직선거리 / 최고 속도(지하철_속도.csv)
+  데이터에는 직선거리를 최고 속도로 가도 못 맞추는 간선(분기 연결 오류, 좌표 오차 등)이 있으므로
+  그런 간선은 "포털"로 따로 두고, 하한 = 직선 이동 + 포털 간선으로 만든 거리 (정확, 포털 112개라 느슨하고 비쌈)
+- 양방향 평균 potential p = (π_t - π_s) / 2, 종료 조건 top_f + top_r >= μ
+
+  python pair_search.py --from 강남 --to 홍대입구
+  python pair_search.py --check 200      # 임의 쌍을 전체 탐색(csgraph)과 비교 + 탐색 노드 비율
+  python pair_search.py --check 200 --heuristic geo
+"""
+import argparse, csv, heapq, json, random, re, time
+from pathlib import Path
+from collections import defaultdict
+import numpy as np
+from scipy.sparse.csgraph import dijkstra as _csgraph_dijkstra, connected_components
+from csr_graph import CSRGraph, EDGE_TRANSFER, INF
+from export_times_with_stop import build_graph, MERGED, TRANSFER_TIMES, BASE
+from ingest import open_csv_kr
+
+SPEED_CSV = BASE / "지하철_속도.csv"
+COORDS_JSON = BASE / ".." / "backend" / "station_coords.json"
+EARTH_RADIUS_KM = 6371.0088
+LANDMARKS = 8      # ALT landmark 수 (늘리면 탐색 상태는 조금 줄지만 질의마다 하한 계산이 커짐)
+_UNREACHED = 1e12  # landmark 거리 inf 대체값 (하한 계산에서 0 또는 BIG 으로 잘림)
+_BIG = 1e9         # "도달 불가" 하한 (어떤 유한 거리보다 큼)
+
+# ----------------------------
+# Inputs
+# ----------------------------
+def load_max_speed_kmh(path: Path):
+    """지하철_속도.csv 의 모든 속도(일반/급행) 중 최댓값 (km/h)"""
+    best = 0.0
+    with open_csv_kr(path) as f:
+        for row in csv.DictReader(f):
+            for col, val in row.items():
+                if col and "속도" in col and val not in (None, ""):
+                    try: best = max(best, float(val))
+                    except ValueError: pass
+    if best <= 0:
+        raise RuntimeError(f"No speeds found in {path}")
+    return best
+
+_PAREN_RE = re.compile(r"\([^)]*\)")
+_LINE_LABEL_RE = re.compile(r"^(\S*(호선|선|경전철|철도)|GTX-\S+)$")
+
+def station_key(name):
+    """역명 비교 키 (backend station_index.normalize_station_name 과 같은 규칙)"""
+    name = _PAREN_RE.sub("", str(name).strip())
+    head, _, tail = name.rpartition(" ")
+    if head and _LINE_LABEL_RE.match(tail):
+        name = head
+    name = re.sub(r"[\s.·]", "", name)
+    return name[:-1] if len(name) > 1 and name.endswith("역") else name
+
+def load_station_coords(path: Path):
+    """station_coords.json -> {역명 키: (lat, lng)} (같은 역은 첫 좌표)"""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    coords = {}
+    for e in entries:
+        if e.get("lat") is None or e.get("lng") is None:
+            continue
+        coords.setdefault(station_key(e["name"]), (float(e["lat"]), float(e["lng"])))
+    return coords
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """numpy 브로드캐스트 haversine (도 단위 입력)"""
+    lat1, lng1, lat2, lng2 = (np.radians(x) for x in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+# ----------------------------
+# Search
+# ----------------------------
+class PairSearch:
+    def __init__(self, graph, id_node, station_coords=None, dwell_sec=40, max_speed_kmh=None,
+                 heuristic="alt", landmarks=LANDMARKS):
+        """heuristic: "alt" (landmark, 좌표 불필요) | "geo" (좌표 + 최고 속도 + 포털)"""
+        if heuristic not in ("alt", "geo"):
+            raise ValueError(f"unknown heuristic {heuristic!r}")
+        V = graph.num_nodes
+        self.V = V
+        self.dwell_sec = dwell_sec
+        self.heuristic = heuristic
+        self.stations = sorted({st for st, ln in id_node})
+        self.station_idx = {st: i for i, st in enumerate(self.stations)}
+        self.node_station = np.array([self.station_idx[st] for st, ln in id_node])
+        self.station_nodes = defaultdict(list)
+        for nid, (st, ln) in enumerate(id_node):
+            self.station_nodes[st].append(nid)
+
+        # 상태 확장 그래프 정/역방향 인접 (정수 리스트 -> 파이썬 힙 루프에서 빠름)
+        m = graph.expanded_matrix(dwell_sec)
+        self.fwd = self._adjacency(m)
+        self.rev = self._adjacency(m.T.tocsr())
+        self.tail = np.zeros(0, dtype=np.int64)
+        self.sec_per_km = 0.0
+        if heuristic == "alt":
+            self._init_landmarks(m, landmarks)
+        else:
+            self._init_geo(graph, station_coords, max_speed_kmh)
+
+    def _init_landmarks(self, m, k):
+        """
+        landmark = 가장 큰 강연결 성분에서 farthest-first (이미 고른 것들과의 왕복 거리 최소가 가장 큰 상태)
+        self.lm_from[i] = d(L_i, x), self.lm_to[i] = d(x, L_i)  (inf -> _UNREACHED)
+        """
+        mt = m.T.tocsr()
+        _, comp = connected_components(m, directed=True, connection="strong")
+        cand = comp == np.bincount(comp).argmax()
+        chosen = [int(np.flatnonzero(cand)[0])]
+        nearest = np.full(m.shape[0], np.inf)
+        while len(chosen) < min(k, int(cand.sum())):
+            L = chosen[-1]
+            nearest = np.minimum(nearest, _csgraph_dijkstra(m, indices=L) + _csgraph_dijkstra(mt, indices=L))
+            chosen.append(int(np.argmax(np.where(cand, nearest, -1))))
+        self.landmarks = np.array(chosen)
+        self.lm_from = np.nan_to_num(_csgraph_dijkstra(m, indices=chosen), posinf=_UNREACHED)
+        self.lm_to = np.nan_to_num(_csgraph_dijkstra(mt, indices=chosen), posinf=_UNREACHED)
+
+    def _init_geo(self, graph, station_coords, max_speed_kmh):
+        V = self.V
+        if station_coords is None or not max_speed_kmh:
+            raise ValueError("geo heuristic needs station coordinates and a max speed")
+        # 역 좌표 (없는 역은 ride 이웃 좌표 평균으로 채움 - 하한 계산용일 뿐, 정확도는 포털이 보장)
+        S = len(self.stations)
+        lat = np.full(S, np.nan); lng = np.full(S, np.nan)
+        for i, st in enumerate(self.stations):
+            c = station_coords.get(station_key(st))
+            if c:
+                lat[i], lng[i] = c
+        us = self.node_station[graph.sources()]
+        vs = self.node_station[graph.targets]
+        ride = graph.kinds != EDGE_TRANSFER
+        while np.isnan(lat).any():
+            known = ~np.isnan(lat[vs]) & np.isnan(lat[us])
+            if not known.any():
+                break
+            fill_lat = np.bincount(us[known], weights=lat[vs][known], minlength=S)
+            fill_lng = np.bincount(us[known], weights=lng[vs][known], minlength=S)
+            cnt = np.bincount(us[known], minlength=S)
+            todo = np.isnan(lat) & (cnt > 0)
+            lat[todo] = fill_lat[todo] / cnt[todo]
+            lng[todo] = fill_lng[todo] / cnt[todo]
+        self.lat, self.lng = lat, lng
+        # 좌표를 끝내 못 채운 역이 있으면 하한 0 (= 양방향 다익스트라)
+        self.sec_per_km = 3600.0 / max_speed_kmh if not np.isnan(lat).any() else 0.0
+
+        # 포털: 직선거리 / 최고 속도보다 빠른 ride 간선 (역 쌍별 최소 초, dwell 제외)
+        geo = haversine_km(lat[us], lng[us], lat[vs], lng[vs]) * self.sec_per_km
+        fast = ride & (geo > graph.weights)
+        portals = {}
+        for a, b, w in zip(us[fast].tolist(), vs[fast].tolist(), graph.weights[fast].tolist()):
+            portals[(a, b)] = min(w, portals.get((a, b), w))
+        self.tail = np.array([a for a, b in portals], dtype=np.int64)
+        self.head = np.array([b for a, b in portals], dtype=np.int64)
+        self.portal_w = np.array(list(portals.values()), dtype=np.float64)
+        # head_i -> tail_j 직선 하한, 역 x -> tail_j / head_i 직선 하한
+        self.head_tail = self._geo(self.head[:, None], self.tail[None, :])
+        self.to_tail = self._geo(np.arange(S)[:, None], self.tail[None, :])
+        self.to_head = self._geo(np.arange(S)[:, None], self.head[None, :])
+
+    @staticmethod
+    def _adjacency(m):
+        indptr, indices, data = m.indptr.tolist(), m.indices.tolist(), m.data.astype(np.int64).tolist()
+        return [list(zip(indices[indptr[u]:indptr[u+1]], data[indptr[u]:indptr[u+1]])) for u in range(m.shape[0])]
+
+    def _geo(self, a, b):
+        return haversine_km(self.lat[a], self.lng[a], self.lat[b], self.lng[b]) * self.sec_per_km
+
+    @property
+    def num_portals(self):
+        return len(self.portal_w)
+
+    def _portal_closure(self, direct, forward):
+        """
+        포털 간 최단 하한 (P개 조밀 다익스트라)
+        forward=False: g[i] = head_i -> t,  g[i] = min(direct[i], min_j head_tail[i, j] + W_j + g[j])
+        forward=True:  f[j] = s -> tail_j,  f[j] = min(direct[j], min_i f[i] + W_i + head_tail[i, j])
+        """
+        d = direct.copy()
+        done = np.zeros(len(d), dtype=bool)
+        for _ in range(len(d)):
+            k = int(np.argmin(np.where(done, np.inf, d)))
+            if done[k] or not np.isfinite(d[k]):
+                break
+            done[k] = True
+            if forward:
+                np.minimum(d, d[k] + self.portal_w[k] + self.head_tail[k, :], out=d)
+            else:
+                np.minimum(d, self.head_tail[:, k] + self.portal_w[k] + d[k], out=d)
+        return d
+
+    def landmark_bounds(self, src, dst):
+        """
+        -> (π_s, π_t) 상태별 하한 초 (2V,): 출발역 상태들 -> x, x -> 도착역 (도착역 ride 상태는 dwell 제외)
+        landmark 마다 (출발/도착 쪽 각 2개) 하한을 구하고 최댓값.
+        inf 를 _UNREACHED 로 둔 채 계산하면 min 쪽 항은 그대로 맞다: L 이 x 에는 닿는데 도착역 어디에도
+        못 닿으면 x 도 못 닿음 -> BIG, L 이 x 에 못 닿으면 0. max 쪽 항은 집합 중 하나라도 inf 면 하한이
+        정의되지 않으므로 그 landmark 의 항을 끈다 (음수 -> 0 으로 잘림)
+        """
+        V = self.V
+        S = np.array(self.station_nodes[src])
+        T = np.concatenate([np.array(self.station_nodes[dst]), V + np.array(self.station_nodes[dst])])
+        off = np.where(T >= V, self.dwell_sec, 0)
+        F, R = self.lm_from, self.lm_to
+        far = 2 * _UNREACHED
+        reach = F[:, T] - off                                    # d(L, t)
+        a = reach.min(axis=1)
+        back = R[:, T] + off                                     # d(t, L)
+        b = back.max(axis=1)
+        b = np.where(b < _UNREACHED / 2, b, far)
+        s_from = F[:, S].max(axis=1)                             # d(L, s)
+        s_from = np.where(s_from < _UNREACHED / 2, s_from, far)
+        s_to = R[:, S].min(axis=1)                               # d(s, L)
+        pi_t = np.maximum((a[:, None] - F).max(axis=0), (R - b[:, None]).max(axis=0))
+        pi_s = np.maximum((F - s_from[:, None]).max(axis=0), (s_to[:, None] - R).max(axis=0))
+        return np.clip(pi_s, 0, _BIG), np.clip(pi_t, 0, _BIG)
+
+    def station_bounds(self, s, t):
+        """-> (π_s, π_t) 역별 하한 초: s -> x, x -> t"""
+        S = len(self.stations)
+        xs = np.arange(S)
+        pi_t = self._geo(xs, t)
+        pi_s = self._geo(s, xs)
+        if self.num_portals:
+            g = self._portal_closure(self._geo(self.head, t), forward=False)       # head_i -> t
+            pi_t = np.minimum(pi_t, (self.to_tail + (self.portal_w + g)[None, :]).min(axis=1))
+            f = self._portal_closure(self._geo(s, self.tail), forward=True)         # s -> tail_j
+            pi_s = np.minimum(pi_s, (self.to_head + (f + self.portal_w)[None, :]).min(axis=1))
+        return pi_s, pi_t
+
+    def query(self, src, dst):
+        """
+        출발역 -> 도착역 최단 초 (도달 불가 None) 와 탐색 통계
+        dijkstra_multi_modes + best_seconds_for_station 과 같은 값
+        """
+        if src == dst:
+            return 0, {"settled": 0}
+        V, fwd, rev = self.V, self.fwd, self.rev
+        if self.heuristic == "alt":
+            pi_s, pi_t = self.landmark_bounds(src, dst)
+            p = ((pi_t - pi_s) / 2).tolist()
+        else:
+            pi_s, pi_t = self.station_bounds(self.station_idx[src], self.station_idx[dst])
+            pot = ((pi_t - pi_s) / 2)[self.node_station]
+            p = np.concatenate([pot, pot]).tolist()  # 상태 x 의 potential (x % V 노드의 역)
+
+        df, dr = {}, {}
+        hf, hr = [], []
+        # 역방향 시작: 도착역 노드로 들어가는 간선의 출발 상태 (ride 도착이면 도착역 dwell 제외)
+        for v in self.station_nodes[dst]:
+            for y in (v, V + v):
+                off = self.dwell_sec if y >= V else 0
+                for x, w in rev[y]:
+                    d = w - off
+                    if d < dr.get(x, INF):
+                        dr[x] = d
+        for x, d in dr.items():
+            heapq.heappush(hr, (d - p[x], d, x))
+        mu = INF
+        for x in self.station_nodes[src]:
+            df[x] = 0
+            heapq.heappush(hf, (p[x], 0, x))
+            if x in dr:
+                mu = min(mu, dr[x])
+
+        settled = 0
+        while hf and hr and hf[0][0] + hr[0][0] < mu:
+            if hf[0][0] <= hr[0][0]:
+                _, d, x = heapq.heappop(hf)
+                if d != df[x]:
+                    continue
+                settled += 1
+                for y, w in fwd[x]:
+                    nd = d + w
+                    if nd < df.get(y, INF):
+                        df[y] = nd
+                        heapq.heappush(hf, (nd + p[y], nd, y))
+                        if y in dr and nd + dr[y] < mu:
+                            mu = nd + dr[y]
+            else:
+                _, d, x = heapq.heappop(hr)
+                if d != dr[x]:
+                    continue
+                settled += 1
+                for y, w in rev[x]:
+                    nd = d + w
+                    if nd < dr.get(y, INF):
+                        dr[y] = nd
+                        heapq.heappush(hr, (nd - p[y], nd, y))
+                        if y in df and df[y] + nd < mu:
+                            mu = df[y] + nd
+        return (None if mu >= INF else int(mu)), {"settled": settled, "states": 2 * V}
+
+# ----------------------------
+# Main
+# ----------------------------
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--merged-csv", type=Path, default=MERGED)
+    ap.add_argument("--transfer-times-csv", type=Path, default=TRANSFER_TIMES)
+    ap.add_argument("--default-transfer-sec", type=int, default=180)
+    ap.add_argument("--dwell-sec", type=int, default=40)
+    ap.add_argument("--speed-csv", type=Path, default=SPEED_CSV)
+    ap.add_argument("--coords-json", type=Path, default=COORDS_JSON)
+    ap.add_argument("--from", dest="src", type=str, default=None)
+    ap.add_argument("--to", dest="dst", type=str, default=None)
+    ap.add_argument("--check", type=int, default=0, help="Compare N random pairs against the full csgraph search.")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--heuristic", choices=["alt", "geo"], default="alt")
+    ap.add_argument("--landmarks", type=int, default=LANDMARKS)
+    args = ap.parse_args()
+
+    node_id, id_node, adj = build_graph(args.merged_csv, args.transfer_times_csv, args.default_transfer_sec)
+    V = len(id_node)
+    graph = CSRGraph.from_adj(adj, V)
+    t0 = time.perf_counter()
+    if args.heuristic == "geo":
+        search = PairSearch(graph, id_node, load_station_coords(args.coords_json), args.dwell_sec,
+                            load_max_speed_kmh(args.speed_csv), heuristic="geo")
+        info = f"portals={search.num_portals}, max speed={3600/search.sec_per_km if search.sec_per_km else 0:.1f}km/h"
+    else:
+        search = PairSearch(graph, id_node, dwell_sec=args.dwell_sec, landmarks=args.landmarks)
+        info = f"landmarks={len(search.landmarks)}"
+    print(f"[INFO] nodes={V}, heuristic={args.heuristic}, {info}, prep={time.perf_counter()-t0:.2f}s")
+
+    if args.src and args.dst:
+        for name in (args.src, args.dst):
+            if name not in search.station_idx:
+                raise SystemExit(f"Unknown station: {name}")
+        t0 = time.perf_counter()
+        sec, stats = search.query(args.src, args.dst)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"[OK] {args.src} -> {args.dst}: {sec}s ({'-' if sec is None else sec//60}분), "
+              f"settled {stats['settled']}/{stats.get('states', 2*V)} states, {ms:.1f}ms")
+
+    if args.check:
+        rng = random.Random(args.seed)
+        pairs = [tuple(rng.sample(search.stations, 2)) for _ in range(args.check)]
+        groups = [search.station_nodes[s] for s in search.stations]
+        bad, settled, elapsed = 0, 0, 0.0
+        for s, t in pairs:
+            t0 = time.perf_counter()
+            sec, stats = search.query(s, t)
+            elapsed += time.perf_counter() - t0
+            settled += stats["settled"]
+            ref = graph.station_rows_dwell([groups[search.station_idx[s]]], search.node_station,
+                                           len(search.stations), args.dwell_sec)[0, search.station_idx[t]]
+            if (None if ref >= INF else int(ref)) != sec:
+                bad += 1
+                print(f"[MISMATCH] {s} -> {t}: {sec} vs {ref}")
+        print(f"[OK] checked {len(pairs)} pairs, mismatches={bad}, "
+              f"avg settled {settled/len(pairs):.0f}/{2*V} states ({100*settled/len(pairs)/(2*V):.1f}%), "
+              f"avg {1000*elapsed/len(pairs):.1f}ms/query")
+
+if __name__ == "__main__":
+    main()
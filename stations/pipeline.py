@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+데이터 빌드 파이프라인 (내용 해시 기반 증분 빌드)
+
+단계마다 입력 파일 / 출력 파일 / 파라미터를 선언해 두고, 키 = sha256(명령 + 파라미터 + 입력 파일 내용 해시).
+  - 키가 지난 실행과 같고 출력이 그대로면 건너뜀
+  - 예전에 같은 키로 만든 출력이 캐시(.pipeline/cache/<키>/)에 있으면 복사해서 복원
+  - 아니면 실행 (스크립트는 하위 프로세스, 서로 의존하지 않는 단계는 --jobs 개까지 동시에)
+파일 해시는 (경로, mtime_ns, 크기)가 같으면 .pipeline/state.json 에 기록된 값을 재사용.
+
+단계 (cwd = stations/):
+  line1_times           1호선_역간거리.py            -> 수도권1호선_소요시간(초)_추가.csv
+  light_rail_<노선>     calc_travel_time.py (노선별)  -> <노선>_소요시간.csv
+  official_edges        ../time.py                   -> ../subway_edges_from_official.csv/.col
+  coords                colstore.py                  -> ../backend/data/station_coords.col (좌표 CSV 가 있을 때만)
+  export_transfer       export_from_merged_with_transfer_times.py --no-csv -> station_pairs_all_with_transfer.*
+  hub_transfer          hub_labels.py --mode transfer -> station_pairs_all_with_transfer.hub.npz
+  publish               위 쌍 표(.pairs.col)/행렬/경로/라벨 파일을 ../backend/data 로 복사 (허브 라벨을 마지막에)
+merged_clean.csv 는 노선별 소요시간 표를 손으로 합친 것이라 원천 입력으로 취급한다.
+
+  python pipeline.py                       # 바뀐 단계만
+  python pipeline.py --dry-run             # 무엇이 다시 돌지만 출력
+  python pipeline.py publish --jobs 4      # publish 와 그 상위 단계만
+  python pipeline.py --force export_transfer
+"""
+import argparse, hashlib, json, os, shutil, subprocess, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from matrix_store import matrix_paths, transposed_path, route_paths, hub_label_path, pairs_path, sorted_paths
+
+BASE = Path(".")
+ROOT = BASE / ".."
+BACKEND_DATA = ROOT / "backend" / "data"
+STATE_DIR = BASE / ".pipeline"
+STATE_PATH = STATE_DIR / "state.json"
+CACHE_DIR = STATE_DIR / "cache"
+LOG_DIR = STATE_DIR / "logs"
+CACHE_KEEP = 3  # 단계별로 남겨 둘 캐시 키 수 (최근 것부터)
+
+PY = sys.executable
+OUT_ALL = BASE / "station_pairs_all_with_transfer.csv"
+COORDS_CSV = BACKEND_DATA / "station_coords.csv"  # 저장소에 없는 로컬 파일
+
+# (노선, 역간거리 CSV, 평균 속도 km/h, 출력 CSV) — 속도는 기존 출력과 같은 값이 나오는 값
+LIGHT_RAIL = [
+    ("우이신설", "국가철도공단_우이신설역간거리_20230425.csv", 33.8, "우이신설선_소요시간.csv"),
+    ("의정부", "국가철도공단_의정부경전철_역간거리_20210528.csv", 32.5, "의정부경전철_소요시간.csv"),
+    ("에버라인", "국가철도공단_에버라인역간거리_20230425.csv", 36.0, "용인경전철_에버라인역_소요시간.csv"),
+]
+
+# ----------------------------
+# Stages
+# ----------------------------
+class Stage:
+    def __init__(self, name, inputs, outputs, cmd=None, func=None, cwd=BASE, params=None):
+        """cmd: 하위 프로세스 인자 목록 (cwd 에서 실행), func: 대신 부를 파이썬 함수 func(stage)"""
+        self.name = name
+        self.inputs = [_norm(p) for p in inputs]
+        self.outputs = [_norm(p) for p in outputs]
+        self.cmd = [str(c) for c in cmd] if cmd else None
+        self.func = func
+        self.cwd = Path(cwd)
+        self.params = dict(params or {})
+
+def _norm(path):
+    return os.path.normpath(str(path))
+
+def build_stages(default_transfer_sec=180):
+    graph_code = ["ingest.py", "csr_graph.py", "matrix_store.py", "colstore.py"]
+    sources = ["merged_clean.csv", "transfer_times.csv"]
+    # 전체 쌍은 CSV 대신 열 단위 표로만 (backend 폴백은 .pairs.col -> CSV 순)
+    export_out = [pairs_path(OUT_ALL), *matrix_paths(OUT_ALL), transposed_path(OUT_ALL),
+                  *(p for pair in sorted_paths(OUT_ALL) for p in pair), *route_paths(OUT_ALL)]
+    hub_out = hub_label_path(OUT_ALL)
+    stages = [
+        Stage("line1_times",
+              inputs=["1호선_역간거리.py", "ingest.py", "국가철도공단_수도권1호선_역간거리_20241015.csv", "지하철_속도.csv"],
+              outputs=["수도권1호선_소요시간(초)_추가.csv"],
+              cmd=[PY, "1호선_역간거리.py"]),
+    ]
+    for line, dist_csv, speed, out_csv in LIGHT_RAIL:
+        stages.append(Stage(f"light_rail_{line}",
+                            inputs=["calc_travel_time.py", dist_csv], outputs=[out_csv],
+                            cmd=[PY, "calc_travel_time.py", "--distance-csv", dist_csv,
+                                 "--speed-kmh", speed, "--out", out_csv],
+                            params={"speed_kmh": speed}))
+    stages += [
+        Stage("official_edges",
+              inputs=[ROOT/"time.py", ROOT/"time.csv", "ingest.py", "colstore.py"],
+              outputs=[ROOT/"subway_edges_from_official.csv", ROOT/"subway_edges_from_official.col"],
+              cmd=[PY, "time.py"], cwd=ROOT),
+        Stage("export_transfer",
+              inputs=["export_from_merged_with_transfer_times.py", *graph_code, *sources],
+              outputs=export_out,
+              cmd=[PY, "export_from_merged_with_transfer_times.py", "--out-all", OUT_ALL,
+                   "--default-transfer-sec", default_transfer_sec, "--no-csv"],
+              params={"default_transfer_sec": default_transfer_sec}),
+        # 라벨의 역 목록이 행렬과 같아야 backend 가 쓰므로 행렬도 입력
+        Stage("hub_transfer",
+              inputs=["hub_labels.py", "export_from_merged_with_transfer_times.py", *graph_code, *sources,
+                      *matrix_paths(OUT_ALL)],
+              outputs=[hub_out],
+              cmd=[PY, "hub_labels.py", "--mode", "transfer", "--out-all", OUT_ALL,
+                   "--default-transfer-sec", default_transfer_sec],
+              params={"default_transfer_sec": default_transfer_sec}),
+    ]
+    if COORDS_CSV.exists():
+        stages.append(Stage("coords", inputs=["colstore.py", "ingest.py", COORDS_CSV],
+                            outputs=[COORDS_CSV.with_suffix(".col")],
+                            cmd=[PY, "colstore.py", COORDS_CSV, COORDS_CSV.with_suffix(".col"), "--dict", "역명_clean"]))
+    published = export_out + [hub_out]
+    stages.append(Stage("publish", inputs=published, outputs=[BACKEND_DATA / Path(p).name for p in published],
+                        func=publish))
+    return stages
+
+def publish(stage):
+    """backend/data 로 복사. 허브 라벨은 행렬보다 mtime 이 늦어야 backend 가 쓰므로 마지막에"""
+    BACKEND_DATA.mkdir(parents=True, exist_ok=True)
+    for src, dst in zip(stage.inputs, stage.outputs):
+        shutil.copyfile(src, dst)
+        print(f"  {src} -> {dst}")
+
+# ----------------------------
+# Hashing / state
+# ----------------------------
+class BuildState:
+    def __init__(self, path=STATE_PATH):
+        self.path = Path(path)
+        data = json.loads(self.path.read_text(encoding="utf-8")) if self.path.exists() else {}
+        self.files = data.get("files", {})    # 경로 -> [mtime_ns, 크기, sha256]
+        self.stages = data.get("stages", {})  # 단계 -> {"key", "outputs": {경로: sha256}, "history": [키]}
+        self.lock = threading.Lock()
+
+    def file_hash(self, path):
+        """내용 sha256, 없으면 None. mtime/크기가 그대로면 기록된 값"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            rec = self.files.get(path)
+        if rec and rec[0] == st.st_mtime_ns and rec[1] == st.st_size:
+            return rec[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        with self.lock:
+            self.files[path] = [st.st_mtime_ns, st.st_size, h.hexdigest()]
+        return h.hexdigest()
+
+    def stage_key(self, stage):
+        """-> (키, 없는 입력 목록)"""
+        inputs = {p: self.file_hash(p) for p in stage.inputs}
+        missing = [p for p, h in inputs.items() if h is None]
+        cmd = [("python" if c == PY else c) for c in stage.cmd] if stage.cmd else None  # 인터프리터 경로는 키에서 제외
+        spec = {"name": stage.name, "cmd": cmd, "params": stage.params, "inputs": inputs,
+                "outputs": stage.outputs}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest(), missing
+
+    def up_to_date(self, stage, key):
+        rec = self.stages.get(stage.name)
+        if not rec or rec["key"] != key:
+            return False
+        return all(self.file_hash(p) == rec["outputs"].get(p) for p in stage.outputs)
+
+    def record(self, stage, key):
+        outputs = {p: self.file_hash(p) for p in stage.outputs}
+        with self.lock:
+            history = [k for k in self.stages.get(stage.name, {}).get("history", []) if k != key]
+            history.insert(0, key)
+            for old in history[CACHE_KEEP:]:
+                shutil.rmtree(CACHE_DIR / old, ignore_errors=True)
+            self.stages[stage.name] = {"key": key, "outputs": outputs, "history": history[:CACHE_KEEP]}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"files": self.files, "stages": self.stages}, ensure_ascii=False, indent=1),
+                       encoding="utf-8")
+        os.replace(tmp, self.path)
+
+# ----------------------------
+# Content-addressed output cache
+# ----------------------------
+def _cache_entry(key, i, path):
+    return CACHE_DIR / key / f"{i}_{Path(path).name}"
+
+def cache_store(stage, key):
+    tmp = CACHE_DIR / (key + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for i, p in enumerate(stage.outputs):
+        shutil.copyfile(p, tmp / _cache_entry(key, i, p).name)
+    shutil.rmtree(CACHE_DIR / key, ignore_errors=True)
+    os.replace(tmp, CACHE_DIR / key)
+
+def cache_restore(stage, key):
+    """같은 키로 만든 출력이 캐시에 있으면 복사 (출력 순서대로 -> mtime 순서도 실행 때와 같음)"""
+    entries = [_cache_entry(key, i, p) for i, p in enumerate(stage.outputs)]
+    if not all(e.exists() for e in entries):
+        return False
+    for e, p in zip(entries, stage.outputs):
+        Path(p).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(e, p)
+    return True
+
+# ----------------------------
+# Scheduling
+# ----------------------------
+def upstream(stages, targets):
+    """targets 와 그 상위 단계 (선언 순서 유지)"""
+    producer = {o: s for s in stages for o in s.outputs}
+    by_name = {s.name: s for s in stages}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)} (have: {', '.join(by_name)})")
+    keep, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name in keep:
+            continue
+        keep.add(name)
+        todo += [producer[i].name for i in by_name[name].inputs if i in producer]
+    return [s for s in stages if s.name in keep]
+
+def run_stage(stage, state, force):
+    """-> ("skip" | "cache" | "run", 초)"""
+    t0 = time.perf_counter()
+    key, missing = state.stage_key(stage)
+    if missing:
+        raise RuntimeError(f"missing input(s): {', '.join(missing)}")
+    if not force and state.up_to_date(stage, key):
+        return "skip", time.perf_counter() - t0
+    if not force and cache_restore(stage, key):
+        state.record(stage, key)
+        return "cache", time.perf_counter() - t0
+    if stage.func is not None:
+        stage.func(stage)
+    else:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        log_path = LOG_DIR / f"{stage.name}.log"
+        with open(log_path, "w", encoding="utf-8") as log:
+            rc = subprocess.run(stage.cmd, cwd=stage.cwd, stdout=log, stderr=subprocess.STDOUT).returncode
+        if rc != 0:
+            tail = log_path.read_text(encoding="utf-8", errors="replace").splitlines()[-15:]
+            raise RuntimeError(f"exit code {rc} (log: {log_path})\n" + "\n".join(tail))
+    absent = [p for p in stage.outputs if not os.path.exists(p)]
+    if absent:
+        raise RuntimeError(f"did not write: {', '.join(absent)}")
+    state.record(stage, key)
+    cache_store(stage, key)
+    return "run", time.perf_counter() - t0
+
+def run(stages, state, jobs, force=()):
+    """의존 단계가 끝난 단계부터 jobs 개까지 동시에. 실패하면 하위 단계는 건너뜀 -> 실패 단계 목록"""
+    producer = {o: s.name for s in stages for o in s.outputs}
+    deps = {s.name: {producer[i] for i in s.inputs if i in producer} for s in stages}
+    pending = {s.name: s for s in stages}
+    done, failed = set(), []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while pending or running:
+            for name in list(pending):
+                if deps[name] & set(failed):
+                    print(f"[SKIP] {name}: upstream failed")
+                    pending.pop(name)
+                    failed.append(name)
+                elif deps[name] <= done:
+                    s = pending.pop(name)
+                    running[pool.submit(run_stage, s, state, s.name in force)] = s
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                s = running.pop(fut)
+                try:
+                    how, sec = fut.result()
+                except Exception as e:
+                    print(f"[FAIL] {s.name}: {e}")
+                    failed.append(s.name)
+                    continue
+                done.add(s.name)
+                label = {"skip": "up to date", "cache": "restored from cache", "run": "built"}[how]
+                print(f"[{'INFO' if how == 'skip' else 'OK'}] {s.name}: {label} ({sec:.1f}s)")
+    return failed
+
+def dry_run(stages, state, force=()):
+    """입력 해시만 보고 단계별 예상 동작 출력 (상위 단계가 다시 돌면 하위도 다시 돈다고 표시)"""
+    producer = {o: s.name for s in stages for o in s.outputs}
+    dirty = set()
+    for s in stages:
+        ups = sorted({producer[i] for i in s.inputs if i in producer} & dirty)
+        key, missing = state.stage_key(s)
+        if ups:
+            how = f"rebuild after {', '.join(ups)}"
+        elif missing:
+            how = f"missing input(s): {', '.join(missing)}"
+        elif s.name not in force and state.up_to_date(s, key):
+            how = "up to date"
+        elif s.name not in force and (CACHE_DIR / key).exists():
+            how = "restore from cache"
+        else:
+            how = "build"
+        if how != "up to date":
+            dirty.add(s.name)
+        print(f"  {s.name:<22} {how}")
+
+# ----------------------------
+# Main
+# ----------------------------
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("targets", nargs="*", help="Stages to bring up to date (default: all).")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--force", action="append", default=[], metavar="STAGE",
+                    help="Rebuild this stage even if its key is unchanged (repeatable).")
+    ap.add_argument("--default-transfer-sec", type=int, default=180)
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--list", action="store_true", help="Print stages with their inputs/outputs.")
+    args = ap.parse_args()
+
+    stages = build_stages(args.default_transfer_sec)
+    if args.targets or args.force:
+        stages = upstream(stages, args.targets or [s.name for s in stages])
+        upstream(stages, args.force)  # 이름 확인용
+    if args.list:
+        for s in stages:
+            print(f"{s.name}\n  in : {', '.join(s.inputs)}\n  out: {', '.join(s.outputs)}")
+        return
+    state = BuildState()
+    if args.dry_run:
+        dry_run(stages, state, set(args.force))
+        state.save()
+        return
+    t0 = time.perf_counter()
+    try:
+        failed = run(stages, state, max(1, args.jobs), set(args.force))
+    finally:
+        state.save()
+    if failed:
+        raise SystemExit(f"[FAIL] {len(failed)} stage(s) failed: {', '.join(failed)}")
+    print(f"[OK] {len(stages)} stage(s) in {time.perf_counter()-t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+dwell / 환승 시간 what-if 시나리오 일괄 실행
+
+그래프 구조(CSR)는 merged_clean.csv + transfer_times.csv 에서 한 번만 만들고,
+시나리오마다 가중치(기본 환승 초)와 노드별 dwell 만 바꿔 전체 쌍을 다시 푼다.
+시나리오는 서로 독립이므로 --workers 로 병렬 실행 (fork 시 그래프를 copy-on-write 공유).
+
+시나리오 정의:
+  --dwell-sec 30,40,50 --default-transfer-sec 120,180     -> 곱집합 그리드
+  --scenarios scenarios.json
+    {"grid": {"dwell_sec": [30, 40], "default_transfer_sec": [120, 180],
+              "line_dwell_sec": [{}, {"2호선": 30}]},
+     "scenarios": [{"name": "express", "dwell_sec": 40, "line_dwell_sec": {"9호선급행": 20}}]}
+  line_dwell_sec: 호선별 dwell override (해당 호선 역에 ride 로 도착할 때)
+
+Output (--out-dir):
+  stations.csv      station_id,station (행/열 순서, 모든 시나리오 공통)
+  <name>.npy        N×N uint16 초 (export_times_with_stop 의 .npy 와 같은 포맷)
+  summary.csv       시나리오별 도달 쌍 수 / 평균 / p90 + baseline 대비 차이
+"""
+import argparse, csv, json
+import multiprocessing as mp
+from itertools import product
+from pathlib import Path
+from collections import defaultdict
+import numpy as np
+from matrix_store import UNREACHABLE, check_seconds
+from csr_graph import CSRGraph, EDGE_TRANSFER, INF
+from export_times_with_stop import build_graph, normalize_line_label, MERGED, TRANSFER_TIMES, BASE
+
+BASELINE = {"name": "baseline", "dwell_sec": 40, "default_transfer_sec": 180, "line_dwell_sec": {}}
+CHUNK = 64  # 한 번의 csgraph 호출에 넣는 출발역 수
+
+# ----------------------------
+# Scenarios
+# ----------------------------
+def parse_int_list(s):
+    return [int(x) for x in str(s).split(",") if x.strip()]
+
+def scenario_name(sc):
+    name = f"d{sc['dwell_sec']}_t{sc['default_transfer_sec']}"
+    for ln, sec in sorted(sc["line_dwell_sec"].items()):
+        name += f"_{ln}{sec}"
+    return name
+
+def normalize_scenario(sc, baseline):
+    out = {
+        "dwell_sec": int(sc.get("dwell_sec", baseline["dwell_sec"])),
+        "default_transfer_sec": int(sc.get("default_transfer_sec", baseline["default_transfer_sec"])),
+        "line_dwell_sec": {normalize_line_label(ln): int(sec) for ln, sec in (sc.get("line_dwell_sec") or {}).items()},
+    }
+    out["name"] = str(sc.get("name") or scenario_name(out))
+    return out
+
+def expand_scenarios(spec, dwell_list, transfer_list, baseline):
+    """-> baseline 을 맨 앞에 둔 시나리오 목록 (같은 설정은 한 번만)"""
+    grid = dict(spec.get("grid") or {})
+    grid.setdefault("dwell_sec", dwell_list)
+    grid.setdefault("default_transfer_sec", transfer_list)
+    grid.setdefault("line_dwell_sec", [{}])
+    raw = [dict(dwell_sec=d, default_transfer_sec=t, line_dwell_sec=l)
+           for d, t, l in product(grid["dwell_sec"], grid["default_transfer_sec"], grid["line_dwell_sec"])]
+    raw += list(spec.get("scenarios") or [])
+
+    scenarios, seen, names = [], set(), set()
+    for sc in [baseline] + [normalize_scenario(r, baseline) for r in raw]:
+        key = (sc["dwell_sec"], sc["default_transfer_sec"], tuple(sorted(sc["line_dwell_sec"].items())))
+        if key in seen:
+            continue
+        if sc["name"] in names:
+            raise ValueError(f"duplicate scenario name: {sc['name']}")
+        seen.add(key); names.add(sc["name"])
+        scenarios.append(sc)
+    return scenarios
+
+# ----------------------------
+# Solve
+# ----------------------------
+_WORK = None  # main()이 채우는 공유 컨텍스트 dict - fork 시 워커와 copy-on-write 공유
+
+def scenario_matrix(sc):
+    """시나리오 -> N×N uint16 초 행렬 (export_times_with_stop 과 같은 규칙)"""
+    W = _WORK
+    graph, node_line, groups, node_station = W["graph"], W["node_line"], W["groups"], W["node_station"]
+    # 환승 간선 중 기본값(빌드 시 0)으로 만들어진 것만 시나리오 기본 환승 초로
+    default_edge = (graph.kinds == EDGE_TRANSFER) & (graph.weights == 0)
+    g = graph.with_weights(np.where(default_edge, sc["default_transfer_sec"], graph.weights))
+    dwell = np.array([sc["line_dwell_sec"].get(ln, sc["dwell_sec"]) for ln in node_line], dtype=np.int64)
+
+    n = len(groups)
+    mat = np.empty((n, n), dtype=np.uint16)
+    for lo in range(0, n, CHUNK):
+        best = g.station_rows_dwell(groups[lo:lo+CHUNK], node_station, n, dwell)
+        reach = best < INF
+        if reach.any():
+            check_seconds(best[reach].max())
+        mat[lo:lo+CHUNK] = np.where(reach, best, UNREACHABLE)
+    np.fill_diagonal(mat, 0)
+    return mat
+
+def matrix_stats(mat):
+    """대각선 제외 도달 가능 쌍의 개수 / 평균 / p90 (초)"""
+    off = ~np.eye(len(mat), dtype=bool)
+    vals = mat[off & (mat != UNREACHABLE)].astype(np.float64)
+    if not len(vals):
+        return {"reachable_pairs": 0, "mean_sec": None, "p90_sec": None}
+    return {"reachable_pairs": int(len(vals)),
+            "mean_sec": round(float(vals.mean()), 1),
+            "p90_sec": round(float(np.percentile(vals, 90)), 1)}
+
+def run_scenario(sc):
+    """워커: 시나리오 행렬을 <out-dir>/<name>.npy 로 쓰고 통계만 돌려준다 (행렬은 프로세스 간 전달 안 함)"""
+    mat = scenario_matrix(sc)
+    path = _WORK["out_dir"] / f"{sc['name']}.npy"
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, mat)
+    tmp.replace(path)
+    return sc, matrix_stats(mat)
+
+def run_all(scenarios, workers):
+    if workers <= 1:
+        yield from map(run_scenario, scenarios)
+        return
+    if "fork" in mp.get_all_start_methods():
+        ctx, init, initargs = mp.get_context("fork"), None, ()
+    else:
+        ctx, init, initargs = mp.get_context("spawn"), _init_worker, (_WORK,)
+    with ctx.Pool(workers, initializer=init, initargs=initargs) as pool:
+        yield from pool.imap(run_scenario, scenarios)
+
+def _init_worker(work):
+    global _WORK
+    _WORK = work
+
+def delta(a, b):
+    return None if a is None or b is None else round(a - b, 1)
+
+# ----------------------------
+# Main
+# ----------------------------
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--merged-csv", type=Path, default=MERGED)
+    ap.add_argument("--transfer-times-csv", type=Path, default=TRANSFER_TIMES)
+    ap.add_argument("--scenarios", type=Path, default=None, help="Scenario JSON ({'grid': {...}, 'scenarios': [...]}).")
+    ap.add_argument("--dwell-sec", type=str, default=str(BASELINE["dwell_sec"]),
+                    help="Comma-separated dwell values for the grid (ignored if the JSON grid sets them).")
+    ap.add_argument("--default-transfer-sec", type=str, default=str(BASELINE["default_transfer_sec"]),
+                    help="Comma-separated default transfer seconds for the grid.")
+    ap.add_argument("--baseline-dwell-sec", type=int, default=BASELINE["dwell_sec"])
+    ap.add_argument("--baseline-transfer-sec", type=int, default=BASELINE["default_transfer_sec"])
+    ap.add_argument("--out-dir", type=Path, default=BASE/"scenarios")
+    ap.add_argument("--workers", type=int, default=1, help="Scenarios solved in parallel.")
+    args = ap.parse_args()
+
+    spec = {}
+    if args.scenarios:
+        with open(args.scenarios, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+    baseline = dict(BASELINE, dwell_sec=args.baseline_dwell_sec, default_transfer_sec=args.baseline_transfer_sec)
+    scenarios = expand_scenarios(spec, parse_int_list(args.dwell_sec), parse_int_list(args.default_transfer_sec),
+                                 baseline)
+
+    # 기본 환승 초 0으로 빌드 -> per-pair/역별 override 가 없는 환승 간선은 가중치 0 으로 구분된다
+    node_id, id_node, adj = build_graph(args.merged_csv, args.transfer_times_csv, 0)
+    V = len(id_node)
+    graph = CSRGraph.from_adj(adj, V)
+    station_to_nodes = defaultdict(list)
+    for nid, (st, ln) in enumerate(id_node):
+        station_to_nodes[st].append(nid)
+    stations = sorted(station_to_nodes.keys())
+    station_idx = {st: i for i, st in enumerate(stations)}
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    with open(args.out_dir/"stations.csv", "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f); w.writerow(["station_id", "station"])
+        w.writerows(enumerate(stations))
+
+    global _WORK
+    _WORK = dict(graph=graph, node_line=[ln for st, ln in id_node],
+                 groups=[station_to_nodes[s] for s in stations],
+                 node_station=np.array([station_idx[st] for st, ln in id_node]), out_dir=args.out_dir)
+    print(f"[INFO] stations={len(stations)}, nodes={V}, scenarios={len(scenarios)}, workers={args.workers}")
+
+    rows, base = [], None
+    for sc, stats in run_all(scenarios, args.workers):
+        base = base or stats  # 첫 시나리오 = baseline
+        rows.append([sc["name"], sc["dwell_sec"], sc["default_transfer_sec"],
+                     json.dumps(sc["line_dwell_sec"], ensure_ascii=False, sort_keys=True) if sc["line_dwell_sec"] else "",
+                     stats["reachable_pairs"], stats["mean_sec"], stats["p90_sec"],
+                     stats["reachable_pairs"] - base["reachable_pairs"],
+                     delta(stats["mean_sec"], base["mean_sec"]), delta(stats["p90_sec"], base["p90_sec"])])
+        print(f"[OK] {sc['name']}: mean={stats['mean_sec']}s p90={stats['p90_sec']}s reachable={stats['reachable_pairs']}")
+
+    with open(args.out_dir/"summary.csv", "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["scenario", "dwell_sec", "default_transfer_sec", "line_dwell_sec",
+                    "reachable_pairs", "mean_sec", "p90_sec",
+                    "reachable_delta", "mean_delta_sec", "p90_delta_sec"])
+        w.writerows(rows)
+    print(f"[OK] Wrote {len(rows)} matrices + summary.csv to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# stations 스크립트는 stations/ 에서 실행하는 평면 import (pair_search.py 와 같이)
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,52 @@
+# test_pair_search.py
+"""PairSearch(ALT) 를 전체 탐색(csgraph station_rows_dwell)과 비교: 거리 일치 + 탐색한 상태 비율 상한"""
+import random
+from pathlib import Path
+
+import pytest
+
+from csr_graph import CSRGraph, INF
+from export_times_with_stop import build_graph, MERGED, TRANSFER_TIMES
+from pair_search import PairSearch
+
+STATIONS = Path(__file__).resolve().parents[1]  # MERGED 등은 stations/ 기준 상대 경로
+DWELL_SEC = 40
+PAIRS = 200
+MAX_SETTLED_FRACTION = 0.10  # 측정값 약 5% (8 landmarks). 포털 하한은 21.8%
+
+
+@pytest.fixture(scope="module")
+def network():
+    _, id_node, adj = build_graph(STATIONS / MERGED, STATIONS / TRANSFER_TIMES, 180)
+    graph = CSRGraph.from_adj(adj, len(id_node))
+    return graph, PairSearch(graph, id_node, dwell_sec=DWELL_SEC)
+
+
+@pytest.fixture(scope="module")
+def results(network):
+    graph, search = network
+    rng = random.Random(0)
+    out = []
+    for _ in range(PAIRS):
+        s, t = rng.sample(search.stations, 2)
+        sec, stats = search.query(s, t)
+        ref = graph.station_rows_dwell([search.station_nodes[s]], search.node_station,
+                                       len(search.stations), DWELL_SEC)[0, search.station_idx[t]]
+        out.append((s, t, sec, None if ref >= INF else int(ref), stats))
+    return out
+
+
+def test_matches_full_search(results):
+    bad = [(s, t, sec, ref) for s, t, sec, ref, _ in results if sec != ref]
+    assert not bad
+
+
+def test_settles_small_fraction(results):
+    fractions = [stats["settled"] / stats["states"] for *_, stats in results]
+    assert sum(fractions) / len(fractions) < MAX_SETTLED_FRACTION
+
+
+def test_same_station_is_zero(network):
+    _, search = network
+    st = search.stations[0]
+    assert search.query(st, st)[0] == 0